@@ -1,8 +1,24 @@
 from . import constants as constant
 from .constants import *
 from .constants import __all__ as _constants_all
+from .constants import _LAZY_NAMES
 from .chess_game import *
 from .chess_game import __all__ as _chess_game_all
 from .chess_game import __version__, __author__
+from .polyglot import *
+from .polyglot import __all__ as _polyglot_all
+from .pawn_hash import *
+from .pawn_hash import __all__ as _pawn_hash_all
+from .endgame import *
+from .endgame import __all__ as _endgame_all
+from .move_picker import *
+from .move_picker import __all__ as _move_picker_all
 
-__all__ = [*dict.fromkeys([*_chess_game_all, *_constants_all, "constant", "__version__", "__author__"])]
+__all__ = [*dict.fromkeys([*_chess_game_all, *_polyglot_all, *_pawn_hash_all, *_endgame_all, *_move_picker_all, *_constants_all, *sorted(_LAZY_NAMES), "constant", "__version__", "__author__"])]
+
+
+def __getattr__(name):
+    # flat slider tables and engine constants are built by chesscore.constants on first access
+    if name in _LAZY_NAMES:
+        return getattr(constant, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
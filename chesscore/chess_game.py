@@ -1,7 +1,9 @@
 try:
+    from . import constants as _constants
     from .constants import *
     from .constants import __all__ as _constants_all
 except ImportError:
+    import constants as _constants
     from constants import *
     from constants import __all__ as _constants_all
 
@@ -14,9 +16,14 @@ class Board:
     __slots__ = (
         'pawn', 'knight', 'bishop', 'rook', 'queen', 'king','board_occupied_squares', 'all_board_occupied_squares', 'king_square',
         'move_history', 'side_to_move', 'counter_halfmove_without_capture','castling_rights', 'position_has_loaded', 'en_passant_square','start_value',
-        'last_position_hash', 'position_hash_history', 'encoded_move_in_progress','mg_score', 'eg_score', 'phase', 'mailbox','end_coordinate'
+        'last_position_hash', 'position_hash_history', 'encoded_move_in_progress','mg_score', 'eg_score', 'phase', 'mailbox','end_coordinate',
+        'zobrist_key', 'key_stack', 'pawn_key', 'material_key'
     )
 
+    # zobrist_key: key of the pieces, castling rights, en passant square and side to move. make_move
+    # leaves the side key to change_side(), make_move_search toggles it itself (search never updates
+    # side_to_move), so after a search move the key holds the side to move, not `side_to_move`.
+
     def __init__(self):
         """Initialize the board with the standard starting position and game state."""
 
@@ -28,8 +35,10 @@ class Board:
         self.castling_rights = CR_WK | CR_WQ | CR_BK | CR_BQ
         self.position_has_loaded = False
         self.en_passant_square = 0
+        self.zobrist_key = self.compute_zobrist_key()
         self.last_position_hash = self.get_position_hash()
         self.position_hash_history = {self.last_position_hash: 1}
+        self.key_stack = [self.last_position_hash]
         self.encoded_move_in_progress = None
     
 
@@ -94,6 +103,8 @@ class Board:
                 p = -p
             mailbox[sq] = p
         self.mailbox = mailbox
+        self.pawn_key = self.compute_pawn_key()
+        self.material_key = self.compute_material_key()
 
 
     def load_board(self, fen) -> None:
@@ -254,10 +265,17 @@ class Board:
             self.en_passant_square = en_passant_square
             self.position_has_loaded = True 
 
+            self.zobrist_key = self.compute_zobrist_key()
+            self.last_position_hash = self.get_position_hash()
+            self.position_hash_history = {self.last_position_hash: 1}
+            self.key_stack = [self.last_position_hash]
+
             if getattr(self, 'mailbox', None):
                 for square in range(64):
                     piece_type = self.get_piece_type_and_color(square)
                     self.mailbox[square] = piece_type if piece_type else EMPTY
+                self.pawn_key = self.compute_pawn_key()
+                self.material_key = self.compute_material_key()
         else:
             raise ValueError("FEN string is invalid (expected 6 fields).")
     
@@ -265,26 +283,142 @@ class Board:
     def add_to_history(self) -> None:
         """
         Add a move to history and save the current board state.
+
+        After a capture or a pawn move (`counter_halfmove_without_capture` is 0) none of the
+        previous positions can occur again, so `position_hash_history` and `key_stack` restart
+        from the current position and only hold the positions since the last irreversible move.
         """
 
         self.move_history.append(self.encoded_move_in_progress)
         self.last_position_hash = self.get_position_hash()
-        self.position_hash_history[self.last_position_hash] = self.position_hash_history.get(self.last_position_hash, 0) + 1
+
+        if self.counter_halfmove_without_capture == 0:
+            self.position_hash_history = {self.last_position_hash: 1}
+            self.key_stack = [self.last_position_hash]
+        else:
+            self.position_hash_history[self.last_position_hash] = self.position_hash_history.get(self.last_position_hash, 0) + 1
+            self.key_stack.append(self.last_position_hash)
     
      
-    def get_position_hash(self) -> tuple:
-        """Generate a hash of the current position for repetition detection."""
+    def get_position_hash(self) -> int:
+        """Return the key of the current position for repetition detection (the Zobrist key)."""
+
+        return self.zobrist_key
+
+
+    def compute_zobrist_key(self) -> int:
+        """
+        Compute the Zobrist key of the current position from scratch.
+
+        The key covers the pieces, the side to move, the castling rights and the en passant square.
+        make_move, make_move_search, their unmake counterparts and change_side keep `zobrist_key`
+        up to date incrementally, so this is only needed after the bitboards are set directly.
+        make_move leaves the side key to change_side(), make_move_search toggles it itself: during a
+        search `side_to_move` is not updated, so `zobrist_key` then differs from this value.
+
+        Returns:
+            int: 64-bit Zobrist key.
+        """
+
+        key = ZOBRIST_CASTLING[self.castling_rights] ^ ZOBRIST_EN_PASSANT[self.en_passant_square]
+        if self.side_to_move == BLACK:
+            key ^= ZOBRIST_SIDE
+
+        for INDEX in (WHITE_INDEX, BLACK_INDEX):
+            own_occupied_squares = self.board_occupied_squares[INDEX]
+            zobrist = ZOBRIST_PIECES[INDEX]
+
+            for piece_type, bitboard in ((PAWN, self.pawn), (KNIGHT, self.knight), (BISHOP, self.bishop), (ROOK, self.rook), (QUEEN, self.queen), (KING, self.king)):
+                bitboard &= own_occupied_squares
+                while bitboard:
+                    key ^= zobrist[piece_type][(bitboard & -bitboard).bit_length() - 1]
+                    bitboard &= bitboard - 1
+
+        return key
+
+
+    def compute_pawn_key(self) -> int:
+        """
+        Compute the pawn-only Zobrist key of the current position from scratch.
+
+        The key is the xor of the `ZOBRIST_PIECES` pawn keys of every pawn, so it only changes
+        when the pawn structure does. init_board_for_engine sets `pawn_key` and
+        make_move_search / unmake_move_search keep it up to date.
+
+        Returns:
+            int: 64-bit pawn key.
+        """
+
+        key = 0
+        for INDEX in (WHITE_INDEX, BLACK_INDEX):
+            zobrist = ZOBRIST_PIECES[INDEX][PAWN]
+            bitboard = self.pawn & self.board_occupied_squares[INDEX]
+            while bitboard:
+                key ^= zobrist[(bitboard & -bitboard).bit_length() - 1]
+                bitboard &= bitboard - 1
+
+        return key
+
+
+    def compute_material_key(self) -> int:
+        """
+        Compute the material key of the current position from scratch.
+
+        The key packs the number of pieces of each color and type (kings excluded) in 4-bit
+        fields, see MATERIAL_KEY_UNIT. init_board_for_engine sets `material_key` and
+        make_move_search / unmake_move_search keep it up to date.
+
+        Returns:
+            int: Material key.
+        """
+
+        key = 0
+        for INDEX in (WHITE_INDEX, BLACK_INDEX):
+            own_occupied_squares = self.board_occupied_squares[INDEX]
+            unit = MATERIAL_KEY_UNIT[INDEX]
+            for piece_type, bitboard in ((PAWN, self.pawn), (KNIGHT, self.knight), (BISHOP, self.bishop), (ROOK, self.rook), (QUEEN, self.queen)):
+                key += unit[piece_type] * (bitboard & own_occupied_squares).bit_count()
 
-        return (
-            self.pawn, self.knight, self.bishop, self.rook, self.queen, self.king, self.en_passant_square,
-            self.side_to_move, self.castling_rights, self.board_occupied_squares[WHITE_INDEX], self.board_occupied_squares[BLACK_INDEX]
-        )
+        return key
 
 
     def change_side(self) -> None:
         """Change the side to move."""
 
         self.side_to_move *= -1
+        self.zobrist_key ^= ZOBRIST_SIDE
+
+
+    def is_repetition(self, count=2) -> bool:
+        """
+        Check whether the current position already occurred, using the key stack.
+
+        Only the positions since the last capture or pawn move can repeat, so the scan stops
+        `counter_halfmove_without_capture` plies back, and only looks at every second ply
+        (positions with the same side to move).
+        `key_stack` is pushed by add_to_history() and make_move_search(), and popped by unmake_move_search().
+
+        Args:
+            count (int, optional): Number of occurrences, the current one included (2 for search draws, 3 for threefold repetition).
+
+        Returns:
+            bool: True if the current position occurred at least `count` times.
+        """
+
+        key_stack = self.key_stack
+        top = len(key_stack) - 1
+        key = key_stack[top]
+        stop = max(top - self.counter_halfmove_without_capture, 0)
+
+        i = top - 4
+        while i >= stop:
+            if key_stack[i] == key:
+                count -= 1
+                if count <= 1:
+                    return True
+            i -= 2
+
+        return False
 
 
     @staticmethod
@@ -323,6 +457,19 @@ class Board:
             return True
 
         return False
+
+
+    def material_insufficiency_from_key(self) -> bool:
+        """
+        Same check as material_insufficiency, in O(1) from `material_key`.
+
+        `material_key` must be set (init_board_for_engine) and kept up to date (make_move_search).
+
+        Returns:
+            bool: True if insufficient material, False otherwise.
+        """
+
+        return self.material_key in INSUFFICIENT_MATERIAL_KEYS
         
 
     def get_piece_type(self, square) -> "int | None":
@@ -410,9 +557,9 @@ class Board:
         Apply a move to the board and return an undo tuple.
 
         Args:
-            move (int): Encoded move value.
+            move (int): Encoded move value, 12-bit or extended (MOVE_FLAG_EXTENDED).
             side_to_move (int): Side color (WHITE=1 or BLACK=-1).
-            promotion_piece (int, optional): Piece type to promote to (QUEEN, ROOK, BISHOP, KNIGHT), or 0 for no promotion.
+            promotion_piece (int, optional): Piece type to promote to (QUEEN, ROOK, BISHOP, KNIGHT), or 0 for no promotion (the promotion bits of an extended move, a queen otherwise).
 
         Returns:
             undo (tuple): Undo information for the move.
@@ -431,13 +578,20 @@ class Board:
         INDEX = WHITE_INDEX if side_to_move == WHITE else BLACK_INDEX
         ATT_INDEX = 1 - INDEX
 
-        if not promotion_piece and from_piece == PAWN:
+        if move & MOVE_FLAG_EXTENDED:
+            if not promotion_piece:
+                promotion_piece = (move & MOVE_PROMOTION_MASK) >> MOVE_PROMOTION_SHIFT
+        elif not promotion_piece and from_piece == PAWN:
             if (side_to_move == WHITE and to >= 56) or (side_to_move == BLACK and to <= 7):
                 promotion_piece = QUEEN
 
         en_passant_prev = self.en_passant_square
 
-        undo = (move, from_piece, to_piece, self.castling_rights, self.counter_halfmove_without_capture, en_passant_prev, promotion_piece)
+        undo = (move, from_piece, to_piece, self.castling_rights, self.counter_halfmove_without_capture, en_passant_prev, promotion_piece, self.zobrist_key)
+
+        zobrist_own = ZOBRIST_PIECES[INDEX]
+        key = self.zobrist_key ^ ZOBRIST_CASTLING[self.castling_rights] ^ ZOBRIST_EN_PASSANT[en_passant_prev]
+        key ^= zobrist_own[from_piece][from_] ^ zobrist_own[promotion_piece if promotion_piece and from_piece == PAWN else from_piece][to]
 
         self.en_passant_square = 0
 
@@ -455,6 +609,7 @@ class Board:
 
             self.counter_halfmove_without_capture = 0
             self.board_occupied_squares[ATT_INDEX] &= ~to_bitboard
+            key ^= ZOBRIST_PIECES[ATT_INDEX][to_piece][to]
         else:
             self.counter_halfmove_without_capture += 1
 
@@ -479,10 +634,11 @@ class Board:
                     self.en_passant_square = (from_ + to) >> 1
 
                 elif en_passant_prev != 0 and to == en_passant_prev:
-                    captured_pawn_square = to - 8 if side_to_move == WHITE else to + 8
+                    captured_pawn_square = to ^ 8  # one rank behind the en passant square, for both colors
                     captured_pawn_bitboard = 1 << captured_pawn_square
                     self.pawn &= ~captured_pawn_bitboard
                     self.board_occupied_squares[ATT_INDEX] &= ~captured_pawn_bitboard
+                    key ^= ZOBRIST_PIECES[ATT_INDEX][PAWN][captured_pawn_square]
 
         elif from_piece == BISHOP:
             self.bishop ^= move_mask
@@ -501,20 +657,18 @@ class Board:
             self.king_square[INDEX] = to
 
             d = to - from_
-            if d == 2:
-                rook_move_mask = (1 << (7 if side_to_move == WHITE else 63)) | (1 << (5 if side_to_move == WHITE else 61))
-                self.rook ^= rook_move_mask
-                self.board_occupied_squares[INDEX] ^= rook_move_mask
-
-            elif d == -2:
-                rook_move_mask = (1 << (0 if side_to_move == WHITE else 56)) | (1 << (3 if side_to_move == WHITE else 59))
+            if d == 2 or d == -2:
+                rook_from, rook_to = CASTLING_ROOK_SQUARES[to]
+                rook_move_mask = (1 << rook_from) | (1 << rook_to)
                 self.rook ^= rook_move_mask
                 self.board_occupied_squares[INDEX] ^= rook_move_mask
+                key ^= zobrist_own[ROOK][rook_from] ^ zobrist_own[ROOK][rook_to]
 
         self.board_occupied_squares[INDEX] ^= move_mask
         self.all_board_occupied_squares = self.board_occupied_squares[WHITE_INDEX] | self.board_occupied_squares[BLACK_INDEX]
 
         self.castling_rights &= CASTLING_UPDATE[from_] & CASTLING_UPDATE[to]
+        self.zobrist_key = key ^ ZOBRIST_CASTLING[self.castling_rights] ^ ZOBRIST_EN_PASSANT[self.en_passant_square]
 
         return undo
     
@@ -529,9 +683,9 @@ class Board:
             Ex: board_obj.mailbox = [ROOK, KNIGHT, BISHOP, QUEEN, KING, BISHOP, KNIGHT, ROOK] + [PAWN] * 8 + [EMPTY] * 32 + [-PAWN] * 8 + [-ROOK, -KNIGHT, -BISHOP, -QUEEN, -KING, -BISHOP, -KNIGHT, -ROOK]
 
         Args:
-            move (int): Encoded move value.
+            move (int): Encoded move value, 12-bit or extended (MOVE_FLAG_EXTENDED).
             side_to_move (int): Side color (WHITE=1 or BLACK=-1).
-            promotion_piece (int, optional): Piece type to promote to (QUEEN, ROOK, BISHOP, KNIGHT), or 0 for no promotion.
+            promotion_piece (int, optional): Piece type to promote to (QUEEN, ROOK, BISHOP, KNIGHT), or 0 for no promotion (the promotion bits of an extended move, a queen otherwise).
         
         Returns:
             undo (tuple): Undo information for the move.
@@ -544,6 +698,7 @@ class Board:
         to_bitboard = 1 << to
         move_mask = from_bitboard | to_bitboard
 
+        pst = _constants.pst
         mailbox = self.mailbox
         from_piece = abs(mailbox[from_])
         to_piece = abs(mailbox[to])
@@ -554,7 +709,10 @@ class Board:
         _flip = 0 if side_to_move == WHITE else 56
         _eflip = _flip ^ 56
 
-        if not promotion_piece and from_piece == PAWN:
+        if move & MOVE_FLAG_EXTENDED:
+            if not promotion_piece:
+                promotion_piece = (move & MOVE_PROMOTION_MASK) >> MOVE_PROMOTION_SHIFT
+        elif not promotion_piece and from_piece == PAWN:
             if (side_to_move == WHITE and to >= 56) or (side_to_move == BLACK and to <= 7):
                 promotion_piece = QUEEN
 
@@ -562,13 +720,18 @@ class Board:
         mg = self.mg_score
         eg = self.eg_score
 
-        undo = (move, from_piece, to_piece, self.castling_rights, self.counter_halfmove_without_capture, en_passant_prev, promotion_piece, mg, eg, self.phase)
+        undo = (move, from_piece, to_piece, self.castling_rights, self.counter_halfmove_without_capture, en_passant_prev, promotion_piece, mg, eg, self.phase, self.zobrist_key, self.pawn_key, self.material_key)
+
+        zobrist_own = ZOBRIST_PIECES[INDEX]
+        key = self.zobrist_key ^ ZOBRIST_CASTLING[self.castling_rights] ^ ZOBRIST_EN_PASSANT[en_passant_prev]
+        key ^= zobrist_own[from_piece][from_] ^ zobrist_own[promotion_piece if promotion_piece and from_piece == PAWN else from_piece][to]
 
         self.en_passant_square = 0
 
         if to_piece:
             if to_piece == PAWN:
                 self.pawn &= ~to_bitboard
+                self.pawn_key ^= ZOBRIST_PIECES[ATT_INDEX][PAWN][to]
             elif to_piece == BISHOP:
                 self.phase -= 1
                 self.bishop &= ~to_bitboard
@@ -584,6 +747,8 @@ class Board:
 
             self.counter_halfmove_without_capture = 0
             self.board_occupied_squares[ATT_INDEX] &= ~to_bitboard
+            key ^= ZOBRIST_PIECES[ATT_INDEX][to_piece][to]
+            self.material_key -= MATERIAL_KEY_UNIT[ATT_INDEX][to_piece]
 
             cap_pst = pst[to_piece]
             mg += side_to_move * cap_pst[MG_INDEX][to ^ _eflip]
@@ -594,9 +759,12 @@ class Board:
 
         if from_piece == PAWN:
             self.counter_halfmove_without_capture = 0
+            zobrist_pawn = zobrist_own[PAWN]
 
             if promotion_piece:
                 self.pawn &= ~from_bitboard
+                self.pawn_key ^= zobrist_pawn[from_]
+                self.material_key += MATERIAL_KEY_UNIT[INDEX][promotion_piece] - MATERIAL_KEY_UNIT[INDEX][PAWN]
                 if promotion_piece == QUEEN:
                     self.queen |= to_bitboard
                     self.phase += 4
@@ -616,6 +784,7 @@ class Board:
                 eg += side_to_move * (promo_pst[EG_INDEX][to ^ _flip] - pawn_pst[EG_INDEX][from_ ^ _flip])
             else:
                 self.pawn ^= move_mask
+                self.pawn_key ^= zobrist_pawn[from_] ^ zobrist_pawn[to]
 
                 p = pst[PAWN]
                 p_mg = p[MG_INDEX]
@@ -628,10 +797,13 @@ class Board:
                     self.en_passant_square = (from_ + to) >> 1
 
                 elif en_passant_prev != 0 and to == en_passant_prev:
-                    captured_pawn_square = to - 8 if side_to_move == WHITE else to + 8
+                    captured_pawn_square = to ^ 8  # one rank behind the en passant square, for both colors
                     captured_pawn_bitboard = 1 << captured_pawn_square
                     self.pawn &= ~captured_pawn_bitboard
                     self.board_occupied_squares[ATT_INDEX] &= ~captured_pawn_bitboard
+                    key ^= ZOBRIST_PIECES[ATT_INDEX][PAWN][captured_pawn_square]
+                    self.pawn_key ^= ZOBRIST_PIECES[ATT_INDEX][PAWN][captured_pawn_square]
+                    self.material_key -= MATERIAL_KEY_UNIT[ATT_INDEX][PAWN]
                     
                     ep_pst = pst[PAWN]
                     mg += side_to_move * ep_pst[MG_INDEX][captured_pawn_square ^ _eflip]
@@ -670,23 +842,12 @@ class Board:
             eg += side_to_move * (k[EG_INDEX][to ^ _flip] - k[EG_INDEX][from_ ^ _flip])
 
             d = to - from_
-            if d == 2:
-                rook_from = 7 if side_to_move == WHITE else 63
-                rook_to = 5 if side_to_move == WHITE else 61
-                rook_move_mask = (1 << rook_from) | (1 << rook_to)
-                self.rook ^= rook_move_mask
-                self.board_occupied_squares[INDEX] ^= rook_move_mask
-
-                r = pst[ROOK]
-                mg += side_to_move * (r[MG_INDEX][rook_to ^ _flip] - r[MG_INDEX][rook_from ^ _flip])
-                eg += side_to_move * (r[EG_INDEX][rook_to ^ _flip] - r[EG_INDEX][rook_from ^ _flip])
-
-            elif d == -2:
-                rook_from = 0 if side_to_move == WHITE else 56
-                rook_to = 3 if side_to_move == WHITE else 59
+            if d == 2 or d == -2:
+                rook_from, rook_to = CASTLING_ROOK_SQUARES[to]
                 rook_move_mask = (1 << rook_from) | (1 << rook_to)
                 self.rook ^= rook_move_mask
                 self.board_occupied_squares[INDEX] ^= rook_move_mask
+                key ^= zobrist_own[ROOK][rook_from] ^ zobrist_own[ROOK][rook_to]
 
                 r = pst[ROOK]
                 mg += side_to_move * (r[MG_INDEX][rook_to ^ _flip] - r[MG_INDEX][rook_from ^ _flip])
@@ -706,17 +867,20 @@ class Board:
         mailbox[from_] = EMPTY
 
         if from_piece == PAWN and not promotion_piece and en_passant_prev != 0 and to == en_passant_prev:
-            mailbox[to - 8 if side_to_move == WHITE else to + 8] = EMPTY
+            mailbox[to ^ 8] = EMPTY
         elif from_piece == KING:
             d = to - from_
-            if d == 2:
-                mailbox[5 if side_to_move == WHITE else 61] = mailbox[7 if side_to_move == WHITE else 63]
-                mailbox[7 if side_to_move == WHITE else 63] = EMPTY
-            elif d == -2:
-                mailbox[3 if side_to_move == WHITE else 59] = mailbox[0 if side_to_move == WHITE else 56]
-                mailbox[0 if side_to_move == WHITE else 56] = EMPTY
+            if d == 2 or d == -2:
+                rook_from, rook_to = CASTLING_ROOK_SQUARES[to]
+                mailbox[rook_to] = mailbox[rook_from]
+                mailbox[rook_from] = EMPTY
 
         self.castling_rights &= CASTLING_UPDATE[from_] & CASTLING_UPDATE[to]
+        # search does not call change_side(): the side key is toggled here, so that the key tells
+        # the side to move apart and compares equal to the keys pushed by add_to_history()
+        key ^= ZOBRIST_CASTLING[self.castling_rights] ^ ZOBRIST_EN_PASSANT[self.en_passant_square] ^ ZOBRIST_SIDE
+        self.zobrist_key = key
+        self.key_stack.append(key)
 
         return undo
     
@@ -733,7 +897,7 @@ class Board:
             None
         """
 
-        move, from_piece, to_piece, castling_rights_prev, counter_halfmove_without_capture, en_passant_prev, promotion_piece = undo
+        move, from_piece, to_piece, castling_rights_prev, counter_halfmove_without_capture, en_passant_prev, promotion_piece, zobrist_key_prev = undo
 
         from_ = move & 0x3F
         to = (move >> 6) & 0x3F
@@ -748,16 +912,10 @@ class Board:
 
         if from_piece == KING:
             d = to - from_
-            if d == 2:
-                rook_from_mask = 1 << (7 if side_to_move == WHITE else 63)
-                rook_to_mask = 1 << (5 if side_to_move == WHITE else 61)
-
-                self.rook = (self.rook & ~rook_to_mask) | rook_from_mask
-                self.board_occupied_squares[INDEX] = (self.board_occupied_squares[INDEX] & ~rook_to_mask) | rook_from_mask
-
-            elif d == -2:
-                rook_from_mask = 1 << (0 if side_to_move == WHITE else 56)
-                rook_to_mask = 1 << (3 if side_to_move == WHITE else 59)
+            if d == 2 or d == -2:
+                rook_from, rook_to = CASTLING_ROOK_SQUARES[to]
+                rook_from_mask = 1 << rook_from
+                rook_to_mask = 1 << rook_to
 
                 self.rook = (self.rook & ~rook_to_mask) | rook_from_mask
                 self.board_occupied_squares[INDEX] = (self.board_occupied_squares[INDEX] & ~rook_to_mask) | rook_from_mask
@@ -777,11 +935,7 @@ class Board:
                 self.pawn = (self.pawn & ~to_bitboard) | from_bitboard
                 
                 if to == en_passant_prev and en_passant_prev != 0:
-                    if side_to_move == WHITE:
-                        captured_pawn_square = to - 8
-                    else:
-                        captured_pawn_square = to + 8
-
+                    captured_pawn_square = to ^ 8
                     captured_pawn_bitboard = 1 << captured_pawn_square
                     self.pawn |= captured_pawn_bitboard
                     self.board_occupied_squares[ATT_INDEX] |= captured_pawn_bitboard
@@ -818,6 +972,7 @@ class Board:
         self.all_board_occupied_squares = self.board_occupied_squares[WHITE_INDEX] | self.board_occupied_squares[BLACK_INDEX]
         self.counter_halfmove_without_capture = counter_halfmove_without_capture
         self.en_passant_square = en_passant_prev
+        self.zobrist_key = zobrist_key_prev
 
 
     def unmake_move_search(self, undo, side_to_move) -> None:
@@ -837,7 +992,7 @@ class Board:
             None
         """
 
-        move, from_piece, to_piece, castling_rights_prev, counter_halfmove_without_capture, en_passant_prev, promotion_piece, old_mg_score, old_eg_score, old_phase = undo
+        move, from_piece, to_piece, castling_rights_prev, counter_halfmove_without_capture, en_passant_prev, promotion_piece, old_mg_score, old_eg_score, old_phase, zobrist_key_prev, pawn_key_prev, material_key_prev = undo
 
         self.mg_score = old_mg_score
         self.eg_score = old_eg_score
@@ -865,19 +1020,8 @@ class Board:
 
         if from_piece == KING:
             d = to - from_
-            if d == 2:
-                rook_from = 7 if side_to_move == WHITE else 63
-                rook_to = 5 if side_to_move == WHITE else 61
-                rook_move_mask = (1 << rook_from) | (1 << rook_to)
-                self.rook ^= rook_move_mask
-                self.board_occupied_squares[INDEX] ^= rook_move_mask
-
-                mailbox[rook_from] = mailbox[rook_to]
-                mailbox[rook_to] = EMPTY
-
-            elif d == -2:
-                rook_from = 0 if side_to_move == WHITE else 56
-                rook_to = 3 if side_to_move == WHITE else 59
+            if d == 2 or d == -2:
+                rook_from, rook_to = CASTLING_ROOK_SQUARES[to]
                 rook_move_mask = (1 << rook_from) | (1 << rook_to)
                 self.rook ^= rook_move_mask
                 self.board_occupied_squares[INDEX] ^= rook_move_mask
@@ -900,7 +1044,7 @@ class Board:
                 self.pawn ^= move_mask
                 
                 if en_passant_prev and to == en_passant_prev:
-                    captured_pawn_square = to - 8 if side_to_move == WHITE else to + 8
+                    captured_pawn_square = to ^ 8  # one rank behind the en passant square, for both colors
                     captured_pawn_bitboard = 1 << captured_pawn_square
                     self.pawn |= captured_pawn_bitboard
                     self.board_occupied_squares[ATT_INDEX] |= captured_pawn_bitboard
@@ -940,6 +1084,10 @@ class Board:
         self.all_board_occupied_squares = self.board_occupied_squares[WHITE_INDEX] | self.board_occupied_squares[BLACK_INDEX]
         self.counter_halfmove_without_capture = counter_halfmove_without_capture
         self.en_passant_square = en_passant_prev
+        self.zobrist_key = zobrist_key_prev
+        self.pawn_key = pawn_key_prev
+        self.material_key = material_key_prev
+        self.key_stack.pop()
 
 
 class MoveGen:    
@@ -956,103 +1104,9 @@ class MoveGen:
             list: Encoded moves as (from_square | (to_square << 6)).
         """
 
-        list_p_moves = []
-        append = list_p_moves.append
-
-        all_occ = board_obj.all_board_occupied_squares
-        en_passant_square = board_obj.en_passant_square
-
-        if color == WHITE:
-            empty_board = (~all_occ) & U64
-            enemy_board = board_obj.board_occupied_squares[BLACK_INDEX]
-            pawn_board = board_obj.pawn & board_obj.board_occupied_squares[WHITE_INDEX]
-
-            move1 = (pawn_board << 8) & empty_board
-            move2 = ((move1 & RANK_MASKS[2]) << 8) & empty_board
-
-            capt1 = (pawn_board << 7) & enemy_board & ~FILE_MASKS[7]
-            capt2 = (pawn_board << 9) & enemy_board & ~FILE_MASKS[0]
-
-            while move1:
-                least_significant_bit = move1 & -move1
-                to = least_significant_bit.bit_length() - 1
-                move1 ^= least_significant_bit
-                append(to * 65 - 8)
-
-            while move2:
-                least_significant_bit = move2 & -move2
-                to = least_significant_bit.bit_length() - 1
-                move2 ^= least_significant_bit
-                append(to * 65 - 16)
-
-            while capt1:
-                least_significant_bit = capt1 & -capt1
-                to = least_significant_bit.bit_length() - 1
-                capt1 ^= least_significant_bit
-                append(to * 65 - 7)
-
-            while capt2:
-                least_significant_bit = capt2 & -capt2
-                to = least_significant_bit.bit_length() - 1
-                capt2 ^= least_significant_bit
-                append(to * 65 - 9)
-
-            if en_passant_square:
-                en_passant_SQUARE_MASKS = 1 << en_passant_square
-                en_passant_square_attackers = pawn_board & (((en_passant_SQUARE_MASKS & ~FILE_MASKS[0]) >> 9) | ((en_passant_SQUARE_MASKS & ~FILE_MASKS[7]) >> 7))
-                while en_passant_square_attackers:
-                    least_significant_bit = en_passant_square_attackers & -en_passant_square_attackers
-                    from_ = least_significant_bit.bit_length() - 1
-                    en_passant_square_attackers ^= least_significant_bit
-                    append(from_ | (en_passant_square << 6))
-
-        else:
-            empty_board = (~all_occ) & U64
-            enemy_board = board_obj.board_occupied_squares[WHITE_INDEX]
-            pawn_board = board_obj.pawn & board_obj.board_occupied_squares[BLACK_INDEX]
-
-            move1 = (pawn_board >> 8) & empty_board
-            move2 = ((move1 & RANK_MASKS[5]) >> 8) & empty_board
-
-            capt1 = (pawn_board >> 7) & enemy_board & ~FILE_MASKS[0]
-            capt2 = (pawn_board >> 9) & enemy_board & ~FILE_MASKS[7]
-
-            while move1:
-                least_significant_bit = move1 & -move1
-                to = least_significant_bit.bit_length() - 1
-                move1 ^= least_significant_bit
-                append(to * 65 + 8)
-
-            while move2:
-                least_significant_bit = move2 & -move2
-                to = least_significant_bit.bit_length() - 1
-                move2 ^= least_significant_bit
-                append(to * 65 + 16)
-
-            while capt1:
-                least_significant_bit = capt1 & -capt1
-                to = least_significant_bit.bit_length() - 1
-                capt1 ^= least_significant_bit
-                append(to * 65 + 7)
-
-            while capt2:
-                least_significant_bit = capt2 & -capt2
-                to = least_significant_bit.bit_length() - 1
-                capt2 ^= least_significant_bit
-                append(to * 65 + 9)
-
-            if en_passant_square:
-                en_passant_SQUARE_MASKS = 1 << en_passant_square
-                en_passant_square_attackers = pawn_board & (((en_passant_SQUARE_MASKS & ~FILE_MASKS[0]) << 7) | ((en_passant_SQUARE_MASKS & ~FILE_MASKS[7]) << 9))
-                while en_passant_square_attackers:
-                    least_significant_bit = en_passant_square_attackers & -en_passant_square_attackers
-                    from_ = least_significant_bit.bit_length() - 1
-                    en_passant_square_attackers ^= least_significant_bit
-                    append(from_ | (en_passant_square << 6))
+        return _PAWN_MOVES[color](board_obj)
 
-        return list_p_moves
 
-    
     @staticmethod
     def list_all_pawn_captures(board_obj, color) -> list[int]:
         """
@@ -1214,7 +1268,8 @@ class MoveGen:
         """
 
         list_k_moves = []
-        append = list_k_moves.append
+        extend = list_k_moves.extend
+        knight_moves = _constants.KNIGHT_MOVES
 
         own_occupied_squares = board_obj.board_occupied_squares[WHITE_INDEX if color == WHITE else BLACK_INDEX]
         
@@ -1227,13 +1282,7 @@ class MoveGen:
             from_ = least_significant_bit.bit_length() - 1
             knight_board &= knight_board - 1
 
-            to_possibilities = KNIGHT_TABLE[from_] & free_squares
-            while to_possibilities:
-                least_significant_bit2 = to_possibilities & -to_possibilities
-                to = least_significant_bit2.bit_length() - 1
-                to_possibilities &= to_possibilities - 1
-
-                append(from_ | (to << 6))
+            extend(knight_moves[from_][KNIGHT_TABLE[from_] & free_squares])
 
         return list_k_moves
     
@@ -1252,7 +1301,8 @@ class MoveGen:
         """
 
         list_k_captures = []
-        append = list_k_captures.append
+        extend = list_k_captures.extend
+        knight_moves = _constants.KNIGHT_MOVES
 
         knight_board = board_obj.knight & board_obj.board_occupied_squares[WHITE_INDEX if color == WHITE else BLACK_INDEX]
 
@@ -1261,13 +1311,7 @@ class MoveGen:
             from_ = least_significant_bit.bit_length() - 1
             knight_board &= knight_board - 1
 
-            to_possibilities = KNIGHT_TABLE[from_] & board_obj.board_occupied_squares[BLACK_INDEX if color == WHITE else WHITE_INDEX]
-            while to_possibilities:
-                least_significant_bit2 = to_possibilities & -to_possibilities
-                to = least_significant_bit2.bit_length() - 1
-                to_possibilities &= to_possibilities - 1
-
-                append(from_ | (to << 6))
+            extend(knight_moves[from_][KNIGHT_TABLE[from_] & board_obj.board_occupied_squares[BLACK_INDEX if color == WHITE else WHITE_INDEX]])
 
         return list_k_captures
 
@@ -1559,15 +1603,7 @@ class MoveGen:
 
         from_ = king_board.bit_length() - 1
 
-        append = list_k_moves.append
-
-        to_possibilities = KING_TABLE[from_] & free_squares
-        while to_possibilities:
-            least_significant_bit2 = to_possibilities & -to_possibilities
-            to = least_significant_bit2.bit_length() - 1
-            to_possibilities &= to_possibilities - 1
-
-            append(from_ | (to << 6))
+        list_k_moves.extend(_constants.KING_MOVES[from_][KING_TABLE[from_] & free_squares])
 
         if castling:
             list_k_moves.extend(MoveGen.list_all_castling_move(board_obj, color))
@@ -1597,27 +1633,20 @@ class MoveGen:
 
         from_ = king_board.bit_length() - 1
 
-        append = list_k_captures.append
-
-        to_possibilities = KING_TABLE[from_] & board_obj.board_occupied_squares[BLACK_INDEX if color == WHITE else WHITE_INDEX]
-        while to_possibilities:
-            least_significant_bit2 = to_possibilities & -to_possibilities
-            to = least_significant_bit2.bit_length() - 1
-            to_possibilities &= to_possibilities - 1
-
-            append(from_ | (to << 6))
+        list_k_captures.extend(_constants.KING_MOVES[from_][KING_TABLE[from_] & board_obj.board_occupied_squares[BLACK_INDEX if color == WHITE else WHITE_INDEX]])
 
         return list_k_captures
     
     
     @staticmethod
-    def list_all_castling_move(board_obj, color) -> list[int]:
+    def list_all_castling_move(board_obj, color, attacked=None) -> list[int]:
         """
         Generate all castling moves for the specified color.
 
         Args:
             board_obj (object): Board object with bitboard attributes.
             color (int): Piece color (WHITE=1 or BLACK=-1).
+            attacked (int, optional): Bitboard of the squares attacked by the enemy, see GameState.attack_map. Computed if None. Defaults to None.
         
         Returns:
             list: Encoded castling moves as (from_square | (to_square << 6)).
@@ -1627,7 +1656,6 @@ class MoveGen:
 
         rights = board_obj.castling_rights
         all_board_occupied_squares = board_obj.all_board_occupied_squares
-        attackers_to = GameState.attackers_to
         append = list_castling_moves.append
 
         if color == WHITE:
@@ -1636,13 +1664,14 @@ class MoveGen:
             if not (canKingsideCastling or canQueensideCastling):
                 return list_castling_moves
 
-            if attackers_to(board_obj, WHITE, 4):
-                return list_castling_moves
+            if attacked is None:
+                attacked = GameState.attack_map(board_obj, BLACK)
 
-            if canKingsideCastling and (not attackers_to(board_obj, WHITE, 5)):
+            # the king may not castle out of, through or into check
+            if canKingsideCastling and not (attacked & WK_SAFE):
                 append(4 | (6 << 6))
 
-            if canQueensideCastling and (not attackers_to(board_obj, WHITE, 3)):
+            if canQueensideCastling and not (attacked & WQ_SAFE):
                 append(4 | (2 << 6))
 
         else:
@@ -1651,13 +1680,13 @@ class MoveGen:
             if not (canKingsideCastling or canQueensideCastling):
                 return list_castling_moves
 
-            if attackers_to(board_obj, BLACK, 60):
-                return list_castling_moves
+            if attacked is None:
+                attacked = GameState.attack_map(board_obj, WHITE)
 
-            if canKingsideCastling and (not attackers_to(board_obj, BLACK, 61)):
+            if canKingsideCastling and not (attacked & BK_SAFE):
                 append(60 | (62 << 6))
 
-            if canQueensideCastling and (not attackers_to(board_obj, BLACK, 59)):
+            if canQueensideCastling and not (attacked & BQ_SAFE):
                 append(60 | (58 << 6))
 
         return list_castling_moves
@@ -1686,201 +1715,331 @@ class MoveGen:
 
         pinned = 0
 
-        enemy_rook_like = (board_obj.rook | board_obj.queen) & enemy_occupied_squares
-
-        if enemy_rook_like:
-            occ_rel = all_board_occupied_squares & ROOK_MASK[king_square]
-            idx = ((occ_rel * ROOK_MAGIC[king_square]) & U64) >> ROOK_SHIFT[king_square]
-            king_rook_attacks = ROOK_TABLE[king_square][idx]
-
-            own_on_ray = king_rook_attacks & own_occupied_squares
-            if own_on_ray:
-                no_own_on_ray = all_board_occupied_squares ^ own_on_ray
-                occ_rel2 = no_own_on_ray & ROOK_MASK[king_square]
-                idx2 = ((occ_rel2 * ROOK_MAGIC[king_square]) & U64) >> ROOK_SHIFT[king_square]
-
-                ray = ROOK_TABLE[king_square][idx2]
+        # enemy sliders aligned with the king (index 0 of a magic table = attacks on an empty board)
+        snipers = (
+            (ROOK_TABLE[king_square][0] & (board_obj.rook | board_obj.queen))
+            | (BISHOP_TABLE[king_square][0] & (board_obj.bishop | board_obj.queen))
+        ) & enemy_occupied_squares
 
-                pinners = ray & enemy_rook_like & ~king_rook_attacks
-                while pinners:
-                    pinner_square = (pinners & -pinners).bit_length() - 1
+        between = BETWEEN[king_square]
+        while snipers:
+            sniper_square = (snipers & -snipers).bit_length() - 1
+            snipers &= snipers - 1
 
-                    occ_rel3 = all_board_occupied_squares & ROOK_MASK[pinner_square]
-                    idx3 = ((occ_rel3 * ROOK_MAGIC[pinner_square]) & U64) >> ROOK_SHIFT[pinner_square]
-                    pinned |= ROOK_TABLE[pinner_square][idx3] & king_rook_attacks & own_occupied_squares
-
-                    pinners &= pinners - 1
-
-
-        enemy_bishop_like = (board_obj.bishop | board_obj.queen) & enemy_occupied_squares
-
-        if enemy_bishop_like:
-            occ_rel = all_board_occupied_squares & BISHOP_MASK[king_square]
-            idx = ((occ_rel * BISHOP_MAGIC[king_square]) & U64) >> BISHOP_SHIFT[king_square]
-            king_bishop_attacks = BISHOP_TABLE[king_square][idx]
-
-            own_on_ray = king_bishop_attacks & own_occupied_squares
-            if own_on_ray:
-                no_own_on_ray = all_board_occupied_squares ^ own_on_ray
-                occ_rel2 = no_own_on_ray & BISHOP_MASK[king_square]
-                idx2 = ((occ_rel2 * BISHOP_MAGIC[king_square]) & U64) >> BISHOP_SHIFT[king_square]
-
-                ray = BISHOP_TABLE[king_square][idx2]
-
-                pinners = ray & enemy_bishop_like & ~king_bishop_attacks
-                while pinners:
-                    pinner_square = (pinners & -pinners).bit_length() - 1
-
-                    occ_rel3 = all_board_occupied_squares & BISHOP_MASK[pinner_square]
-                    idx3 = ((occ_rel3 * BISHOP_MAGIC[pinner_square]) & U64) >> BISHOP_SHIFT[pinner_square]
-                    pinned |= BISHOP_TABLE[pinner_square][idx3] & king_bishop_attacks & own_occupied_squares
-
-                    pinners &= pinners - 1
+            # a single piece between the king and the sniper is pinned if it is ours
+            blockers = between[sniper_square] & all_board_occupied_squares
+            if blockers and not (blockers & (blockers - 1)):
+                pinned |= blockers & own_occupied_squares
 
         return pinned
 
     @staticmethod
-    def list_all_legal_moves(board_obj, side, castling = True) -> list[int]:
+    def get_check_and_pin_masks(board_obj, side) -> "tuple[int, int, int]":
         """
-        Generate all legal moves for a side (excluding moves leaving king in check).
-        
+        Compute the masks used by the legal generators to emit legal moves without make/unmake.
+
         Args:
             board_obj (object): Board object with bitboard attributes.
             side (int): Side color (WHITE=1 or BLACK=-1).
-            castling (bool, optional): Whether to include castling moves. Defaults to True.
-        
+
         Returns:
-            list: Encoded legal moves as (from_square | (to_square << 6)).
+            tuple[int, int, int]: (checkers, check_mask, pinned).
+                checkers: enemy pieces giving check.
+                check_mask: squares a piece other than the king may move to, the checker and the
+                    squares between it and the king in single check, every square when not in check.
+                pinned: own pieces pinned to the king, a pinned piece on `square` can only move
+                    along LINE[king_square][square].
         """
-        
-        list_all_moves = []
-        append = list_all_moves.append
 
         INDEX = WHITE_INDEX if side == WHITE else BLACK_INDEX
         ENEMY_INDEX = 1 - INDEX
+        king_square = board_obj.king_square[INDEX]
 
-        make = board_obj.make_move
-        unmake = board_obj.unmake_move
+        checkers = GameState.get_all_attackers(board_obj, king_square) & board_obj.board_occupied_squares[ENEMY_INDEX]
+        check_mask = (BETWEEN[king_square][checkers.bit_length() - 1] | checkers) if checkers else U64
+        pinned = MoveGen.get_pinned_pieces(board_obj, king_square, INDEX, ENEMY_INDEX)
 
-        attackers_to = GameState.attackers_to
-        king_squares = board_obj.king_square
+        return checkers, check_mask, pinned
 
-        in_check = attackers_to(board_obj, side, king_squares[INDEX])
 
-        if in_check:
-            for move in MoveGen.list_all_pawn_moves(board_obj, side):
-                undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
-                unmake(undo, side)
+    @staticmethod
+    def _legal_en_passant_pawns(board_obj, color, king_square, check_mask) -> int:
+        # bitboard of the pawns that can legally capture en passant
+        en_passant_square = board_obj.en_passant_square
+        if not en_passant_square:
+            return 0
 
-            for move in MoveGen.list_all_knight_moves(board_obj, side):
-                undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
-                unmake(undo, side)
+        INDEX = WHITE_INDEX if color == WHITE else BLACK_INDEX
+        enemy_board = board_obj.board_occupied_squares[1 - INDEX]
+        pawn_board = board_obj.pawn & board_obj.board_occupied_squares[INDEX]
+        all_occ = board_obj.all_board_occupied_squares
 
-            for move in MoveGen.list_all_bishop_moves(board_obj, side):
-                undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
-                unmake(undo, side)
+        en_passant_mask = 1 << en_passant_square
+        if color == WHITE:
+            captured_mask = en_passant_mask >> 8
+            en_passant_square_attackers = pawn_board & (((en_passant_mask & ~FILE_MASKS[0]) >> 9) | ((en_passant_mask & ~FILE_MASKS[7]) >> 7))
+        else:
+            captured_mask = en_passant_mask << 8
+            en_passant_square_attackers = pawn_board & (((en_passant_mask & ~FILE_MASKS[0]) << 7) | ((en_passant_mask & ~FILE_MASKS[7]) << 9))
 
-            for move in MoveGen.list_all_rook_moves(board_obj, side):
-                undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
-                unmake(undo, side)
+        # in check, en passant must capture the checking pawn or block the checking ray
+        if not (en_passant_mask | captured_mask) & check_mask:
+            return 0
 
-            for move in MoveGen.list_all_queen_moves(board_obj, side):
-                undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
-                unmake(undo, side)
+        enemy_rooks = (board_obj.rook | board_obj.queen) & enemy_board
+        enemy_bishops = (board_obj.bishop | board_obj.queen) & enemy_board
 
-            for move in MoveGen.list_all_king_moves(board_obj, side, castling):
-                undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
-                unmake(undo, side)
+        legal_pawns = 0
+        while en_passant_square_attackers:
+            from_mask = en_passant_square_attackers & -en_passant_square_attackers
+            en_passant_square_attackers ^= from_mask
 
-            return list_all_moves
-        
-        en_passant_square = board_obj.en_passant_square
-        pinned = MoveGen.get_pinned_pieces(board_obj, king_squares[INDEX], INDEX, ENEMY_INDEX)
+            # both pawns leave their squares: look for a slider reaching the king through them
+            # (pin of the capturing pawn, or the rare horizontal pin of the two pawns)
+            occ_after = (all_occ ^ from_mask ^ captured_mask) | en_passant_mask
+            rook_idx = ((occ_after & ROOK_MASK[king_square]) * ROOK_MAGIC[king_square] & U64) >> ROOK_SHIFT[king_square]
+            bishop_idx = ((occ_after & BISHOP_MASK[king_square]) * BISHOP_MAGIC[king_square] & U64) >> BISHOP_SHIFT[king_square]
 
-        if not pinned and not en_passant_square:
-            list_all_moves.extend(MoveGen.list_all_pawn_moves(board_obj, side))
-        else:
-            for move in MoveGen.list_all_pawn_moves(board_obj, side):
-                from_square = move & 0b111111
-                to_square = (move >> 6) & 0b111111
+            if not (ROOK_TABLE[king_square][rook_idx] & enemy_rooks) and not (BISHOP_TABLE[king_square][bishop_idx] & enemy_bishops):
+                legal_pawns |= from_mask
 
-                if (SQUARE_MASKS[from_square] & pinned) or (en_passant_square and (to_square == en_passant_square and (from_square & 7) != (to_square & 7))):
-                    undo = make(move, side)
-                    if not attackers_to(board_obj, side, king_squares[INDEX]):
-                        append(move)
+        return legal_pawns
 
-                    unmake(undo, side)
-                else:
-                    append(move)
 
-        if not pinned:
-            list_all_moves.extend(MoveGen.list_all_knight_moves(board_obj, side))
-        else:
-            for move in MoveGen.list_all_knight_moves(board_obj, side):
-                if not (SQUARE_MASKS[move & 0b111111] & pinned):
-                    append(move)    
+    @staticmethod
+    def _legal_pawn_moves(board_obj, color, king_square, pinned, check_mask) -> list[int]:
+        # same moves and order as list_all_pawn_moves, restricted to the legal ones
+        return _LEGAL_PAWN_MOVES[color](board_obj, king_square, pinned, check_mask)
 
-        if not pinned:
-            list_all_moves.extend(MoveGen.list_all_bishop_moves(board_obj, side))
-        else:
-            for move in MoveGen.list_all_bishop_moves(board_obj, side):
-                if SQUARE_MASKS[move & 0b111111] & pinned:
-                    undo = make(move, side)
-                    if not attackers_to(board_obj, side, king_squares[INDEX]):
-                        append(move)
-                    unmake(undo, side)
-                else:
-                    append(move)
 
-        if not pinned:
-            list_all_moves.extend(MoveGen.list_all_rook_moves(board_obj, side))
-        else:
-            for move in MoveGen.list_all_rook_moves(board_obj, side):
-                if SQUARE_MASKS[move & 0b111111] & pinned:
-                    undo = make(move, side)
-                    if not attackers_to(board_obj, side, king_squares[INDEX]):
-                        append(move)
-                    unmake(undo, side)
-                else:
-                    append(move)
+    @staticmethod
+    def _legal_pawn_captures(board_obj, color, king_square, pinned, check_mask) -> list[int]:
+        # same moves and order as list_all_pawn_captures, restricted to the legal ones
+        return _LEGAL_PAWN_CAPTURES[color](board_obj, king_square, pinned, check_mask)
 
-        if not pinned:
-            list_all_moves.extend(MoveGen.list_all_queen_moves(board_obj, side))
-        else:
-            for move in MoveGen.list_all_queen_moves(board_obj, side):
-                if SQUARE_MASKS[move & 0b111111] & pinned:
-                    undo = make(move, side)
-                    if not attackers_to(board_obj, side, king_squares[INDEX]):
-                        append(move)
-                    unmake(undo, side)
-                else:
-                    append(move)
 
-        for move in MoveGen.list_all_king_moves(board_obj, side, castling):
-            undo = make(move, side)
-            if not attackers_to(board_obj, side, king_squares[INDEX]):
-                append(move)
-            unmake(undo, side)
-        
-        return list_all_moves
-    
+    @staticmethod
+    def _legal_pawn_quiets(board_obj, color, king_square, pinned, check_mask) -> list[int]:
+        # same moves and order as list_all_pawn_quiets, restricted to the legal ones
+        return _LEGAL_PAWN_QUIETS[color](board_obj, king_square, pinned, check_mask)
+
 
     @staticmethod
-    def generate_all_moves(board_obj, side, castling = True):
+    def _split_evasions(board_obj, side, evasions) -> "tuple[list, list]":
+        # splits evasions into (captures, quiets) as the capture and quiet generators define them:
+        # en passant is a capture, promotions belong to neither (list_all_pawn_promotions)
+        INDEX = WHITE_INDEX if side == WHITE else BLACK_INDEX
+        enemy_board = board_obj.board_occupied_squares[1 - INDEX]
+        pawn_board = board_obj.pawn & board_obj.board_occupied_squares[INDEX]
+        promoting_pawns = pawn_board & (RANK_MASKS[6] if side == WHITE else RANK_MASKS[1])
+
+        en_passant_square = board_obj.en_passant_square
+        en_passant_mask = SQUARE_MASKS[en_passant_square] if en_passant_square else 0
+
+        captures = []
+        quiets = []
+        for move in evasions:
+            from_mask = SQUARE_MASKS[move & 0x3F]
+            if from_mask & promoting_pawns:
+                continue
+            to_mask = SQUARE_MASKS[(move >> 6) & 0x3F]
+            if to_mask & enemy_board or (to_mask & en_passant_mask and from_mask & pawn_board):
+                captures.append(move)
+            else:
+                quiets.append(move)
+
+        return captures, quiets
+
+
+    @staticmethod
+    def _legal_slider_moves(board_obj, pieces, targets, king_square, pinned, orthogonal, diagonal) -> list[int]:
+        # moves of rook-like (orthogonal) and/or bishop-like (diagonal) pieces to `targets`,
+        # in the order of the list_all_*_moves generators, pinned pieces kept on their pin ray
+        list_s_moves = []
+        append = list_s_moves.append
+
+        occ = board_obj.all_board_occupied_squares
+        king_line = LINE[king_square]
+
+        while pieces:
+            least_significant_bit = pieces & -pieces
+            from_ = least_significant_bit.bit_length() - 1
+            pieces ^= least_significant_bit
+
+            to_possibilities = 0
+            if orthogonal:
+                to_possibilities = ROOK_TABLE[from_][((occ & ROOK_MASK[from_]) * ROOK_MAGIC[from_] & U64) >> ROOK_SHIFT[from_]]
+            if diagonal:
+                to_possibilities |= BISHOP_TABLE[from_][((occ & BISHOP_MASK[from_]) * BISHOP_MAGIC[from_] & U64) >> BISHOP_SHIFT[from_]]
+
+            to_possibilities &= targets
+            if least_significant_bit & pinned:
+                to_possibilities &= king_line[from_]
+
+            while to_possibilities:
+                least_significant_bit2 = to_possibilities & -to_possibilities
+                to_possibilities ^= least_significant_bit2
+                append(from_ | ((least_significant_bit2.bit_length() - 1) << 6))
+
+        return list_s_moves
+
+
+    @staticmethod
+    def _evasion_piece_moves(board_obj, side, king_square, checkers) -> "tuple[list, list, list, list, list]":
+        # moves of the pieces other than the king that capture the single checker or block its ray,
+        # returned per piece type: (pawns, knights, bishops, rooks, queens)
+        INDEX = WHITE_INDEX if side == WHITE else BLACK_INDEX
+        own_occupied_squares = board_obj.board_occupied_squares[INDEX]
+
+        pinned = MoveGen.get_pinned_pieces(board_obj, king_square, INDEX, 1 - INDEX)
+        check_mask = BETWEEN[king_square][checkers.bit_length() - 1] | checkers
+
+        # a pinned piece can neither capture the checker nor block it: its pin ray and the
+        # checking ray only meet on the king
+        movable = own_occupied_squares & ~pinned
+
+        # pieces that reach a square of the check mask on an empty board, the others are skipped
+        knight_reach = rook_reach = bishop_reach = 0
+        squares = check_mask
+        while squares:
+            square = (squares & -squares).bit_length() - 1
+            squares &= squares - 1
+            knight_reach |= KNIGHT_TABLE[square]
+            rook_reach |= ROOK_TABLE[square][0]
+            bishop_reach |= BISHOP_TABLE[square][0]
+
+        pawn_moves = MoveGen._legal_pawn_moves(board_obj, side, king_square, pinned, check_mask)
+
+        # the check mask holds the checker and empty squares, never one of our pieces
+        knight_moves = []
+        extend = knight_moves.extend
+        knight_move_lists = _constants.KNIGHT_MOVES
+        knight_board = board_obj.knight & movable & knight_reach
+        while knight_board:
+            from_ = (knight_board & -knight_board).bit_length() - 1
+            knight_board &= knight_board - 1
+            extend(knight_move_lists[from_][KNIGHT_TABLE[from_] & check_mask])
+
+        slider_moves = MoveGen._legal_slider_moves
+        bishop_moves = slider_moves(board_obj, board_obj.bishop & movable & bishop_reach, check_mask, king_square, 0, False, True)
+        rook_moves = slider_moves(board_obj, board_obj.rook & movable & rook_reach, check_mask, king_square, 0, True, False)
+        queen_moves = slider_moves(board_obj, board_obj.queen & movable & (rook_reach | bishop_reach), check_mask, king_square, 0, True, True)
+
+        return pawn_moves, knight_moves, bishop_moves, rook_moves, queen_moves
+
+
+    @staticmethod
+    def list_all_evasions(board_obj, side, checkers=None) -> list[int]:
+        """
+        Generate all legal moves of a side in check.
+
+        In double check only king moves to unattacked squares are generated. In single check, the
+        other pieces only generate captures of the checker and interpositions on its ray; pinned
+        pieces and pieces that cannot reach those squares are skipped.
+        Moves are in the order of list_all_legal_moves (pawns, knights, bishops, rooks, queens, king).
+
+        Args:
+            board_obj (object): Board object with bitboard attributes.
+            side (int): Side color (WHITE=1 or BLACK=-1), must be in check.
+            checkers (int, optional): Bitboard of the checking pieces, computed if None.
+
+        Returns:
+            list: Encoded legal moves as (from_square | (to_square << 6)).
+        """
+
+        INDEX = WHITE_INDEX if side == WHITE else BLACK_INDEX
+        king_square = board_obj.king_square[INDEX]
+
+        if checkers is None:
+            checkers = GameState.get_all_attackers(board_obj, king_square) & board_obj.board_occupied_squares[1 - INDEX]
+
+        # the king is lifted off the board so that it cannot step back along a checking ray
+        attacked = GameState.attack_map(board_obj, -side, board_obj.all_board_occupied_squares ^ SQUARE_MASKS[king_square])
+        king_moves = _constants.KING_MOVES[king_square][KING_TABLE[king_square] & ~(board_obj.board_occupied_squares[INDEX] | attacked)]
+
+        # in double check only the king can move
+        if checkers & (checkers - 1):
+            return list(king_moves)
+
+        pawn_moves, knight_moves, bishop_moves, rook_moves, queen_moves = MoveGen._evasion_piece_moves(board_obj, side, king_square, checkers)
+
+        list_e_moves = pawn_moves
+        list_e_moves += knight_moves
+        list_e_moves += bishop_moves
+        list_e_moves += rook_moves
+        list_e_moves += queen_moves
+        list_e_moves += king_moves
+        return list_e_moves
+
+
+    @staticmethod
+    def generate_evasions(board_obj, side, checkers=None):
+        """
+        Generate all legal moves of a side in check, king moves first.
+
+        Same moves as list_all_evasions, in the order of generate_all_moves (king, queens, knights,
+        bishops, rooks, pawns). The other pieces are only generated once the king moves are consumed,
+        and not at all in double check.
+
+        Args:
+            board_obj (object): Board object with bitboard attributes.
+            side (int): Side color (WHITE=1 or BLACK=-1), must be in check.
+            checkers (int, optional): Bitboard of the checking pieces, computed if None.
+
+        Yields:
+            generator: Yields encoded moves as (from_square | (to_square << 6)).
+        """
+
+        INDEX = WHITE_INDEX if side == WHITE else BLACK_INDEX
+        king_square = board_obj.king_square[INDEX]
+
+        if checkers is None:
+            checkers = GameState.get_all_attackers(board_obj, king_square) & board_obj.board_occupied_squares[1 - INDEX]
+
+        # the king is lifted off the board so that it cannot step back along a checking ray
+        attacked = GameState.attack_map(board_obj, -side, board_obj.all_board_occupied_squares ^ SQUARE_MASKS[king_square])
+        yield from _constants.KING_MOVES[king_square][KING_TABLE[king_square] & ~(board_obj.board_occupied_squares[INDEX] | attacked)]
+
+        # in double check only the king can move
+        if checkers & (checkers - 1):
+            return
+
+        pawn_moves, knight_moves, bishop_moves, rook_moves, queen_moves = MoveGen._evasion_piece_moves(board_obj, side, king_square, checkers)
+
+        yield from queen_moves
+        yield from knight_moves
+        yield from bishop_moves
+        yield from rook_moves
+        yield from pawn_moves
+
+
+    @staticmethod
+    def list_all_legal_moves(board_obj, side, castling = True) -> list[int]:
+        """
+        Generate all legal moves for a side (excluding moves leaving king in check).
+
+        In check the moves come from list_all_evasions. Otherwise the pinned pieces are computed
+        first and each piece only generates its legal targets, without make/unmake.
+        
+        Args:
+            board_obj (object): Board object with bitboard attributes.
+            side (int): Side color (WHITE=1 or BLACK=-1).
+            castling (bool, optional): Whether to include castling moves. Defaults to True.
+        
+        Returns:
+            list: Encoded legal moves as (from_square | (to_square << 6)).
+        """
+
+        return _LIST_ALL_LEGAL_MOVES[side](board_obj, castling)
+
+    @staticmethod
+    def generate_all_moves(board_obj, side, castling = True):
         """
         Generate all legal moves for a side (excluding moves leaving king in check).
+
+        In check the moves come from generate_evasions. Otherwise the same masks as
+        list_all_legal_moves are used, the moves of each piece type are only generated
+        when the previous ones have been consumed.
         
         Args:
             board_obj (object): Board object with bitboard attributes.
@@ -1891,293 +2050,299 @@ class MoveGen:
             generator: Yields encoded moves as (from_square | (to_square << 6)).
         """
 
-        make = board_obj.make_move
-        unmake = board_obj.unmake_move
-        attackers_to = GameState.attackers_to
-        
         INDEX = WHITE_INDEX if side == WHITE else BLACK_INDEX
-        ENEMY_INDEX = 1 - INDEX
-
+        own_occupied_squares = board_obj.board_occupied_squares[INDEX]
         king_square = board_obj.king_square[INDEX]
-        in_check = attackers_to(board_obj, side, king_square)
 
-        if in_check:
-            for e in MoveGen.list_all_king_moves(board_obj, side, castling):
-                undo = make(e, side)
-                if not attackers_to(board_obj, side, board_obj.king_square[INDEX]):
-                    unmake(undo, side)
-                    yield e
+        checkers = GameState.get_all_attackers(board_obj, king_square) & board_obj.board_occupied_squares[1 - INDEX]
+        if checkers:
+            yield from MoveGen.generate_evasions(board_obj, side, checkers)
+            return
 
-                else:
-                    unmake(undo, side)
+        # squares the enemy attacks once our king is lifted off the board
+        attacked = GameState.attack_map(board_obj, -side, board_obj.all_board_occupied_squares ^ SQUARE_MASKS[king_square])
 
-            for e in MoveGen.list_all_queen_moves(board_obj, side):
-                undo = make(e, side)
-                if not attackers_to(board_obj, side, king_square):
-                    unmake(undo, side)
-                    yield e
-                    
-                else:
-                    unmake(undo, side)
+        yield from _constants.KING_MOVES[king_square][KING_TABLE[king_square] & ~(own_occupied_squares | attacked)]
 
-            for e in MoveGen.list_all_knight_moves(board_obj, side):
-                undo = make(e, side)
-                if not attackers_to(board_obj, side, king_square):
-                    unmake(undo, side)
-                    yield e
+        if castling:
+            yield from MoveGen.list_all_castling_move(board_obj, side, attacked)
 
-                else:
-                    unmake(undo, side)
+        pinned = MoveGen.get_pinned_pieces(board_obj, king_square, INDEX, 1 - INDEX)
+        targets = ~own_occupied_squares & U64
+        slider_moves = MoveGen._legal_slider_moves
 
-            for e in MoveGen.list_all_bishop_moves(board_obj, side):
-                undo = make(e, side)
-                if not attackers_to(board_obj, side, king_square):
-                    unmake(undo, side)
-                    yield e
-                    
-                else:
-                    unmake(undo, side)
+        yield from slider_moves(board_obj, board_obj.queen & own_occupied_squares, targets, king_square, pinned, True, True)
 
-            for e in MoveGen.list_all_rook_moves(board_obj, side):
-                undo = make(e, side)
-                if not attackers_to(board_obj, side, king_square):
-                    unmake(undo, side)
-                    yield e
+        # a pinned knight can never move
+        knight_moves = _constants.KNIGHT_MOVES
+        knight_board = board_obj.knight & own_occupied_squares & ~pinned
+        while knight_board:
+            from_ = (knight_board & -knight_board).bit_length() - 1
+            knight_board &= knight_board - 1
+            yield from knight_moves[from_][KNIGHT_TABLE[from_] & targets]
 
-                else:
-                    unmake(undo, side)
-                    
-            for e in MoveGen.list_all_pawn_moves(board_obj, side):
-                undo = make(e, side)
-                if not attackers_to(board_obj, side, king_square):
-                    unmake(undo, side)
-                    yield e
+        yield from slider_moves(board_obj, board_obj.bishop & own_occupied_squares, targets, king_square, pinned, False, True)
+        yield from slider_moves(board_obj, board_obj.rook & own_occupied_squares, targets, king_square, pinned, True, False)
+        yield from MoveGen._legal_pawn_moves(board_obj, side, king_square, pinned, U64)
 
-                else:
-                    unmake(undo, side)
+    @staticmethod
+    def count_legal_moves(board_obj, side) -> int:
+        """
+        Count the legal moves of a side without generating them.
 
-            return
-        
-        pinned = MoveGen.get_pinned_pieces(board_obj, king_square, INDEX, ENEMY_INDEX)
-        en_passant_square = board_obj.en_passant_square
+        Uses the same check and pin masks as list_all_legal_moves, but only popcounts the target
+        bitboard of each piece, so no encoded move is built. Counts the moves list_all_legal_moves
+        would return (castling included, one move per promotion).
 
-        for e in MoveGen.list_all_king_moves(board_obj, side, castling):
-            undo = make(e, side)
-            if not attackers_to(board_obj, side, board_obj.king_square[INDEX]):
-                unmake(undo, side)
-                yield e
+        Args:
+            board_obj (object): Board object with bitboard attributes.
+            side (int): Side color (WHITE=1 or BLACK=-1).
 
-            else:
-                unmake(undo, side)
+        Returns:
+            int: Number of legal moves.
+        """
 
-        if not pinned:
-            yield from MoveGen.list_all_queen_moves(board_obj, side)
-        else:
-            for e in MoveGen.list_all_queen_moves(board_obj, side):
-                if SQUARE_MASKS[e & 0x3F] & pinned:
-                    undo = make(e, side)
-                    if not attackers_to(board_obj, side, king_square):
-                        unmake(undo, side)
-                        yield e
-                    else:
-                        unmake(undo, side)
-                else:
-                    yield e
+        return _COUNT_LEGAL_MOVES[side](board_obj)
 
-        if not pinned:
-            yield from MoveGen.list_all_knight_moves(board_obj, side)
-        else:
-            for e in MoveGen.list_all_knight_moves(board_obj, side):
-                if not (SQUARE_MASKS[e & 0x3F] & pinned):
-                    yield e
+    @staticmethod
+    def move_targets(board_obj, side) -> "list[tuple[int, int]]":
+        """
+        Give the legal target squares of each piece of a side as bitboards.
 
-        if not pinned:
-            yield from MoveGen.list_all_bishop_moves(board_obj, side)
-        else:
-            for e in MoveGen.list_all_bishop_moves(board_obj, side):
-                if SQUARE_MASKS[e & 0x3F] & pinned:
-                    undo = make(e, side)
-                    if not attackers_to(board_obj, side, king_square):
-                        unmake(undo, side)
-                        yield e
-                    else:
-                        unmake(undo, side)
-                else:
-                    yield e
+        Uses the same check and pin masks as count_legal_moves, but keeps the target bitboard of
+        each piece instead of popcounting it, so a caller can test, count or intersect the moves
+        (e.g. with an attack map) without any encoded move being built. Castling adds the king's
+        destination square to the king's targets, en passant adds the en passant square to the
+        capturing pawn's targets. A promotion is a single target square.
 
-        if not pinned:
-            yield from MoveGen.list_all_rook_moves(board_obj, side)
-        else:
-            for e in MoveGen.list_all_rook_moves(board_obj, side):
-                if SQUARE_MASKS[e & 0x3F] & pinned:
-                    undo = make(e, side)
-                    if not attackers_to(board_obj, side, king_square):
-                        unmake(undo, side)
-                        yield e
-                    else:
-                        unmake(undo, side)
-                else:
-                    yield e
+        Args:
+            board_obj (object): Board object with bitboard attributes.
+            side (int): Side color (WHITE=1 or BLACK=-1).
 
-        if not pinned and not en_passant_square:
-            yield from MoveGen.list_all_pawn_moves(board_obj, side)
+        Returns:
+            list[tuple[int, int]]: (from_square, target_bitboard) pairs, pieces without a legal move left out.
+        """
 
-        else:
-            for e in MoveGen.list_all_pawn_moves(board_obj, side):
-                from_square = e & 0x3F
-                to_square = (e >> 6) & 0x3F
-
-                if (SQUARE_MASKS[from_square] & pinned) or (en_passant_square and to_square == en_passant_square and (from_square & 7) != (to_square & 7)):
-                    undo = make(e, side)
-                    if not attackers_to(board_obj, side, king_square):
-                        unmake(undo, side)
-                        yield e
-                    else:
-                        unmake(undo, side)
-                else:
-                    yield e
+        INDEX = WHITE_INDEX if side == WHITE else BLACK_INDEX
+        board_occupied_squares = board_obj.board_occupied_squares
+        own_occupied_squares = board_occupied_squares[INDEX]
+        enemy_board = board_occupied_squares[1 - INDEX]
+        all_occ = board_obj.all_board_occupied_squares
+        king_square = board_obj.king_square[INDEX]
+
+        checkers, check_mask, pinned = MoveGen.get_check_and_pin_masks(board_obj, side)
 
+        # squares the enemy attacks once our king is lifted off the board
+        attacked = GameState.attack_map(board_obj, -side, all_occ ^ SQUARE_MASKS[king_square])
+        king_targets = KING_TABLE[king_square] & ~(own_occupied_squares | attacked)
 
+        # in double check only the king can move
+        if checkers & (checkers - 1):
+            return [(king_square, king_targets)] if king_targets else []
+
+        if not checkers:
+            for move in MoveGen.list_all_castling_move(board_obj, side, attacked):
+                king_targets |= SQUARE_MASKS[(move >> 6) & 0b111111]
+
+        move_targets = []
+        append = move_targets.append
+        if king_targets:
+            append((king_square, king_targets))
+
+        targets = ~own_occupied_squares & check_mask
+        king_line = LINE[king_square]
+
+        # a pinned knight can never move
+        knight_board = board_obj.knight & own_occupied_squares & ~pinned
+        while knight_board:
+            from_ = (knight_board & -knight_board).bit_length() - 1
+            knight_board &= knight_board - 1
+            attacks = KNIGHT_TABLE[from_] & targets
+            if attacks:
+                append((from_, attacks))
+
+        queen_board = board_obj.queen
+        slider_board = (board_obj.rook | board_obj.bishop | queen_board) & own_occupied_squares
+        while slider_board:
+            from_mask = slider_board & -slider_board
+            slider_board ^= from_mask
+            from_ = from_mask.bit_length() - 1
+
+            attacks = 0
+            if from_mask & (board_obj.rook | queen_board):
+                attacks |= ROOK_TABLE[from_][(((all_occ & ROOK_MASK[from_]) * ROOK_MAGIC[from_]) & U64) >> ROOK_SHIFT[from_]]
+            if from_mask & (board_obj.bishop | queen_board):
+                attacks |= BISHOP_TABLE[from_][(((all_occ & BISHOP_MASK[from_]) * BISHOP_MAGIC[from_]) & U64) >> BISHOP_SHIFT[from_]]
+
+            attacks &= targets
+            if from_mask & pinned:
+                attacks &= king_line[from_]
+            if attacks:
+                append((from_, attacks))
+
+        empty_board = ~all_occ & U64
+        pawn_board = board_obj.pawn & own_occupied_squares
+        pawn_attacks = PAWN_TABLE[INDEX]
+        en_passant_pawns = MoveGen._legal_en_passant_pawns(board_obj, side, king_square, check_mask)
+        en_passant_mask = SQUARE_MASKS[board_obj.en_passant_square] if en_passant_pawns else 0
+
+        while pawn_board:
+            from_mask = pawn_board & -pawn_board
+            pawn_board ^= from_mask
+            from_ = from_mask.bit_length() - 1
+
+            if side == WHITE:
+                push = (from_mask << 8) & empty_board
+                if push & RANK_MASKS[2]:
+                    push |= (push << 8) & empty_board
+            else:
+                push = (from_mask >> 8) & empty_board
+                if push & RANK_MASKS[5]:
+                    push |= (push >> 8) & empty_board
+
+            attacks = (push | (pawn_attacks[from_] & enemy_board)) & check_mask
+            if from_mask & pinned:
+                attacks &= king_line[from_]
+            # en passant legality (pins, checks, the horizontal double pin) is already settled
+            if from_mask & en_passant_pawns:
+                attacks |= en_passant_mask
+            if attacks:
+                append((from_, attacks))
+
+        return move_targets
 
     @staticmethod
-    def list_all_legal_captures(board_obj, side) -> list[int]:
+    def perft(board_obj, side, depth) -> int:
         """
-        Generate all legal captures for a side (excluding moves leaving king in check).
-        
+        Count the leaf nodes of the legal move tree (move generation validation and benchmark).
+
+        The moves of the last ply are counted with count_legal_moves instead of being generated
+        and played (bulk counting). Promotions count as one move, like in list_all_legal_moves.
+
         Args:
             board_obj (object): Board object with bitboard attributes.
-            side (int): Side color (WHITE=1 or BLACK=-1).
+            side (int): Side to move (WHITE=1 or BLACK=-1).
+            depth (int): Number of plies.
 
         Returns:
-            list: Encoded moves as (from_square | (to_square << 6)).
+            int: Number of positions reached after `depth` plies.
         """
 
-        list_all_captures = []
-        append = list_all_captures.append
-
-        INDEX = WHITE_INDEX if side == WHITE else BLACK_INDEX
-        ENEMY_INDEX = 1 - INDEX
+        if depth <= 1:
+            return MoveGen.count_legal_moves(board_obj, side) if depth == 1 else 1
 
+        nodes = 0
         make = board_obj.make_move
         unmake = board_obj.unmake_move
-        attackers_to = GameState.attackers_to
-        king_squares = board_obj.king_square
-
-        in_check = attackers_to(board_obj, side, king_squares[INDEX])
-
-        if in_check:
-            for move in MoveGen.list_all_pawn_captures(board_obj, side):
+        if depth == 2:
+            count_legal_moves = _COUNT_LEGAL_MOVES[-side]
+            for move in MoveGen.list_all_legal_moves(board_obj, side):
                 undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
+                nodes += count_legal_moves(board_obj)
                 unmake(undo, side)
+            return nodes
 
-            for move in MoveGen.list_all_knight_captures(board_obj, side):
-                undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
-                unmake(undo, side)
+        for move in MoveGen.list_all_legal_moves(board_obj, side):
+            undo = make(move, side)
+            nodes += MoveGen.perft(board_obj, -side, depth - 1)
+            unmake(undo, side)
 
-            for move in MoveGen.list_all_bishop_captures(board_obj, side):
-                undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
-                unmake(undo, side)
+        return nodes
 
-            for move in MoveGen.list_all_rook_captures(board_obj, side):
-                undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
-                unmake(undo, side)
 
-            for move in MoveGen.list_all_queen_captures(board_obj, side):
-                undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
-                unmake(undo, side)
 
-            for move in MoveGen.list_all_king_captures(board_obj, side, False):
-                undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
-                unmake(undo, side)
+    @staticmethod
+    def extend_move(board_obj, move, promotion_piece=0) -> int:
+        """
+        Convert a 12-bit move to the extended encoding, in the position it is played from.
 
-            return list_all_captures
+        Args:
+            board_obj (object): Board object with bitboard attributes.
+            move (int): Encoded move as (from_square | (to_square << 6)).
+            promotion_piece (int, optional): Piece type to promote to, QUEEN if 0 and the move promotes. Defaults to 0.
 
-        en_passant_square = board_obj.en_passant_square
-        pinned = MoveGen.get_pinned_pieces(board_obj, king_squares[INDEX], INDEX, ENEMY_INDEX)
+        Returns:
+            int: Move with its promotion piece and MOVE_FLAG_* bits set.
+        """
 
-        if not pinned and not en_passant_square:
-            list_all_captures.extend(MoveGen.list_all_pawn_captures(board_obj, side))
-        else:
-            for move in MoveGen.list_all_pawn_captures(board_obj, side):
-                from_square = move & 0b111111
-                to_square = (move >> 6) & 0b111111
-
-                if (SQUARE_MASKS[from_square] & pinned) or (en_passant_square and (to_square == en_passant_square and (from_square & 7) != (to_square & 7))):
-                    undo = make(move, side)
-                    if not attackers_to(board_obj, side, king_squares[INDEX]):
-                        append(move)
-                    unmake(undo, side)
-                else:
-                    append(move)
+        from_ = move & 0x3F
+        to = (move >> 6) & 0x3F
+        from_mask = SQUARE_MASKS[from_]
+        to_mask = SQUARE_MASKS[to]
 
-        if not pinned:
-            list_all_captures.extend(MoveGen.list_all_knight_captures(board_obj, side))
-        else:
-            for move in MoveGen.list_all_knight_captures(board_obj, side):
-                if not (SQUARE_MASKS[move & 0b111111] & pinned):
-                    append(move)
+        extended_move = (move & MOVE_SQUARES_MASK) | MOVE_FLAG_EXTENDED
+        if board_obj.all_board_occupied_squares & to_mask:
+            extended_move |= MOVE_FLAG_CAPTURE
 
-        if not pinned:
-            list_all_captures.extend(MoveGen.list_all_bishop_captures(board_obj, side))
-        else:
-            for move in MoveGen.list_all_bishop_captures(board_obj, side):
-                if SQUARE_MASKS[move & 0b111111] & pinned:
-                    undo = make(move, side)
-                    if not attackers_to(board_obj, side, king_squares[INDEX]):
-                        append(move)
-                    unmake(undo, side)
-                else:
-                    append(move)
+        if board_obj.pawn & from_mask:
+            if to_mask & (RANK_MASKS[0] | RANK_MASKS[7]):
+                extended_move |= (promotion_piece or QUEEN) << MOVE_PROMOTION_SHIFT
+            elif to - from_ == 16 or to - from_ == -16:
+                extended_move |= MOVE_FLAG_DOUBLE_PUSH
+            elif to == board_obj.en_passant_square and (to - from_) & 7:
+                extended_move |= MOVE_FLAG_CAPTURE | MOVE_FLAG_EN_PASSANT
 
-        if not pinned:
-            list_all_captures.extend(MoveGen.list_all_rook_captures(board_obj, side))
-        else:
-            for move in MoveGen.list_all_rook_captures(board_obj, side):
-                if SQUARE_MASKS[move & 0b111111] & pinned:
-                    undo = make(move, side)
-                    if not attackers_to(board_obj, side, king_squares[INDEX]):
-                        append(move)
-                    unmake(undo, side)
-                else:
-                    append(move)
+        elif board_obj.king & from_mask and (to - from_ == 2 or to - from_ == -2):
+            extended_move |= MOVE_FLAG_CASTLE
 
-        if not pinned:
-            list_all_captures.extend(MoveGen.list_all_queen_captures(board_obj, side))
-        else:
-            for move in MoveGen.list_all_queen_captures(board_obj, side):
-                if SQUARE_MASKS[move & 0b111111] & pinned:
-                    undo = make(move, side)
-                    if not attackers_to(board_obj, side, king_squares[INDEX]):
-                        append(move)
-                    unmake(undo, side)
-                else:
-                    append(move)
+        return extended_move
 
-        for move in MoveGen.list_all_king_captures(board_obj, side, False):
-            undo = make(move, side)
-            if not attackers_to(board_obj, side, king_squares[INDEX]):
-                append(move)
-            unmake(undo, side)
 
+    @staticmethod
+    def list_all_legal_captures(board_obj, side) -> list[int]:
+        """
+        Generate all legal captures for a side (excluding moves leaving king in check).
+
+        In check the captures are taken from list_all_evasions. Otherwise the masks of
+        get_check_and_pin_masks restrict each piece to its legal captures, without make/unmake.
+        
+        Args:
+            board_obj (object): Board object with bitboard attributes.
+            side (int): Side color (WHITE=1 or BLACK=-1).
+
+        Returns:
+            list: Encoded moves as (from_square | (to_square << 6)).
+        """
+
+        checkers, check_mask, pinned = MoveGen.get_check_and_pin_masks(board_obj, side)
+        if checkers:
+            return MoveGen._split_evasions(board_obj, side, MoveGen.list_all_evasions(board_obj, side, checkers))[0]
+
+        INDEX = WHITE_INDEX if side == WHITE else BLACK_INDEX
+        own_occupied_squares = board_obj.board_occupied_squares[INDEX]
+        targets = board_obj.board_occupied_squares[1 - INDEX]
+        king_square = board_obj.king_square[INDEX]
+
+        list_all_captures = MoveGen._legal_pawn_captures(board_obj, side, king_square, pinned, check_mask)
+        extend = list_all_captures.extend
+
+        # a pinned knight can never move
+        knight_moves = _constants.KNIGHT_MOVES
+        knight_board = board_obj.knight & own_occupied_squares & ~pinned
+        while knight_board:
+            from_ = (knight_board & -knight_board).bit_length() - 1
+            knight_board &= knight_board - 1
+            extend(knight_moves[from_][KNIGHT_TABLE[from_] & targets])
+
+        slider_moves = MoveGen._legal_slider_moves
+        extend(slider_moves(board_obj, board_obj.bishop & own_occupied_squares, targets, king_square, pinned, False, True))
+        extend(slider_moves(board_obj, board_obj.rook & own_occupied_squares, targets, king_square, pinned, True, False))
+        extend(slider_moves(board_obj, board_obj.queen & own_occupied_squares, targets, king_square, pinned, True, True))
+
+        # squares the enemy attacks once our king is lifted off the board
+        attacked = GameState.attack_map(board_obj, -side, board_obj.all_board_occupied_squares ^ SQUARE_MASKS[king_square])
+
+        extend(_constants.KING_MOVES[king_square][KING_TABLE[king_square] & targets & ~attacked])
+        
         return list_all_captures
-    
 
     @staticmethod
     def generate_all_captures(board_obj, side):
         """
         Generate all legal captures for a side (excluding moves leaving king in check).
+
+        Same moves as list_all_legal_captures, in the order of generate_all_moves (king, queens,
+        knights, bishops, rooks, pawns).
         
         Args:
             board_obj (object): Board object with bitboard attributes.
@@ -2187,53 +2352,35 @@ class MoveGen:
             generator: Yields encoded moves as (from_square | (to_square << 6)).
         """
 
-        make = board_obj.make_move
-        unmake = board_obj.unmake_move
-        attackers_to = GameState.attackers_to
-        king_square = board_obj.king_square
+        checkers, check_mask, pinned = MoveGen.get_check_and_pin_masks(board_obj, side)
+        if checkers:
+            yield from MoveGen._split_evasions(board_obj, side, MoveGen.generate_evasions(board_obj, side, checkers))[0]
+            return
+
         INDEX = WHITE_INDEX if side == WHITE else BLACK_INDEX
+        own_occupied_squares = board_obj.board_occupied_squares[INDEX]
+        targets = board_obj.board_occupied_squares[1 - INDEX]
+        king_square = board_obj.king_square[INDEX]
 
-        for e in MoveGen.list_all_king_captures(board_obj, side, castling = False):
-            undo = make(e, side)
-            legal = not attackers_to(board_obj, side, king_square[INDEX])
-            unmake(undo, side)
-            if legal:
-                yield e
+        # squares the enemy attacks once our king is lifted off the board
+        attacked = GameState.attack_map(board_obj, -side, board_obj.all_board_occupied_squares ^ SQUARE_MASKS[king_square])
 
-        for e in MoveGen.list_all_queen_captures(board_obj, side):
-            undo = make(e, side)
-            legal = not attackers_to(board_obj, side, king_square[INDEX])
-            unmake(undo, side)
-            if legal:
-                yield e
-        
-        for e in MoveGen.list_all_knight_captures(board_obj, side):
-            undo = make(e, side)
-            legal = not attackers_to(board_obj, side, king_square[INDEX])
-            unmake(undo, side)
-            if legal:
-                yield e
-    
-        for e in MoveGen.list_all_bishop_captures(board_obj, side):
-            undo = make(e, side)
-            legal = not attackers_to(board_obj, side, king_square[INDEX])
-            unmake(undo, side)
-            if legal:
-                yield e
+        yield from _constants.KING_MOVES[king_square][KING_TABLE[king_square] & targets & ~attacked]
 
-        for e in MoveGen.list_all_rook_captures(board_obj, side):
-            undo = make(e, side)
-            legal = not attackers_to(board_obj, side, king_square[INDEX])
-            unmake(undo, side)
-            if legal:
-                yield e
-        
-        for e in MoveGen.list_all_pawn_captures(board_obj, side):
-            undo = make(e, side)
-            legal = not attackers_to(board_obj, side, king_square[INDEX])
-            unmake(undo, side)
-            if legal:
-                yield e
+        slider_moves = MoveGen._legal_slider_moves
+        yield from slider_moves(board_obj, board_obj.queen & own_occupied_squares, targets, king_square, pinned, True, True)
+
+        # a pinned knight can never move
+        knight_moves = _constants.KNIGHT_MOVES
+        knight_board = board_obj.knight & own_occupied_squares & ~pinned
+        while knight_board:
+            from_ = (knight_board & -knight_board).bit_length() - 1
+            knight_board &= knight_board - 1
+            yield from knight_moves[from_][KNIGHT_TABLE[from_] & targets]
+
+        yield from slider_moves(board_obj, board_obj.bishop & own_occupied_squares, targets, king_square, pinned, False, True)
+        yield from slider_moves(board_obj, board_obj.rook & own_occupied_squares, targets, king_square, pinned, True, False)
+        yield from MoveGen._legal_pawn_captures(board_obj, side, king_square, pinned, check_mask)
 
 
     @staticmethod
@@ -2348,7 +2495,8 @@ class MoveGen:
         """
 
         list_k_quiets = []
-        append = list_k_quiets.append
+        extend = list_k_quiets.extend
+        knight_moves = _constants.KNIGHT_MOVES
 
         knight_board = board_obj.knight & board_obj.board_occupied_squares[WHITE_INDEX if color == WHITE else BLACK_INDEX]
         empty_squares = (~board_obj.all_board_occupied_squares) & U64
@@ -2358,13 +2506,7 @@ class MoveGen:
             from_ = least_significant_bit.bit_length() - 1
             knight_board &= knight_board - 1
 
-            to_possibilities = KNIGHT_TABLE[from_] & empty_squares
-            while to_possibilities:
-                least_significant_bit2 = to_possibilities & -to_possibilities
-                to = least_significant_bit2.bit_length() - 1
-                to_possibilities &= to_possibilities - 1
-
-                append(from_ | (to << 6))
+            extend(knight_moves[from_][KNIGHT_TABLE[from_] & empty_squares])
 
         return list_k_quiets
 
@@ -2526,15 +2668,7 @@ class MoveGen:
 
         from_ = king_board.bit_length() - 1
 
-        append = list_k_quiets.append
-
-        to_possibilities = KING_TABLE[from_] & empty_squares
-        while to_possibilities:
-            least_significant_bit2 = to_possibilities & -to_possibilities
-            to = least_significant_bit2.bit_length() - 1
-            to_possibilities &= to_possibilities - 1
-
-            append(from_ | (to << 6))
+        list_k_quiets.extend(_constants.KING_MOVES[from_][KING_TABLE[from_] & empty_squares])
 
         if castling:
             list_k_quiets.extend(MoveGen.list_all_castling_move(board_obj, color))
@@ -2547,6 +2681,9 @@ class MoveGen:
         """
         Generate all legal quiet moves (non-captures) for a side (excluding moves leaving king in check).
 
+        In check the quiet moves are taken from list_all_evasions. Otherwise the masks of
+        get_check_and_pin_masks restrict each piece to its legal quiet moves, without make/unmake.
+
         Args:
             board_obj (object): Board object with bitboard attributes.
             side (int): Side color (WHITE=1 or BLACK=-1).
@@ -2556,185 +2693,218 @@ class MoveGen:
             list: Encoded legal quiet moves as (from_square | (to_square << 6)).
         """
 
-        list_all_quiets = []
-        append = list_all_quiets.append
+        checkers, check_mask, pinned = MoveGen.get_check_and_pin_masks(board_obj, side)
+        if checkers:
+            return MoveGen._split_evasions(board_obj, side, MoveGen.list_all_evasions(board_obj, side, checkers))[1]
 
         INDEX = WHITE_INDEX if side == WHITE else BLACK_INDEX
-        ENEMY_INDEX = 1 - INDEX
+        own_occupied_squares = board_obj.board_occupied_squares[INDEX]
+        targets = ~board_obj.all_board_occupied_squares & U64
+        king_square = board_obj.king_square[INDEX]
 
-        make = board_obj.make_move
-        unmake = board_obj.unmake_move
-        attackers_to = GameState.attackers_to
-        king_squares = board_obj.king_square
+        list_all_quiets = MoveGen._legal_pawn_quiets(board_obj, side, king_square, pinned, check_mask)
+        extend = list_all_quiets.extend
 
-        in_check = attackers_to(board_obj, side, king_squares[INDEX])
+        # a pinned knight can never move
+        knight_moves = _constants.KNIGHT_MOVES
+        knight_board = board_obj.knight & own_occupied_squares & ~pinned
+        while knight_board:
+            from_ = (knight_board & -knight_board).bit_length() - 1
+            knight_board &= knight_board - 1
+            extend(knight_moves[from_][KNIGHT_TABLE[from_] & targets])
 
-        if in_check:
-            for move in MoveGen.list_all_pawn_quiets(board_obj, side):
-                undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
-                unmake(undo, side)
+        slider_moves = MoveGen._legal_slider_moves
+        extend(slider_moves(board_obj, board_obj.bishop & own_occupied_squares, targets, king_square, pinned, False, True))
+        extend(slider_moves(board_obj, board_obj.rook & own_occupied_squares, targets, king_square, pinned, True, False))
+        extend(slider_moves(board_obj, board_obj.queen & own_occupied_squares, targets, king_square, pinned, True, True))
 
-            for move in MoveGen.list_all_knight_quiets(board_obj, side):
-                undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
-                unmake(undo, side)
+        # squares the enemy attacks once our king is lifted off the board
+        attacked = GameState.attack_map(board_obj, -side, board_obj.all_board_occupied_squares ^ SQUARE_MASKS[king_square])
 
-            for move in MoveGen.list_all_bishop_quiets(board_obj, side):
-                undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
-                unmake(undo, side)
+        extend(_constants.KING_MOVES[king_square][KING_TABLE[king_square] & targets & ~attacked])
 
-            for move in MoveGen.list_all_rook_quiets(board_obj, side):
-                undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
-                unmake(undo, side)
+        if castling:
+            extend(MoveGen.list_all_castling_move(board_obj, side, attacked))
 
-            for move in MoveGen.list_all_queen_quiets(board_obj, side):
-                undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
-                unmake(undo, side)
+        return list_all_quiets
 
-            for move in MoveGen.list_all_king_quiets(board_obj, side, castling):
-                undo = make(move, side)
-                if not attackers_to(board_obj, side, king_squares[INDEX]):
-                    append(move)
-                unmake(undo, side)
 
-            return list_all_quiets
+    @staticmethod
+    def generate_all_quiets(board_obj, side, castling=True):
+        """
+        Generate all legal quiet moves (non-captures) for a side (excluding moves leaving king in check).
 
-        pinned = MoveGen.get_pinned_pieces(board_obj, king_squares[INDEX], INDEX, ENEMY_INDEX)
+        Same moves as list_all_legal_quiets, in the order of generate_all_moves (king, castling,
+        queens, knights, bishops, rooks, pawns).
 
-        if not pinned:
-            list_all_quiets.extend(MoveGen.list_all_pawn_quiets(board_obj, side))
-        else:
-            for move in MoveGen.list_all_pawn_quiets(board_obj, side):
-                if SQUARE_MASKS[move & 0b111111] & pinned:
-                    undo = make(move, side)
-                    if not attackers_to(board_obj, side, king_squares[INDEX]):
-                        append(move)
-                    unmake(undo, side)
-                else:
-                    append(move)
+        Args:
+            board_obj (object): Board object with bitboard attributes.
+            side (int): Side color (WHITE=1 or BLACK=-1).
+            castling (bool, optional): Whether to include castling moves. Defaults to True.
 
-        if not pinned:
-            list_all_quiets.extend(MoveGen.list_all_knight_quiets(board_obj, side))
-        else:
-            for move in MoveGen.list_all_knight_quiets(board_obj, side):
-                if not (SQUARE_MASKS[move & 0b111111] & pinned):
-                    append(move)
+        Yields:
+            generator: Yields encoded quiet moves as (from_square | (to_square << 6)).
+        """
 
-        if not pinned:
-            list_all_quiets.extend(MoveGen.list_all_bishop_quiets(board_obj, side))
-        else:
-            for move in MoveGen.list_all_bishop_quiets(board_obj, side):
-                if SQUARE_MASKS[move & 0b111111] & pinned:
-                    undo = make(move, side)
-                    if not attackers_to(board_obj, side, king_squares[INDEX]):
-                        append(move)
-                    unmake(undo, side)
-                else:
-                    append(move)
+        checkers, check_mask, pinned = MoveGen.get_check_and_pin_masks(board_obj, side)
+        if checkers:
+            yield from MoveGen._split_evasions(board_obj, side, MoveGen.generate_evasions(board_obj, side, checkers))[1]
+            return
 
-        if not pinned:
-            list_all_quiets.extend(MoveGen.list_all_rook_quiets(board_obj, side))
-        else:
-            for move in MoveGen.list_all_rook_quiets(board_obj, side):
-                if SQUARE_MASKS[move & 0b111111] & pinned:
-                    undo = make(move, side)
-                    if not attackers_to(board_obj, side, king_squares[INDEX]):
-                        append(move)
-                    unmake(undo, side)
-                else:
-                    append(move)
+        INDEX = WHITE_INDEX if side == WHITE else BLACK_INDEX
+        own_occupied_squares = board_obj.board_occupied_squares[INDEX]
+        targets = ~board_obj.all_board_occupied_squares & U64
+        king_square = board_obj.king_square[INDEX]
 
-        if not pinned:
-            list_all_quiets.extend(MoveGen.list_all_queen_quiets(board_obj, side))
-        else:
-            for move in MoveGen.list_all_queen_quiets(board_obj, side):
-                if SQUARE_MASKS[move & 0b111111] & pinned:
-                    undo = make(move, side)
-                    if not attackers_to(board_obj, side, king_squares[INDEX]):
-                        append(move)
-                    unmake(undo, side)
-                else:
-                    append(move)
+        # squares the enemy attacks once our king is lifted off the board
+        attacked = GameState.attack_map(board_obj, -side, board_obj.all_board_occupied_squares ^ SQUARE_MASKS[king_square])
 
-        for move in MoveGen.list_all_king_quiets(board_obj, side, castling):
-            undo = make(move, side)
-            if not attackers_to(board_obj, side, king_squares[INDEX]):
-                append(move)
-            unmake(undo, side)
+        yield from _constants.KING_MOVES[king_square][KING_TABLE[king_square] & targets & ~attacked]
 
-        return list_all_quiets
+        if castling:
+            yield from MoveGen.list_all_castling_move(board_obj, side, attacked)
+
+        slider_moves = MoveGen._legal_slider_moves
+        yield from slider_moves(board_obj, board_obj.queen & own_occupied_squares, targets, king_square, pinned, True, True)
+
+        # a pinned knight can never move
+        knight_moves = _constants.KNIGHT_MOVES
+        knight_board = board_obj.knight & own_occupied_squares & ~pinned
+        while knight_board:
+            from_ = (knight_board & -knight_board).bit_length() - 1
+            knight_board &= knight_board - 1
+            yield from knight_moves[from_][KNIGHT_TABLE[from_] & targets]
+
+        yield from slider_moves(board_obj, board_obj.bishop & own_occupied_squares, targets, king_square, pinned, False, True)
+        yield from slider_moves(board_obj, board_obj.rook & own_occupied_squares, targets, king_square, pinned, True, False)
+        yield from MoveGen._legal_pawn_quiets(board_obj, side, king_square, pinned, check_mask)
 
 
     @staticmethod
-    def generate_all_quiets(board_obj, side, castling=True):
+    def generate_quiet_checks(board_obj, side):
         """
-        Generate all legal quiet moves (non-captures) for a side (excluding moves leaving king in check).
+        Generate the legal quiet moves that give check, for the first ply of a quiescence search.
+
+        A move checks directly when it lands on a checking square of its piece type (the squares
+        attacking the enemy king, computed once from its square). It checks by discovery when it
+        moves one of our pieces off the line between one of our sliders and the enemy king, these
+        blockers being found by get_pinned_pieces with our sliders as the snipers. Only those
+        pieces and squares are looked at, the quiet move list is never generated. Captures and
+        promotions come from get_captures_and_promotions.
 
         Args:
             board_obj (object): Board object with bitboard attributes.
             side (int): Side color (WHITE=1 or BLACK=-1).
-            castling (bool, optional): Whether to include castling moves. Defaults to True.
 
         Yields:
-            generator: Yields encoded quiet moves as (from_square | (to_square << 6)).
+            generator: Yields encoded quiet moves (castling included) as (from_square | (to_square << 6)).
         """
 
-        make = board_obj.make_move
-        unmake = board_obj.unmake_move
-        attackers_to = GameState.attackers_to
-        king_square = board_obj.king_square
         INDEX = WHITE_INDEX if side == WHITE else BLACK_INDEX
+        ENEMY_INDEX = 1 - INDEX
 
-        for e in MoveGen.list_all_king_quiets(board_obj, side, castling):
-            undo = make(e, side)
-            legal = not attackers_to(board_obj, side, king_square[INDEX])
-            unmake(undo, side)
-            if legal:
-                yield e
+        own_occupied_squares = board_obj.board_occupied_squares[INDEX]
+        all_occ = board_obj.all_board_occupied_squares
+        empty_board = ~all_occ & U64
 
-        for e in MoveGen.list_all_queen_quiets(board_obj, side):
-            undo = make(e, side)
-            legal = not attackers_to(board_obj, side, king_square[INDEX])
-            unmake(undo, side)
-            if legal:
-                yield e
+        king_square = board_obj.king_square[INDEX]
+        enemy_king_square = board_obj.king_square[ENEMY_INDEX]
+        enemy_king_line = LINE[enemy_king_square]
 
-        for e in MoveGen.list_all_knight_quiets(board_obj, side):
-            undo = make(e, side)
-            legal = not attackers_to(board_obj, side, king_square[INDEX])
-            unmake(undo, side)
-            if legal:
-                yield e
+        checkers, check_mask, pinned = MoveGen.get_check_and_pin_masks(board_obj, side)
+        king_line = LINE[king_square]
 
-        for e in MoveGen.list_all_bishop_quiets(board_obj, side):
-            undo = make(e, side)
-            legal = not attackers_to(board_obj, side, king_square[INDEX])
-            unmake(undo, side)
-            if legal:
-                yield e
+        # our pieces alone between one of our sliders and the enemy king
+        discovered = MoveGen.get_pinned_pieces(board_obj, enemy_king_square, INDEX, INDEX)
 
-        for e in MoveGen.list_all_rook_quiets(board_obj, side):
-            undo = make(e, side)
-            legal = not attackers_to(board_obj, side, king_square[INDEX])
-            unmake(undo, side)
-            if legal:
-                yield e
+        # checking squares of each piece type
+        rook_checks = ROOK_TABLE[enemy_king_square][((all_occ & ROOK_MASK[enemy_king_square]) * ROOK_MAGIC[enemy_king_square] & U64) >> ROOK_SHIFT[enemy_king_square]]
+        bishop_checks = BISHOP_TABLE[enemy_king_square][((all_occ & BISHOP_MASK[enemy_king_square]) * BISHOP_MAGIC[enemy_king_square] & U64) >> BISHOP_SHIFT[enemy_king_square]]
+        knight_checks = KNIGHT_TABLE[enemy_king_square]
+        pawn_checks = INVERTED_PAWN_TABLE[INDEX][enemy_king_square]
 
-        for e in MoveGen.list_all_pawn_quiets(board_obj, side):
-            undo = make(e, side)
-            legal = not attackers_to(board_obj, side, king_square[INDEX])
-            unmake(undo, side)
-            if legal:
-                yield e
+        # in double check only the king can move
+        if not checkers & (checkers - 1):
+            quiet_targets = empty_board & check_mask
+
+            pawn_board = board_obj.pawn & own_occupied_squares
+            discovered_pawns = pawn_board & discovered
+            if side == WHITE:
+                move1 = (pawn_board << 8) & empty_board & ~RANK_MASKS[7]
+                move2 = ((move1 & RANK_MASKS[2]) << 8) & empty_board
+                move1 &= pawn_checks | (discovered_pawns << 8)
+                move2 &= pawn_checks | (discovered_pawns << 16)
+                push_offset = -8
+            else:
+                move1 = (pawn_board >> 8) & empty_board & ~RANK_MASKS[0]
+                move2 = ((move1 & RANK_MASKS[5]) >> 8) & empty_board
+                move1 &= pawn_checks | (discovered_pawns >> 8)
+                move2 &= pawn_checks | (discovered_pawns >> 16)
+                push_offset = 8
+
+            for pushes, offset in ((move1 & check_mask, push_offset), (move2 & check_mask, 2 * push_offset)):
+                while pushes:
+                    to_mask = pushes & -pushes
+                    pushes ^= to_mask
+                    to = to_mask.bit_length() - 1
+                    from_ = to + offset
+
+                    # a push along the line to the enemy king discovers nothing
+                    if not to_mask & pawn_checks and to_mask & enemy_king_line[from_]:
+                        continue
+                    if SQUARE_MASKS[from_] & pinned and not to_mask & king_line[from_]:
+                        continue
+                    yield from_ | (to << 6)
+
+            # a pinned knight can never move, a discovering one checks from any square
+            knight_moves = _constants.KNIGHT_MOVES
+            knight_board = board_obj.knight & own_occupied_squares & ~pinned
+            while knight_board:
+                from_mask = knight_board & -knight_board
+                knight_board ^= from_mask
+                from_ = from_mask.bit_length() - 1
+                yield from knight_moves[from_][KNIGHT_TABLE[from_] & quiet_targets & (U64 if from_mask & discovered else knight_checks)]
+
+            # a discovering slider always leaves the line (on it, it would already give check)
+            slider_moves = MoveGen._legal_slider_moves
+            bishops = board_obj.bishop & own_occupied_squares
+            rooks = board_obj.rook & own_occupied_squares
+            queens = board_obj.queen & own_occupied_squares
+
+            yield from slider_moves(board_obj, bishops & discovered, quiet_targets, king_square, pinned, False, True)
+            yield from slider_moves(board_obj, bishops & ~discovered, quiet_targets & bishop_checks, king_square, pinned, False, True)
+            yield from slider_moves(board_obj, rooks & discovered, quiet_targets, king_square, pinned, True, False)
+            yield from slider_moves(board_obj, rooks & ~discovered, quiet_targets & rook_checks, king_square, pinned, True, False)
+            yield from slider_moves(board_obj, queens, quiet_targets & (rook_checks | bishop_checks), king_square, pinned, True, True)
+
+        attacked = None
+
+        # the king only checks by discovery
+        if SQUARE_MASKS[king_square] & discovered:
+            attacked = GameState.attack_map(board_obj, -side, all_occ ^ SQUARE_MASKS[king_square])
+            yield from _constants.KING_MOVES[king_square][KING_TABLE[king_square] & empty_board & ~attacked & ~enemy_king_line[king_square]]
+
+        if not checkers and board_obj.castling_rights & (CR_WK | CR_WQ if side == WHITE else CR_BK | CR_BQ) and king_square == (4 if side == WHITE else 60):
+            rook_like = (board_obj.rook | board_obj.queen) & own_occupied_squares
+            bishop_like = (board_obj.bishop | board_obj.queen) & own_occupied_squares
+
+            # test the check first, the castling legality needs the enemy attack map
+            castling_checks = []
+            for to, rook_from, rook_to in ((king_square + 2, king_square + 3, king_square + 1), (king_square - 2, king_square - 4, king_square - 1)):
+                rook_move_mask = SQUARE_MASKS[rook_from] | SQUARE_MASKS[rook_to]
+
+                # check by the castled rook, or by a slider the king or the rook uncovered
+                occ_after = all_occ ^ SQUARE_MASKS[king_square] ^ SQUARE_MASKS[to] ^ rook_move_mask
+                rook_idx = ((occ_after & ROOK_MASK[enemy_king_square]) * ROOK_MAGIC[enemy_king_square] & U64) >> ROOK_SHIFT[enemy_king_square]
+                bishop_idx = ((occ_after & BISHOP_MASK[enemy_king_square]) * BISHOP_MAGIC[enemy_king_square] & U64) >> BISHOP_SHIFT[enemy_king_square]
+
+                if ROOK_TABLE[enemy_king_square][rook_idx] & (rook_like ^ rook_move_mask) or BISHOP_TABLE[enemy_king_square][bishop_idx] & bishop_like:
+                    castling_checks.append(king_square | (to << 6))
+
+            if castling_checks:
+                for move in MoveGen.list_all_castling_move(board_obj, side, attacked):
+                    if move in castling_checks:
+                        yield move
 
 
     @staticmethod
@@ -2910,27 +3080,17 @@ class MoveGen:
         empty_squares = ~board_obj.all_board_occupied_squares & U64
 
         knight = board_obj.knight & own_occ
+        knight_moves = _constants.KNIGHT_MOVES
 
         while knight:
             least_significant_bit = knight & -knight
-            from_ = least_significant_bit.bit_length() - 1
-            knight &= knight - 1
-
-            attacks = KNIGHT_TABLE[from_]
-
-            capts = attacks & enemy_occ
-            while capts:
-                least_significant_bit2 = capts & -capts
-                to = least_significant_bit2.bit_length() - 1
-                capts &= capts - 1
-                captures_list.append(from_ | (to << 6))
+            from_ = least_significant_bit.bit_length() - 1
+            knight &= knight - 1
 
-            qts = attacks & empty_squares
-            while qts:
-                least_significant_bit2 = qts & -qts
-                to = least_significant_bit2.bit_length() - 1
-                qts &= qts - 1
-                quiets_list.append(from_ | (to << 6))
+            attacks = KNIGHT_TABLE[from_]
+
+            captures_list.extend(knight_moves[from_][attacks & enemy_occ])
+            quiets_list.extend(knight_moves[from_][attacks & empty_squares])
 
 
     @staticmethod
@@ -3087,20 +3247,10 @@ class MoveGen:
         from_ = king.bit_length() - 1
 
         attacks = KING_TABLE[from_]
+        king_moves = _constants.KING_MOVES[from_]
 
-        capts = attacks & enemy_occ
-        while capts:
-            least_significant_bit2 = capts & -capts
-            to = least_significant_bit2.bit_length() - 1
-            capts &= capts - 1
-            captures_list.append(from_ | (to << 6))
-
-        qts = attacks & empty_squares
-        while qts:
-            least_significant_bit2 = qts & -qts
-            to = least_significant_bit2.bit_length() - 1
-            qts &= qts - 1
-            quiets_list.append(from_ | (to << 6))
+        captures_list.extend(king_moves[attacks & enemy_occ])
+        quiets_list.extend(king_moves[attacks & empty_squares])
 
         if castling:
             for mv in MoveGen.list_all_castling_move(board_obj, color):
@@ -3245,14 +3395,11 @@ class MoveGen:
                     captures_list.append(from_ | (en_passant_square << 6))
 
         knight = board_obj.knight & own_occ
+        knight_moves = _constants.KNIGHT_MOVES
         while knight:
             from_ = (knight & -knight).bit_length() - 1
             knight &= knight - 1
-            capts = KNIGHT_TABLE[from_] & enemy_occ
-            while capts:
-                to = (capts & -capts).bit_length() - 1
-                capts &= capts - 1
-                captures_list.append(from_ | (to << 6))
+            captures_list.extend(knight_moves[from_][KNIGHT_TABLE[from_] & enemy_occ])
 
         bishop = board_obj.bishop & own_occ
         while bishop:
@@ -3294,11 +3441,7 @@ class MoveGen:
 
         king = board_obj.king & own_occ
         from_ = king.bit_length() - 1
-        capts = KING_TABLE[from_] & enemy_occ
-        while capts:
-            to = (capts & -capts).bit_length() - 1
-            capts &= capts - 1
-            captures_list.append(from_ | (to << 6))
+        captures_list.extend(_constants.KING_MOVES[from_][KING_TABLE[from_] & enemy_occ])
 
 
 
@@ -3389,6 +3532,196 @@ class GameState:
         return bb_attackers
 
 
+    @staticmethod
+    def attack_map(board_obj, side, occupied = None) -> int:
+        """
+        Get every square attacked by a side.
+
+        Args:
+            board_obj (object): Board object with bitboard attributes.
+            side (int): Attacking side color (WHITE=1 or BLACK=-1).
+            occupied (int, optional): Bitboard of occupied squares to consider for sliding pieces. If None, uses board_obj.all_board_occupied_squares. Pass it without the defending king to see the squares behind it. Defaults to None.
+
+        Returns:
+            int: Bitboard of the attacked squares.
+        """
+
+        if occupied is None:
+            occupied = board_obj.all_board_occupied_squares
+
+        return _ATTACK_MAP[side](board_obj, occupied)
+
+
+    @staticmethod
+    def _see_move(board_obj, move) -> "tuple[int, int, int, int, int]":
+        # (to_square, side, occupied after the move, value won by the move, value of the piece left on to_square)
+        piece_values = _constants.PIECE_VALUES
+        from_square = move & 0x3F
+        to_square = (move >> 6) & 0x3F
+        from_mask = SQUARE_MASKS[from_square]
+        to_mask = SQUARE_MASKS[to_square]
+
+        side = WHITE if board_obj.board_occupied_squares[WHITE_INDEX] & from_mask else BLACK
+        piece = board_obj.get_piece_type_with_mask(from_mask)
+        occupied = board_obj.all_board_occupied_squares ^ from_mask
+
+        if piece == KING and abs(to_square - from_square) == 2:
+            # castling exchanges nothing
+            return to_square, side, occupied, 0, 0
+
+        captured = board_obj.get_piece_type_with_mask(to_mask)
+        gain = piece_values[captured] if captured else 0
+        occupied |= to_mask
+
+        if piece == PAWN:
+            if to_square == board_obj.en_passant_square and not captured:
+                gain = piece_values[PAWN]
+                occupied ^= SQUARE_MASKS[to_square - 8 if side == WHITE else to_square + 8]
+            elif to_mask & (RANK_MASKS[0] | RANK_MASKS[7]):
+                # promoted to a queen
+                gain += piece_values[QUEEN] - piece_values[PAWN]
+                piece = QUEEN
+
+        return to_square, side, occupied, gain, piece_values[piece]
+
+
+    @staticmethod
+    def see(board_obj, move) -> int:
+        """
+        Static Exchange Evaluation: material won by a move once all the captures on its target square are played out.
+
+        Each side recaptures with its least valuable attacker and may stop when it would lose material.
+        Sliders behind the capturing pieces (x-rays) join the exchange as the line opens. Pins are ignored.
+        Uses PIECE_VALUES, an en passant capture wins a pawn and a promotion counts as a queen.
+
+        Args:
+            board_obj (object): Board object with bitboard attributes.
+            move (int): Encoded move as (from_square | (to_square << 6)).
+
+        Returns:
+            int: Material balance of the exchange for the moving side (negative if it loses material).
+        """
+
+        to_square, side, occupied, gain, attacker_value = GameState._see_move(board_obj, move)
+        if not attacker_value:
+            return gain
+
+        piece_values = _constants.PIECE_VALUES
+        occ_sides = board_obj.board_occupied_squares
+        pieces = (board_obj.pawn, board_obj.knight, board_obj.bishop, board_obj.rook, board_obj.queen, board_obj.king)
+        bishop_like = board_obj.bishop | board_obj.queen
+        rook_like = board_obj.rook | board_obj.queen
+
+        gains = [gain]
+        attackers = GameState.get_all_attackers(board_obj, to_square, occupied)
+        INDEX = BLACK_INDEX if side == WHITE else WHITE_INDEX
+
+        while True:
+            side_attackers = attackers & occupied & occ_sides[INDEX]
+            if not side_attackers:
+                break
+
+            for piece, bitboard in enumerate(pieces, PAWN):
+                bitboard &= side_attackers
+                if bitboard:
+                    break
+
+            # the king may not capture a defended piece
+            if piece == KING and attackers & occupied & occ_sides[1 - INDEX]:
+                break
+
+            # the piece now on the square is captured by the least valuable attacker
+            gains.append(attacker_value - gains[-1])
+            occupied ^= bitboard & -bitboard
+            attacker_value = piece_values[piece]
+
+            # x-rays: sliders behind the piece that just left
+            if piece == PAWN or piece == BISHOP or piece == QUEEN:
+                attackers |= BISHOP_TABLE[to_square][((occupied & BISHOP_MASK[to_square]) * BISHOP_MAGIC[to_square] & U64) >> BISHOP_SHIFT[to_square]] & bishop_like
+            if piece == ROOK or piece == QUEEN:
+                attackers |= ROOK_TABLE[to_square][((occupied & ROOK_MASK[to_square]) * ROOK_MAGIC[to_square] & U64) >> ROOK_SHIFT[to_square]] & rook_like
+
+            INDEX = 1 - INDEX
+
+        # each side chooses between capturing and standing pat, from the last capture back
+        for depth in range(len(gains) - 1, 0, -1):
+            gains[depth - 1] = -max(-gains[depth - 1], gains[depth])
+
+        return gains[0]
+
+
+    @staticmethod
+    def see_ge(board_obj, move, threshold=0) -> bool:
+        """
+        Check that the Static Exchange Evaluation of a move is at least a threshold.
+
+        Same exchange as GameState.see, but stops as soon as the result is known, usually after
+        one or two captures. This is the variant to prune or order captures in the search.
+
+        Args:
+            board_obj (object): Board object with bitboard attributes.
+            move (int): Encoded move as (from_square | (to_square << 6)).
+            threshold (int, optional): Material balance to reach. Defaults to 0.
+
+        Returns:
+            bool: True if GameState.see(board_obj, move) >= threshold.
+        """
+
+        to_square, side, occupied, gain, attacker_value = GameState._see_move(board_obj, move)
+
+        # the move does not reach the threshold even if nothing is recaptured
+        swap = gain - threshold
+        if swap < 0:
+            return False
+
+        # or reaches it even if the moving piece is lost
+        swap = attacker_value - swap
+        if swap <= 0:
+            return True
+
+        piece_values = _constants.PIECE_VALUES
+        occ_sides = board_obj.board_occupied_squares
+        pieces = (board_obj.pawn, board_obj.knight, board_obj.bishop, board_obj.rook, board_obj.queen)
+        bishop_like = board_obj.bishop | board_obj.queen
+        rook_like = board_obj.rook | board_obj.queen
+
+        attackers = GameState.get_all_attackers(board_obj, to_square, occupied)
+        INDEX = BLACK_INDEX if side == WHITE else WHITE_INDEX
+        result = 1
+
+        while True:
+            attackers &= occupied
+            side_attackers = attackers & occ_sides[INDEX]
+            if not side_attackers:
+                break
+
+            result ^= 1
+
+            for piece, bitboard in enumerate(pieces, PAWN):
+                bitboard &= side_attackers
+                if bitboard:
+                    break
+            else:
+                # only the king can capture: it may not if the square is still defended
+                return bool(result ^ 1) if attackers & ~side_attackers else bool(result)
+
+            swap = piece_values[piece] - swap
+            if swap < result:
+                break
+
+            occupied ^= bitboard & -bitboard
+
+            # x-rays: sliders behind the piece that just left
+            if piece == PAWN or piece == BISHOP or piece == QUEEN:
+                attackers |= BISHOP_TABLE[to_square][((occupied & BISHOP_MASK[to_square]) * BISHOP_MAGIC[to_square] & U64) >> BISHOP_SHIFT[to_square]] & bishop_like
+            if piece == ROOK or piece == QUEEN:
+                attackers |= ROOK_TABLE[to_square][((occupied & ROOK_MASK[to_square]) * ROOK_MAGIC[to_square] & U64) >> ROOK_SHIFT[to_square]] & rook_like
+
+            INDEX = 1 - INDEX
+
+        return bool(result)
+
+
     @staticmethod
     def is_checkmate(board_obj, side) -> bool:
         """
@@ -3402,10 +3735,12 @@ class GameState:
             bool: True if checkmate, False otherwise.
         """
         
-        king_square = (board_obj.king & board_obj.board_occupied_squares[WHITE_INDEX if side == WHITE else BLACK_INDEX]).bit_length() - 1
-        
-        if GameState.attackers_to(board_obj, side, king_square):
-            return not any(MoveGen.generate_all_moves(board_obj, side, castling=False))
+        INDEX = WHITE_INDEX if side == WHITE else BLACK_INDEX
+        king_square = (board_obj.king & board_obj.board_occupied_squares[INDEX]).bit_length() - 1
+
+        checkers = GameState.get_all_attackers(board_obj, king_square) & board_obj.board_occupied_squares[1 - INDEX]
+        if checkers:
+            return not any(MoveGen.generate_evasions(board_obj, side, checkers))
 
         return False
     
@@ -3425,41 +3760,117 @@ class GameState:
         return board_obj.position_hash_history.get(board_obj.last_position_hash, 0) >= 3
 
 
+    @staticmethod
+    def is_pseudo_legal(board_obj, encoded_move, side=None) -> bool:
+        """
+        Check if a move is pseudo-legal (it may leave the own king in check) without generating any move.
+
+        The move is checked against the attack tables and the occupancy: own piece on the
+        from-square, no own piece on the to-square, reachable by the piece, pawn push and
+        capture rules (double push from the start rank, en passant), and for castling the
+        castling right and the empty squares. Used to validate hash and killer moves, which
+        may come from another position.
+
+        Args:
+            board_obj (object): Board object with bitboard attributes.
+            encoded_move (int): Encoded move value as (from_square | (to_square << 6)).
+            side (int, optional): Side color (WHITE=1 or BLACK=-1). Defaults to board_obj.side_to_move.
+
+        Returns:
+            bool: True if the move is one of the moves generated by the list_all_*_moves generators
+            (castling excepted, whose attacked squares are not checked).
+        """
+
+        if side is None:
+            side = board_obj.side_to_move
+
+        INDEX = WHITE_INDEX if side == WHITE else BLACK_INDEX
+        from_sq = encoded_move & 0x3F
+        to_sq = (encoded_move >> 6) & 0x3F
+        from_mask = SQUARE_MASKS[from_sq]
+        to_mask = SQUARE_MASKS[to_sq]
+
+        own_occupied_squares = board_obj.board_occupied_squares[INDEX]
+        if not own_occupied_squares & from_mask or own_occupied_squares & to_mask:
+            return False
+
+        all_board_occupied_squares = board_obj.all_board_occupied_squares
+
+        if board_obj.pawn & from_mask:
+            if side == WHITE:
+                push_mask = from_mask << 8
+                double_push = to_mask == from_mask << 16 and from_mask & RANK_MASKS[1]
+            else:
+                push_mask = from_mask >> 8
+                double_push = to_mask == from_mask >> 16 and from_mask & RANK_MASKS[6]
+
+            if to_mask == push_mask:
+                return not all_board_occupied_squares & to_mask
+            if double_push:
+                return not all_board_occupied_squares & (push_mask | to_mask)
+
+            # diagonal step: a capture, or en passant onto the empty en passant square
+            if not INVERTED_PAWN_TABLE[INDEX][to_sq] & from_mask:
+                return False
+            return bool(board_obj.board_occupied_squares[1 - INDEX] & to_mask) or (to_sq == board_obj.en_passant_square != 0)
+
+        if board_obj.knight & from_mask:
+            return bool(KNIGHT_TABLE[from_sq] & to_mask)
+
+        if board_obj.king & from_mask:
+            if KING_TABLE[from_sq] & to_mask:
+                return True
+
+            rights = board_obj.castling_rights
+            if side == WHITE and from_sq == 4:
+                if to_sq == 6:
+                    return bool(rights & CR_WK) and not all_board_occupied_squares & WK_EMPTY
+                if to_sq == 2:
+                    return bool(rights & CR_WQ) and not all_board_occupied_squares & WQ_EMPTY
+            elif side == BLACK and from_sq == 60:
+                if to_sq == 62:
+                    return bool(rights & CR_BK) and not all_board_occupied_squares & BK_EMPTY
+                if to_sq == 58:
+                    return bool(rights & CR_BQ) and not all_board_occupied_squares & BQ_EMPTY
+            return False
+
+        attacks = 0
+        if (board_obj.rook | board_obj.queen) & from_mask:
+            attacks = ROOK_TABLE[from_sq][((all_board_occupied_squares & ROOK_MASK[from_sq]) * ROOK_MAGIC[from_sq] & U64) >> ROOK_SHIFT[from_sq]]
+        if (board_obj.bishop | board_obj.queen) & from_mask:
+            attacks |= BISHOP_TABLE[from_sq][((all_board_occupied_squares & BISHOP_MASK[from_sq]) * BISHOP_MAGIC[from_sq] & U64) >> BISHOP_SHIFT[from_sq]]
+
+        return bool(attacks & to_mask)
+
+
     @staticmethod
     def is_move_legal(board_obj, encoded_move) -> bool:
         """
         Check if a move is legal for the current board state.
+
+        The move is validated with is_pseudo_legal, then played to see whether it leaves the king in check.
         
         Args:
             board_obj (object): Board object with bitboard attributes.
-            encoded_move (int): Encoded move value as (from_square | (to_square << 6)).
+            encoded_move (int): Encoded move value as (from_square | (to_square << 6)), the flags of an extended move are ignored.
 
         Returns:
             bool: True if the move is legal, False otherwise.
         """
 
         side = board_obj.side_to_move
-        from_sq = encoded_move & 0x3F
-        mask = SQUARE_MASKS[from_sq]
-
-        if board_obj.pawn & mask:
-            pseudo_moves = MoveGen.list_all_pawn_moves(board_obj, side)
-        elif board_obj.knight & mask:
-            pseudo_moves = MoveGen.list_all_knight_moves(board_obj, side)
-        elif board_obj.bishop & mask:
-            pseudo_moves = MoveGen.list_all_bishop_moves(board_obj, side)
-        elif board_obj.rook & mask:
-            pseudo_moves = MoveGen.list_all_rook_moves(board_obj, side)
-        elif board_obj.queen & mask:
-            pseudo_moves = MoveGen.list_all_queen_moves(board_obj, side)
-        elif board_obj.king & mask:
-            pseudo_moves = MoveGen.list_all_king_moves(board_obj, side)
-        else:
-            return False
 
-        if encoded_move not in pseudo_moves:
+        # the flags of an extended move come from another position, only its squares are checked
+        encoded_move &= MOVE_SQUARES_MASK
+
+        if not GameState.is_pseudo_legal(board_obj, encoded_move, side):
             return False
 
+        from_sq = encoded_move & 0x3F
+        if board_obj.king & SQUARE_MASKS[from_sq] and abs(((encoded_move >> 6) & 0x3F) - from_sq) == 2:
+            # the king may not castle out of, through or into check
+            return encoded_move in MoveGen.list_all_castling_move(board_obj, side)
+
         undo = board_obj.make_move(encoded_move, side)
         king_square = board_obj.king_square[WHITE_INDEX if side == WHITE else BLACK_INDEX]
         in_check = GameState.attackers_to(board_obj, side, king_square)
@@ -3468,6 +3879,488 @@ class GameState:
 
 
 
+# Side-specialized versions of the hot generators (perft, legal move listing), built once per
+# color at import. The side's indexes, pawn directions and masks are bound in the closure, so the
+# hot path does not branch on the color: a pawn shift is written (bb << UP) >> DOWN, one of the two
+# being 0. The public staticmethods dispatch to them through the tables below, indexed by side.
+
+def _build_attack_map(color):
+    INDEX = WHITE_INDEX if color == WHITE else BLACK_INDEX
+    # west captures land on the file to the left, east captures on the file to the right
+    WEST_UP, WEST_DOWN = (7, 0) if color == WHITE else (0, 9)
+    EAST_UP, EAST_DOWN = (9, 0) if color == WHITE else (0, 7)
+    NOT_FILE_A = ~FILE_MASKS[0]
+    NOT_FILE_H = ~FILE_MASKS[7]
+
+    def attack_map(board_obj, occupied):
+        own_occupied_squares = board_obj.board_occupied_squares[INDEX]
+
+        pawns = own_occupied_squares & board_obj.pawn
+        attacked = ((((pawns << WEST_UP) >> WEST_DOWN) & NOT_FILE_H) | (((pawns << EAST_UP) >> EAST_DOWN) & NOT_FILE_A)) & U64
+
+        knights = own_occupied_squares & board_obj.knight
+        while knights:
+            attacked |= KNIGHT_TABLE[(knights & -knights).bit_length() - 1]
+            knights &= knights - 1
+
+        king = own_occupied_squares & board_obj.king
+        if king:
+            attacked |= KING_TABLE[king.bit_length() - 1]
+
+        rook_like = own_occupied_squares & (board_obj.rook | board_obj.queen)
+        while rook_like:
+            square = (rook_like & -rook_like).bit_length() - 1
+            rook_like &= rook_like - 1
+            attacked |= ROOK_TABLE[square][(((occupied & ROOK_MASK[square]) * ROOK_MAGIC[square]) & U64) >> ROOK_SHIFT[square]]
+
+        bishop_like = own_occupied_squares & (board_obj.bishop | board_obj.queen)
+        while bishop_like:
+            square = (bishop_like & -bishop_like).bit_length() - 1
+            bishop_like &= bishop_like - 1
+            attacked |= BISHOP_TABLE[square][(((occupied & BISHOP_MASK[square]) * BISHOP_MAGIC[square]) & U64) >> BISHOP_SHIFT[square]]
+
+        return attacked
+
+    return attack_map
+
+
+_ATTACK_MAP = {WHITE: _build_attack_map(WHITE), BLACK: _build_attack_map(BLACK)}
+
+
+def _build_pawn_moves(color):
+    INDEX = WHITE_INDEX if color == WHITE else BLACK_INDEX
+    ENEMY_INDEX = 1 - INDEX
+    # captures named by their offset (7 or 9), to keep the generation order of both colors
+    PUSH_UP, PUSH_DOWN, PUSH_OFFSET = (8, 0, -8) if color == WHITE else (0, 8, 8)
+    CAPT7_UP, CAPT7_DOWN, CAPT7_OFFSET = (7, 0, -7) if color == WHITE else (0, 7, 7)
+    CAPT9_UP, CAPT9_DOWN, CAPT9_OFFSET = (9, 0, -9) if color == WHITE else (0, 9, 9)
+    CAPT7_FILES = ~FILE_MASKS[7] if color == WHITE else ~FILE_MASKS[0]
+    CAPT9_FILES = ~FILE_MASKS[0] if color == WHITE else ~FILE_MASKS[7]
+    DOUBLE_PUSH_RANK = RANK_MASKS[2] if color == WHITE else RANK_MASKS[5]
+    # squares from which one of our pawns attacks a given square
+    PAWN_ATTACKERS = PAWN_TABLE[ENEMY_INDEX]
+
+    def pawn_moves(board_obj):
+        list_p_moves = []
+        append = list_p_moves.append
+
+        empty_board = (~board_obj.all_board_occupied_squares) & U64
+        enemy_board = board_obj.board_occupied_squares[ENEMY_INDEX]
+        pawn_board = board_obj.pawn & board_obj.board_occupied_squares[INDEX]
+
+        move1 = ((pawn_board << PUSH_UP) >> PUSH_DOWN) & empty_board
+        move2 = (((move1 & DOUBLE_PUSH_RANK) << PUSH_UP) >> PUSH_DOWN) & empty_board
+        capt7 = ((pawn_board << CAPT7_UP) >> CAPT7_DOWN) & enemy_board & CAPT7_FILES
+        capt9 = ((pawn_board << CAPT9_UP) >> CAPT9_DOWN) & enemy_board & CAPT9_FILES
+
+        while move1:
+            least_significant_bit = move1 & -move1
+            move1 ^= least_significant_bit
+            append((least_significant_bit.bit_length() - 1) * 65 + PUSH_OFFSET)
+
+        while move2:
+            least_significant_bit = move2 & -move2
+            move2 ^= least_significant_bit
+            append((least_significant_bit.bit_length() - 1) * 65 + 2 * PUSH_OFFSET)
+
+        while capt7:
+            least_significant_bit = capt7 & -capt7
+            capt7 ^= least_significant_bit
+            append((least_significant_bit.bit_length() - 1) * 65 + CAPT7_OFFSET)
+
+        while capt9:
+            least_significant_bit = capt9 & -capt9
+            capt9 ^= least_significant_bit
+            append((least_significant_bit.bit_length() - 1) * 65 + CAPT9_OFFSET)
+
+        en_passant_square = board_obj.en_passant_square
+        if en_passant_square:
+            en_passant_square_attackers = PAWN_ATTACKERS[en_passant_square] & pawn_board
+            while en_passant_square_attackers:
+                least_significant_bit = en_passant_square_attackers & -en_passant_square_attackers
+                en_passant_square_attackers ^= least_significant_bit
+                append((least_significant_bit.bit_length() - 1) | (en_passant_square << 6))
+
+        return list_p_moves
+
+    return pawn_moves
+
+
+_PAWN_MOVES = {WHITE: _build_pawn_moves(WHITE), BLACK: _build_pawn_moves(BLACK)}
+
+
+def _build_legal_pawn_moves(color):
+    INDEX = WHITE_INDEX if color == WHITE else BLACK_INDEX
+    ENEMY_INDEX = 1 - INDEX
+    PUSH_UP, PUSH_DOWN, PUSH_OFFSET = (8, 0, -8) if color == WHITE else (0, 8, 8)
+    CAPT7_UP, CAPT7_DOWN, CAPT7_OFFSET = (7, 0, -7) if color == WHITE else (0, 7, 7)
+    CAPT9_UP, CAPT9_DOWN, CAPT9_OFFSET = (9, 0, -9) if color == WHITE else (0, 9, 9)
+    CAPT7_FILES = ~FILE_MASKS[7] if color == WHITE else ~FILE_MASKS[0]
+    CAPT9_FILES = ~FILE_MASKS[0] if color == WHITE else ~FILE_MASKS[7]
+    DOUBLE_PUSH_RANK = RANK_MASKS[2] if color == WHITE else RANK_MASKS[5]
+
+    def legal_pawn_moves(board_obj, king_square, pinned, check_mask):
+        list_p_moves = []
+        append = list_p_moves.append
+
+        empty_board = (~board_obj.all_board_occupied_squares) & U64
+        enemy_board = board_obj.board_occupied_squares[ENEMY_INDEX]
+        pawn_board = board_obj.pawn & board_obj.board_occupied_squares[INDEX]
+
+        # pawns allowed to push / capture in each direction: a pinned pawn only along its pin ray
+        push_pawns = capt7_pawns = capt9_pawns = pawn_board & ~pinned
+        pinned_pawns = pawn_board & pinned
+        king_line = LINE[king_square]
+
+        while pinned_pawns:
+            from_mask = pinned_pawns & -pinned_pawns
+            pinned_pawns ^= from_mask
+            line = king_line[from_mask.bit_length() - 1]
+            if line & ((from_mask << PUSH_UP) >> PUSH_DOWN): push_pawns |= from_mask
+            if line & ((from_mask << CAPT7_UP) >> CAPT7_DOWN): capt7_pawns |= from_mask
+            if line & ((from_mask << CAPT9_UP) >> CAPT9_DOWN): capt9_pawns |= from_mask
+
+        move1 = ((push_pawns << PUSH_UP) >> PUSH_DOWN) & empty_board
+        move2 = (((move1 & DOUBLE_PUSH_RANK) << PUSH_UP) >> PUSH_DOWN) & empty_board & check_mask
+        move1 &= check_mask
+        capt7 = ((capt7_pawns << CAPT7_UP) >> CAPT7_DOWN) & enemy_board & CAPT7_FILES & check_mask
+        capt9 = ((capt9_pawns << CAPT9_UP) >> CAPT9_DOWN) & enemy_board & CAPT9_FILES & check_mask
+
+        while move1:
+            least_significant_bit = move1 & -move1
+            move1 ^= least_significant_bit
+            append((least_significant_bit.bit_length() - 1) * 65 + PUSH_OFFSET)
+
+        while move2:
+            least_significant_bit = move2 & -move2
+            move2 ^= least_significant_bit
+            append((least_significant_bit.bit_length() - 1) * 65 + 2 * PUSH_OFFSET)
+
+        while capt7:
+            least_significant_bit = capt7 & -capt7
+            capt7 ^= least_significant_bit
+            append((least_significant_bit.bit_length() - 1) * 65 + CAPT7_OFFSET)
+
+        while capt9:
+            least_significant_bit = capt9 & -capt9
+            capt9 ^= least_significant_bit
+            append((least_significant_bit.bit_length() - 1) * 65 + CAPT9_OFFSET)
+
+        en_passant_square = board_obj.en_passant_square
+        if en_passant_square:
+            en_passant_pawns = MoveGen._legal_en_passant_pawns(board_obj, color, king_square, check_mask)
+            while en_passant_pawns:
+                from_mask = en_passant_pawns & -en_passant_pawns
+                en_passant_pawns ^= from_mask
+                append((from_mask.bit_length() - 1) | (en_passant_square << 6))
+
+        return list_p_moves
+
+    return legal_pawn_moves
+
+
+_LEGAL_PAWN_MOVES = {WHITE: _build_legal_pawn_moves(WHITE), BLACK: _build_legal_pawn_moves(BLACK)}
+
+
+def _build_legal_pawn_captures(color):
+    INDEX = WHITE_INDEX if color == WHITE else BLACK_INDEX
+    ENEMY_INDEX = 1 - INDEX
+    CAPT7_UP, CAPT7_DOWN, CAPT7_OFFSET = (7, 0, -7) if color == WHITE else (0, 7, 7)
+    CAPT9_UP, CAPT9_DOWN, CAPT9_OFFSET = (9, 0, -9) if color == WHITE else (0, 9, 9)
+    # promotion captures are left to list_all_pawn_promotions
+    CAPT7_SQUARES = ~FILE_MASKS[7] & ~RANK_MASKS[7] if color == WHITE else ~FILE_MASKS[0] & ~RANK_MASKS[0]
+    CAPT9_SQUARES = ~FILE_MASKS[0] & ~RANK_MASKS[7] if color == WHITE else ~FILE_MASKS[7] & ~RANK_MASKS[0]
+
+    def legal_pawn_captures(board_obj, king_square, pinned, check_mask):
+        list_p_captures = []
+        append = list_p_captures.append
+
+        enemy_board = board_obj.board_occupied_squares[ENEMY_INDEX] & check_mask
+        pawn_board = board_obj.pawn & board_obj.board_occupied_squares[INDEX]
+
+        # a pinned pawn only captures along its pin ray
+        capt7_pawns = capt9_pawns = pawn_board & ~pinned
+        pinned_pawns = pawn_board & pinned
+        king_line = LINE[king_square]
+
+        while pinned_pawns:
+            from_mask = pinned_pawns & -pinned_pawns
+            pinned_pawns ^= from_mask
+            line = king_line[from_mask.bit_length() - 1]
+            if line & ((from_mask << CAPT7_UP) >> CAPT7_DOWN): capt7_pawns |= from_mask
+            if line & ((from_mask << CAPT9_UP) >> CAPT9_DOWN): capt9_pawns |= from_mask
+
+        capt7 = ((capt7_pawns << CAPT7_UP) >> CAPT7_DOWN) & enemy_board & CAPT7_SQUARES
+        capt9 = ((capt9_pawns << CAPT9_UP) >> CAPT9_DOWN) & enemy_board & CAPT9_SQUARES
+
+        while capt7:
+            least_significant_bit = capt7 & -capt7
+            capt7 ^= least_significant_bit
+            append((least_significant_bit.bit_length() - 1) * 65 + CAPT7_OFFSET)
+
+        while capt9:
+            least_significant_bit = capt9 & -capt9
+            capt9 ^= least_significant_bit
+            append((least_significant_bit.bit_length() - 1) * 65 + CAPT9_OFFSET)
+
+        en_passant_square = board_obj.en_passant_square
+        if en_passant_square:
+            en_passant_pawns = MoveGen._legal_en_passant_pawns(board_obj, color, king_square, check_mask)
+            while en_passant_pawns:
+                from_mask = en_passant_pawns & -en_passant_pawns
+                en_passant_pawns ^= from_mask
+                append((from_mask.bit_length() - 1) | (en_passant_square << 6))
+
+        return list_p_captures
+
+    return legal_pawn_captures
+
+
+_LEGAL_PAWN_CAPTURES = {WHITE: _build_legal_pawn_captures(WHITE), BLACK: _build_legal_pawn_captures(BLACK)}
+
+
+def _build_legal_pawn_quiets(color):
+    INDEX = WHITE_INDEX if color == WHITE else BLACK_INDEX
+    PUSH_UP, PUSH_DOWN, PUSH_OFFSET = (8, 0, -8) if color == WHITE else (0, 8, 8)
+    DOUBLE_PUSH_RANK = RANK_MASKS[2] if color == WHITE else RANK_MASKS[5]
+    # push promotions are left to list_all_pawn_promotions
+    PUSH_SQUARES = ~RANK_MASKS[7] if color == WHITE else ~RANK_MASKS[0]
+
+    def legal_pawn_quiets(board_obj, king_square, pinned, check_mask):
+        list_p_quiets = []
+        append = list_p_quiets.append
+
+        empty_board = (~board_obj.all_board_occupied_squares) & U64
+        pawn_board = board_obj.pawn & board_obj.board_occupied_squares[INDEX]
+
+        # a pinned pawn only pushes along its pin ray (a pin on its file)
+        push_pawns = pawn_board & ~pinned
+        pinned_pawns = pawn_board & pinned
+        king_line = LINE[king_square]
+
+        while pinned_pawns:
+            from_mask = pinned_pawns & -pinned_pawns
+            pinned_pawns ^= from_mask
+            if king_line[from_mask.bit_length() - 1] & ((from_mask << PUSH_UP) >> PUSH_DOWN): push_pawns |= from_mask
+
+        move1 = ((push_pawns << PUSH_UP) >> PUSH_DOWN) & empty_board & PUSH_SQUARES
+        move2 = (((move1 & DOUBLE_PUSH_RANK) << PUSH_UP) >> PUSH_DOWN) & empty_board & check_mask
+        move1 &= check_mask
+
+        while move1:
+            least_significant_bit = move1 & -move1
+            move1 ^= least_significant_bit
+            append((least_significant_bit.bit_length() - 1) * 65 + PUSH_OFFSET)
+
+        while move2:
+            least_significant_bit = move2 & -move2
+            move2 ^= least_significant_bit
+            append((least_significant_bit.bit_length() - 1) * 65 + 2 * PUSH_OFFSET)
+
+        return list_p_quiets
+
+    return legal_pawn_quiets
+
+
+_LEGAL_PAWN_QUIETS = {WHITE: _build_legal_pawn_quiets(WHITE), BLACK: _build_legal_pawn_quiets(BLACK)}
+
+
+def _build_count_legal_moves(color):
+    INDEX = WHITE_INDEX if color == WHITE else BLACK_INDEX
+    ENEMY_INDEX = 1 - INDEX
+    PUSH_UP, PUSH_DOWN = (8, 0) if color == WHITE else (0, 8)
+    WEST_UP, WEST_DOWN = (7, 0) if color == WHITE else (0, 9)
+    EAST_UP, EAST_DOWN = (9, 0) if color == WHITE else (0, 7)
+    DOUBLE_PUSH_RANK = RANK_MASKS[2] if color == WHITE else RANK_MASKS[5]
+    KINGSIDE_RIGHT, KINGSIDE_EMPTY, KINGSIDE_SAFE = (CR_WK, WK_EMPTY, WK_SAFE) if color == WHITE else (CR_BK, BK_EMPTY, BK_SAFE)
+    QUEENSIDE_RIGHT, QUEENSIDE_EMPTY, QUEENSIDE_SAFE = (CR_WQ, WQ_EMPTY, WQ_SAFE) if color == WHITE else (CR_BQ, BQ_EMPTY, BQ_SAFE)
+    NOT_FILE_A = ~FILE_MASKS[0]
+    NOT_FILE_H = ~FILE_MASKS[7]
+    PAWN_ATTACKS = PAWN_TABLE[INDEX]
+    enemy_attack_map = _ATTACK_MAP[-color]
+
+    def count_legal_moves(board_obj):
+        board_occupied_squares = board_obj.board_occupied_squares
+        own_occupied_squares = board_occupied_squares[INDEX]
+        enemy_board = board_occupied_squares[ENEMY_INDEX]
+        all_occ = board_obj.all_board_occupied_squares
+        king_square = board_obj.king_square[INDEX]
+        rook_like = board_obj.rook | board_obj.queen
+        bishop_like = board_obj.bishop | board_obj.queen
+
+        # get_check_and_pin_masks, inlined
+        checkers = (
+            (KNIGHT_TABLE[king_square] & board_obj.knight)
+            | (PAWN_ATTACKS[king_square] & board_obj.pawn)
+            | (ROOK_TABLE[king_square][(((all_occ & ROOK_MASK[king_square]) * ROOK_MAGIC[king_square]) & U64) >> ROOK_SHIFT[king_square]] & rook_like)
+            | (BISHOP_TABLE[king_square][(((all_occ & BISHOP_MASK[king_square]) * BISHOP_MAGIC[king_square]) & U64) >> BISHOP_SHIFT[king_square]] & bishop_like)
+        ) & enemy_board
+
+        # squares the enemy attacks once our king is lifted off the board
+        attacked = enemy_attack_map(board_obj, all_occ ^ SQUARE_MASKS[king_square])
+        count = (KING_TABLE[king_square] & ~(own_occupied_squares | attacked)).bit_count()
+
+        # in double check only the king can move
+        if checkers & (checkers - 1):
+            return count
+
+        if checkers:
+            check_mask = BETWEEN[king_square][checkers.bit_length() - 1] | checkers
+        else:
+            check_mask = U64
+            # list_all_castling_move, inlined
+            rights = board_obj.castling_rights
+            if rights & KINGSIDE_RIGHT and not all_occ & KINGSIDE_EMPTY and not attacked & KINGSIDE_SAFE:
+                count += 1
+            if rights & QUEENSIDE_RIGHT and not all_occ & QUEENSIDE_EMPTY and not attacked & QUEENSIDE_SAFE:
+                count += 1
+
+        pinned = 0
+        snipers = ((ROOK_TABLE[king_square][0] & rook_like) | (BISHOP_TABLE[king_square][0] & bishop_like)) & enemy_board
+        between = BETWEEN[king_square]
+        while snipers:
+            sniper_square = (snipers & -snipers).bit_length() - 1
+            snipers &= snipers - 1
+            blockers = between[sniper_square] & all_occ
+            if blockers and not (blockers & (blockers - 1)):
+                pinned |= blockers & own_occupied_squares
+
+        targets = ~own_occupied_squares & check_mask
+        king_line = LINE[king_square]
+
+        # a pinned knight can never move
+        knight_board = board_obj.knight & own_occupied_squares & ~pinned
+        while knight_board:
+            count += (KNIGHT_TABLE[(knight_board & -knight_board).bit_length() - 1] & targets).bit_count()
+            knight_board &= knight_board - 1
+
+        rook_like &= own_occupied_squares
+        while rook_like:
+            from_mask = rook_like & -rook_like
+            rook_like ^= from_mask
+            from_ = from_mask.bit_length() - 1
+            attacks = ROOK_TABLE[from_][(((all_occ & ROOK_MASK[from_]) * ROOK_MAGIC[from_]) & U64) >> ROOK_SHIFT[from_]] & targets
+            if from_mask & pinned:
+                attacks &= king_line[from_]
+            count += attacks.bit_count()
+
+        bishop_like &= own_occupied_squares
+        while bishop_like:
+            from_mask = bishop_like & -bishop_like
+            bishop_like ^= from_mask
+            from_ = from_mask.bit_length() - 1
+            attacks = BISHOP_TABLE[from_][(((all_occ & BISHOP_MASK[from_]) * BISHOP_MAGIC[from_]) & U64) >> BISHOP_SHIFT[from_]] & targets
+            if from_mask & pinned:
+                attacks &= king_line[from_]
+            count += attacks.bit_count()
+
+        # pawns allowed to push / capture in each direction: a pinned pawn only along its pin ray
+        empty_board = ~all_occ & U64
+        pawn_board = board_obj.pawn & own_occupied_squares
+        push_pawns = west_pawns = east_pawns = pawn_board & ~pinned
+        pinned_pawns = pawn_board & pinned
+
+        while pinned_pawns:
+            from_mask = pinned_pawns & -pinned_pawns
+            pinned_pawns ^= from_mask
+            line = king_line[from_mask.bit_length() - 1]
+            if line & ((from_mask << PUSH_UP) >> PUSH_DOWN): push_pawns |= from_mask
+            if line & ((from_mask << WEST_UP) >> WEST_DOWN): west_pawns |= from_mask
+            if line & ((from_mask << EAST_UP) >> EAST_DOWN): east_pawns |= from_mask
+
+        move1 = ((push_pawns << PUSH_UP) >> PUSH_DOWN) & empty_board
+        move2 = (((move1 & DOUBLE_PUSH_RANK) << PUSH_UP) >> PUSH_DOWN) & empty_board
+        west = ((west_pawns << WEST_UP) >> WEST_DOWN) & enemy_board & NOT_FILE_H
+        east = ((east_pawns << EAST_UP) >> EAST_DOWN) & enemy_board & NOT_FILE_A
+
+        count += ((move1 | move2) & check_mask).bit_count() + (west & check_mask).bit_count() + (east & check_mask).bit_count()
+
+        if board_obj.en_passant_square:
+            count += MoveGen._legal_en_passant_pawns(board_obj, color, king_square, check_mask).bit_count()
+
+        return count
+
+    return count_legal_moves
+
+
+_COUNT_LEGAL_MOVES = {WHITE: _build_count_legal_moves(WHITE), BLACK: _build_count_legal_moves(BLACK)}
+
+
+def _build_list_all_legal_moves(color):
+    INDEX = WHITE_INDEX if color == WHITE else BLACK_INDEX
+    ENEMY_INDEX = 1 - INDEX
+    PAWN_ATTACKS = PAWN_TABLE[INDEX]
+    pawn_moves = _PAWN_MOVES[color]
+    legal_pawn_moves = _LEGAL_PAWN_MOVES[color]
+    enemy_attack_map = _ATTACK_MAP[-color]
+
+    def list_all_legal_moves(board_obj, castling=True):
+        board_occupied_squares = board_obj.board_occupied_squares
+        own_occupied_squares = board_occupied_squares[INDEX]
+        enemy_board = board_occupied_squares[ENEMY_INDEX]
+        all_occ = board_obj.all_board_occupied_squares
+        king_square = board_obj.king_square[INDEX]
+        rook_like = board_obj.rook | board_obj.queen
+        bishop_like = board_obj.bishop | board_obj.queen
+
+        checkers = (
+            (KNIGHT_TABLE[king_square] & board_obj.knight)
+            | (PAWN_ATTACKS[king_square] & board_obj.pawn)
+            | (ROOK_TABLE[king_square][(((all_occ & ROOK_MASK[king_square]) * ROOK_MAGIC[king_square]) & U64) >> ROOK_SHIFT[king_square]] & rook_like)
+            | (BISHOP_TABLE[king_square][(((all_occ & BISHOP_MASK[king_square]) * BISHOP_MAGIC[king_square]) & U64) >> BISHOP_SHIFT[king_square]] & bishop_like)
+        ) & enemy_board
+        if checkers:
+            return MoveGen.list_all_evasions(board_obj, color, checkers)
+
+        pinned = MoveGen.get_pinned_pieces(board_obj, king_square, INDEX, ENEMY_INDEX)
+
+        if not pinned:
+            # nothing to filter: the pseudo-legal moves of the other pieces are legal
+            if board_obj.en_passant_square:
+                list_all_moves = legal_pawn_moves(board_obj, king_square, pinned, U64)
+            else:
+                list_all_moves = pawn_moves(board_obj)
+            list_all_moves += MoveGen.list_all_knight_moves(board_obj, color)
+            list_all_moves += MoveGen.list_all_bishop_moves(board_obj, color)
+            list_all_moves += MoveGen.list_all_rook_moves(board_obj, color)
+            list_all_moves += MoveGen.list_all_queen_moves(board_obj, color)
+
+        else:
+            list_all_moves = legal_pawn_moves(board_obj, king_square, pinned, U64)
+            extend = list_all_moves.extend
+
+            targets = ~own_occupied_squares & U64
+            slider_moves = MoveGen._legal_slider_moves
+
+            # a pinned knight can never move
+            knight_moves = _constants.KNIGHT_MOVES
+            knight_board = board_obj.knight & own_occupied_squares & ~pinned
+            while knight_board:
+                from_ = (knight_board & -knight_board).bit_length() - 1
+                knight_board &= knight_board - 1
+                extend(knight_moves[from_][KNIGHT_TABLE[from_] & targets])
+
+            extend(slider_moves(board_obj, board_obj.bishop & own_occupied_squares, targets, king_square, pinned, False, True))
+            extend(slider_moves(board_obj, board_obj.rook & own_occupied_squares, targets, king_square, pinned, True, False))
+            extend(slider_moves(board_obj, board_obj.queen & own_occupied_squares, targets, king_square, pinned, True, True))
+
+        # squares the enemy attacks once our king is lifted off the board
+        attacked = enemy_attack_map(board_obj, all_occ ^ SQUARE_MASKS[king_square])
+
+        list_all_moves.extend(_constants.KING_MOVES[king_square][KING_TABLE[king_square] & ~(own_occupied_squares | attacked)])
+
+        if castling:
+            list_all_moves.extend(MoveGen.list_all_castling_move(board_obj, color, attacked))
+
+        return list_all_moves
+
+    return list_all_legal_moves
+
+
+_LIST_ALL_LEGAL_MOVES = {WHITE: _build_list_all_legal_moves(WHITE), BLACK: _build_list_all_legal_moves(BLACK)}
+
+
+
 class ChessDisplay:
     enable_print = True
 
@@ -4315,8 +5208,8 @@ class ChessCore:
         Convert an encoded move back to LAN format.
 
         Args:
-            encoded_move (int): Encoded move as an integer.
-            promotion_piece (int, optional): Promotion piece type (e.g., QUEEN). Defaults to 0 (no promotion).
+            encoded_move (int): Encoded move as an integer, 12-bit or extended.
+            promotion_piece (int, optional): Promotion piece type (e.g., QUEEN). Defaults to 0 (no promotion, or the promotion bits of an extended move).
 
         Returns:
             str: Move in LAN format (e.g., "e2e4", "e7e8q").
@@ -4324,6 +5217,9 @@ class ChessCore:
 
         lan_move = f"{INVERSE_SQUARES[encoded_move & 0x3F]}{INVERSE_SQUARES[(encoded_move >> 6) & 0x3F]}"
 
+        if not promotion_piece:
+            promotion_piece = (encoded_move & MOVE_PROMOTION_MASK) >> MOVE_PROMOTION_SHIFT
+
         if promotion_piece:
             lan_move += {QUEEN: 'q', ROOK: 'r', BISHOP: 'b', KNIGHT: 'n'}.get(promotion_piece, '')
 
@@ -4337,8 +5233,8 @@ class ChessCore:
         
         Args:
             board_obj (object): Board object with bitboard attributes.
-            encoded_move (int): Encoded move as an integer.
-            promotion_piece (int, optional): Promotion piece type (e.g., QUEEN). Defaults to 0 (no promotion).
+            encoded_move (int): Encoded move as an integer, 12-bit or extended (its flags are used instead of looking at the board).
+            promotion_piece (int, optional): Promotion piece type (e.g., QUEEN). Defaults to 0 (no promotion, or the promotion bits of an extended move).
             state_indicator (bool, optional): Whether to include check/checkmate indicators. Defaults to False.
         """
 
@@ -4346,10 +5242,18 @@ class ChessCore:
         to_square = (encoded_move >> 6) & 0x3F
 
         piece_type = board_obj.get_piece_type_and_color(from_square)
-        capture = board_obj.get_piece_type_and_color(to_square) != EMPTY
 
-        if piece_type == KING and abs(from_square - to_square) == 2:
-            return "O-O" if to_square > from_square else "O-O-O"
+        if encoded_move & MOVE_FLAG_EXTENDED:
+            if encoded_move & MOVE_FLAG_CASTLE:
+                return "O-O" if to_square > from_square else "O-O-O"
+            capture = bool(encoded_move & MOVE_FLAG_CAPTURE)
+            if not promotion_piece:
+                promotion_piece = (encoded_move & MOVE_PROMOTION_MASK) >> MOVE_PROMOTION_SHIFT
+        else:
+            capture = board_obj.get_piece_type_and_color(to_square) != EMPTY
+
+            if abs(piece_type) == KING and abs(from_square - to_square) == 2:
+                return "O-O" if to_square > from_square else "O-O-O"
         
         piece_letter = {KING: 'K', QUEEN: 'Q', ROOK: 'R', BISHOP: 'B', KNIGHT: 'N'}.get(abs(piece_type), '')
 
@@ -16,6 +16,7 @@ __all__ = [
     "INVERSE_SQUARES",
     "SQUARE_MASKS",
     "U64",
+    "TABLE_STORAGE",
     "ROOK_MASK",
     "ROOK_MAGIC",
     "ROOK_SHIFT",
@@ -26,6 +27,19 @@ __all__ = [
     "BISHOP_NBITS",
     "ROOK_TABLE",
     "BISHOP_TABLE",
+    "ROOK_OFFSET",
+    "BETWEEN",
+    "LINE",
+    "RAYS",
+    "RAY_N",
+    "RAY_NE",
+    "RAY_E",
+    "RAY_SE",
+    "RAY_S",
+    "RAY_SW",
+    "RAY_W",
+    "RAY_NW",
+    "BISHOP_OFFSET",
     "KNIGHT_TABLE",
     "KING_TABLE",
     "PAWN_TABLE",
@@ -45,6 +59,21 @@ __all__ = [
     "CR_BK",
     "CR_BQ",
     "CASTLING_UPDATE",
+    "CASTLING_ROOK_SQUARES",
+    "MOVE_SQUARES_MASK",
+    "MOVE_PROMOTION_SHIFT",
+    "MOVE_PROMOTION_MASK",
+    "MOVE_FLAG_CAPTURE",
+    "MOVE_FLAG_EN_PASSANT",
+    "MOVE_FLAG_DOUBLE_PUSH",
+    "MOVE_FLAG_CASTLE",
+    "MOVE_FLAG_EXTENDED",
+    "ZOBRIST_PIECES",
+    "ZOBRIST_CASTLING",
+    "ZOBRIST_EN_PASSANT",
+    "ZOBRIST_SIDE",
+    "MATERIAL_KEY_UNIT",
+    "INSUFFICIENT_MATERIAL_KEYS",
     "WHITE_BG",
     "BLACK_BG",
     "BG",
@@ -54,29 +83,6 @@ __all__ = [
     #for engine
     "MG_INDEX",
     "EG_INDEX",
-    "pst",
-    "PAWN_VALUE",
-    "KNIGHT_VALUE",
-    "BISHOP_VALUE",
-    "ROOK_VALUE",
-    "QUEEN_VALUE",
-    "PIECE_VALUES",
-    "MVV_LVA",
-    "MATE_SCORE",
-    "TRANSITION_TABLE_EXACT",
-    "TRANSITION_TABLE_ALPHA",
-    "TRANSITION_TABLE_BETA",
-    "MASK_PAWN_PASSED_MG",
-    "MASK_PAWN_PASSED_EG",
-    "MASK_EDGE",
-    "KNIGHT_MOBILITY_MG",
-    "KNIGHT_MOBILITY_EG",
-    "BISHOP_MOBILITY_MG",
-    "BISHOP_MOBILITY_EG",
-    "ROOK_MOBILITY_MG",
-    "ROOK_MOBILITY_EG",
-    "QUEEN_MOBILITY_MG",
-    "QUEEN_MOBILITY_EG",
 ]
 
 
@@ -149,28 +155,233 @@ U64 = (1 << 64) - 1
 
 
 import os
-import json
-
-with open(os.path.join(os.path.dirname(__file__), 'data', 'magic_bitboards.json'), "r") as f:
-    magic_data = json.load(f)
-
-ROOK_MASK = [int(magic_data["rook_magics"][i]["mask"], 16) for i in range(64)]
-ROOK_MAGIC = [int(magic_data["rook_magics"][i]["magic"], 16) for i in range(64)]
-ROOK_SHIFT = [magic_data["rook_magics"][i]["shift"] for i in range(64)]
-ROOK_NBITS = [magic_data["rook_magics"][i]["n_bits"] for i in range(64)]
-
-BISHOP_MASK = [int(magic_data["bishop_magics"][i]["mask"], 16) for i in range(64)]
-BISHOP_MAGIC = [int(magic_data["bishop_magics"][i]["magic"], 16) for i in range(64)]
-BISHOP_SHIFT = [magic_data["bishop_magics"][i]["shift"] for i in range(64)]
-BISHOP_NBITS = [magic_data["bishop_magics"][i]["n_bits"] for i in range(64)]
+import sys
+import mmap
+import struct
+import zlib
+from array import array
+
+# The attack tables are loaded from a packed binary cache (data/magic_bitboards.bin):
+# a 28-byte header (magic, format version, crc32 of the compact part, crc32 of the flat
+# part, byte offset of the flat part) followed by the little-endian uint64 tables of _TABLES_LAYOUT.
+# The rook and bishop attack tables come after that, twice:
+#   - compact, per square: the number of distinct attack sets (uint16), the distinct
+#     sets (uint64), then one uint8 index per magic slot. Used to build the lists.
+#   - flat, 8-byte aligned: every rook square then every bishop square, 2 ** n_bits
+#     uint64 entries each. Used as is by the "mmap" storage.
+# tables.py writes this file. If it is missing or corrupt, the tables are rebuilt from the
+# magic numbers of data/magic_bitboards.json and the cache is written again when possible.
+#
+# CHESSCORE_TABLE_STORAGE selects how the tables are held:
+#   - "list" (default): nested Python lists, the fastest lookups.
+#   - "mmap": read-only memory-mapped views of the cache file. Processes that import
+#     chesscore share the same pages instead of each building ~107k ints.
+#   - "array": every table (leapers, pawns, geometry and sliders) as contiguous
+#     array('Q') rows, 8 bytes per entry and no int objects.
+
+_DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+_TABLES_JSON_PATH = os.path.join(_DATA_DIR, 'magic_bitboards.json')
+_TABLES_BIN_PATH = os.path.join(_DATA_DIR, 'magic_bitboards.bin')
+
+_TABLES_HEADER = struct.Struct("<8sIIIQ")
+_TABLES_MAGIC = b"CCTABLES"
+_TABLES_VERSION = 4
+
+_TABLES_LAYOUT = (
+    ("ROOK_MASK", 64), ("ROOK_MAGIC", 64), ("ROOK_SHIFT", 64), ("ROOK_NBITS", 64),
+    ("BISHOP_MASK", 64), ("BISHOP_MAGIC", 64), ("BISHOP_SHIFT", 64), ("BISHOP_NBITS", 64),
+    ("KNIGHT_TABLE", 64), ("KING_TABLE", 64), ("PAWN_TABLE", 128), ("INVERTED_PAWN_TABLE", 128),
+    ("BETWEEN", 4096), ("LINE", 4096), ("RAYS", 512),
+)
 
+_TABLE_STORAGES = ("list", "mmap", "array")
+
+
+def _uint64_array(raw, pos, size) -> array:
+    """
+    Read `size` little-endian uint64 values at byte offset `pos` into an array('Q').
+    """
+
+    values = array("Q")
+    if pos + size * 8 > len(raw):
+        raise ValueError("Table cache is truncated.")
+    values.frombytes(raw[pos:pos + size * 8])
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _load_binary_tables(path, storage="list") -> dict:
+    """
+    Load the attack tables from the binary cache.
+
+    Args:
+        path (str): Path of the cache file.
+        storage (str): "list" to build nested lists, "mmap" to return views of the mapped file,
+            "array" to build array('Q') rows.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the file is not a valid table cache.
+    """
+
+    with open(path, "rb") as f:
+        header = f.read(_TABLES_HEADER.size)
+        if len(header) < _TABLES_HEADER.size:
+            raise ValueError("Table cache is truncated.")
+
+        magic, version, compact_checksum, flat_checksum, flat_offset = _TABLES_HEADER.unpack(header)
+
+        if magic != _TABLES_MAGIC or version != _TABLES_VERSION:
+            raise ValueError("Table cache has an unknown format.")
+
+        file_size = os.fstat(f.fileno()).st_size
+        if not _TABLES_HEADER.size <= flat_offset <= file_size:
+            raise ValueError("Table cache is corrupt.")
+
+        # the list storage never reads the flat part
+        if storage == "mmap":
+            raw = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        elif storage == "array":
+            raw = header + f.read()
+        else:
+            raw = header + f.read(flat_offset - _TABLES_HEADER.size)
+
+    if zlib.crc32(memoryview(raw)[_TABLES_HEADER.size:flat_offset]) != compact_checksum:
+        raise ValueError("Table cache is corrupt.")
+
+    if storage != "list" and zlib.crc32(memoryview(raw)[flat_offset:]) != flat_checksum:
+        raise ValueError("Table cache is corrupt.")
+
+    try:
+        tables = {}
+        pos = _TABLES_HEADER.size
+        for name, size in _TABLES_LAYOUT:
+            if storage == "array":
+                values = _uint64_array(raw, pos, size)
+            else:
+                values = list(struct.unpack_from(f"<{size}Q", raw, pos))
+            # tables larger than 64 entries are stored row by row
+            tables[name] = values if size == 64 else [values[i:i + 64] for i in range(0, size, 64)]
+            pos += size * 8
+
+        n_entries = sum(1 << n_bits for n_bits in list(tables["ROOK_NBITS"]) + list(tables["BISHOP_NBITS"]))
+        if flat_offset % 8 or file_size != flat_offset + n_entries * 8:
+            raise ValueError("Table cache is corrupt.")
+
+        if storage == "mmap":
+            flat = memoryview(raw)[flat_offset:].cast("Q")
+            pos = 0
+            for piece in ("ROOK", "BISHOP"):
+                start = pos
+                table = []
+                for n_bits in tables[piece + "_NBITS"]:
+                    table.append(flat[pos:pos + (1 << n_bits)])
+                    pos += 1 << n_bits
+                tables[piece + "_TABLE"] = table
+                tables[piece + "_ATTACKS"] = flat[start:pos]
+
+        elif storage == "array":
+            pos = flat_offset
+            for piece in ("ROOK", "BISHOP"):
+                table = []
+                for n_bits in tables[piece + "_NBITS"]:
+                    table.append(_uint64_array(raw, pos, 1 << n_bits))
+                    pos += 8 << n_bits
+                tables[piece + "_TABLE"] = table
+
+        else:
+            for piece in ("ROOK", "BISHOP"):
+                table = []
+                for n_bits in tables[piece + "_NBITS"]:
+                    (n_unique,) = struct.unpack_from("<H", raw, pos)
+                    unique = struct.unpack_from(f"<{n_unique}Q", raw, pos + 2)
+                    pos += 2 + n_unique * 8
+                    table.append([unique[i] for i in raw[pos:pos + (1 << n_bits)]])
+                    pos += 1 << n_bits
+                tables[piece + "_TABLE"] = table
+
+            if pos > flat_offset:
+                raise ValueError("Table cache is corrupt.")
+
+    except (struct.error, IndexError):
+        raise ValueError("Table cache is corrupt.") from None
+
+    return tables
+
+
+TABLE_STORAGE = os.environ.get("CHESSCORE_TABLE_STORAGE", "list")
+
+if TABLE_STORAGE not in _TABLE_STORAGES:
+    raise ValueError(f"CHESSCORE_TABLE_STORAGE must be one of {_TABLE_STORAGES}, got {TABLE_STORAGE!r}.")
+
+# the mapped views are native-endian
+if TABLE_STORAGE == "mmap" and sys.byteorder != "little":
+    TABLE_STORAGE = "list"
+
+try:
+    _tables = _load_binary_tables(_TABLES_BIN_PATH, TABLE_STORAGE)
+except (OSError, ValueError):
+    try:
+        from .tables import load_magics, build_tables, write_cache
+    except ImportError:
+        from tables import load_magics, build_tables, write_cache
+
+    _tables = build_tables(load_magics(_TABLES_JSON_PATH))
+    try:
+        write_cache(_tables, _TABLES_BIN_PATH)
+        if TABLE_STORAGE != "list":
+            _tables = _load_binary_tables(_TABLES_BIN_PATH, TABLE_STORAGE)
+    except (OSError, ValueError):
+        TABLE_STORAGE = "list"
+
+ROOK_MASK = _tables["ROOK_MASK"]
+ROOK_MAGIC = _tables["ROOK_MAGIC"]
+ROOK_SHIFT = _tables["ROOK_SHIFT"]
+ROOK_NBITS = _tables["ROOK_NBITS"]
+
+BISHOP_MASK = _tables["BISHOP_MASK"]
+BISHOP_MAGIC = _tables["BISHOP_MAGIC"]
+BISHOP_SHIFT = _tables["BISHOP_SHIFT"]
+BISHOP_NBITS = _tables["BISHOP_NBITS"]
+
+
+ROOK_TABLE = _tables["ROOK_TABLE"]
+BISHOP_TABLE = _tables["BISHOP_TABLE"]
+KNIGHT_TABLE = _tables["KNIGHT_TABLE"]
+KING_TABLE = _tables["KING_TABLE"]
+PAWN_TABLE = _tables["PAWN_TABLE"]
+INVERTED_PAWN_TABLE = _tables["INVERTED_PAWN_TABLE"]
+
+
+# Square-pair geometry:
+#   BETWEEN[a][b]: squares strictly between a and b if they share a rank, file or diagonal, else 0.
+#   LINE[a][b]: the whole line (edge to edge, a and b included) through a and b if aligned, else 0.
+#   RAYS[direction][square]: squares from `square` to the edge in one direction, square excluded.
+
+RAY_N, RAY_NE, RAY_E, RAY_SE, RAY_S, RAY_SW, RAY_W, RAY_NW = range(8)
+
+BETWEEN = _tables["BETWEEN"]
+LINE = _tables["LINE"]
+RAYS = _tables["RAYS"]
+
+
+# Flattened ("fancy magic") layout: one contiguous uint64 table per slider,
+# ROOK_ATTACKS[ROOK_OFFSET[square] + idx] == ROOK_TABLE[square][idx].
+# With the mmap storage the flat tables are views of the mapping, otherwise they are
+# built as array('Q') on first access.
+
+ROOK_OFFSET = [0] * 64
+BISHOP_OFFSET = [0] * 64
+for _square in range(1, 64):
+    ROOK_OFFSET[_square] = ROOK_OFFSET[_square - 1] + (1 << ROOK_NBITS[_square - 1])
+    BISHOP_OFFSET[_square] = BISHOP_OFFSET[_square - 1] + (1 << BISHOP_NBITS[_square - 1])
+
+if "ROOK_ATTACKS" in _tables:
+    ROOK_ATTACKS = _tables["ROOK_ATTACKS"]
+    BISHOP_ATTACKS = _tables["BISHOP_ATTACKS"]
 
-ROOK_TABLE = magic_data["rook_table"]
-BISHOP_TABLE = magic_data["bishop_table"]
-KNIGHT_TABLE = magic_data["knight_table"]
-KING_TABLE = magic_data["king_table"]
-PAWN_TABLE = magic_data["pawn_table"] 
-INVERTED_PAWN_TABLE = magic_data["inverted_pawn_table"]
+del _tables, _square
 
 
 RANK_MASKS = [0xFF << (8 * i) for i in range(8)]
@@ -201,277 +412,193 @@ CASTLING_UPDATE[56] = 15 & ~CR_BQ
 CASTLING_UPDATE[60] = 15 & ~(CR_BK | CR_BQ)
 CASTLING_UPDATE[63] = 15 & ~CR_BK
 
+# (rook_from, rook_to) of a castling move, by destination square of the king
+CASTLING_ROOK_SQUARES = {6: (7, 5), 2: (0, 3), 62: (63, 61), 58: (56, 59)}
+
+
+# Extended move encoding: the 12 bits of from_square | (to_square << 6), the promotion piece
+# and flags describing the move. MOVE_FLAG_EXTENDED tells that the flags are set, a 12-bit move
+# (every flag cleared) keeps being handled as before.
+MOVE_SQUARES_MASK = 0xFFF
+MOVE_PROMOTION_SHIFT = 12
+MOVE_PROMOTION_MASK = 0x7 << MOVE_PROMOTION_SHIFT
+MOVE_FLAG_CAPTURE = 1 << 15
+MOVE_FLAG_EN_PASSANT = 1 << 16
+MOVE_FLAG_DOUBLE_PUSH = 1 << 17
+MOVE_FLAG_CASTLE = 1 << 18
+MOVE_FLAG_EXTENDED = 1 << 19
+
+
+# Zobrist keys (Board.zobrist_key), drawn from a fixed splitmix64 sequence so that keys are
+# the same in every process:
+#   ZOBRIST_PIECES[color_index][piece_type][square], the EMPTY row is all zeros.
+#   ZOBRIST_CASTLING[castling_rights]: xor of the keys of each right held.
+#   ZOBRIST_EN_PASSANT[en_passant_square], 0 (no en passant square) maps to 0.
+#   ZOBRIST_SIDE: xored in when black is to move.
+
+def _zobrist_numbers(count, seed=0x43484553534B4559) -> list:
+    """
+    Return `count` pseudo-random 64-bit numbers (splitmix64).
+    """
+
+    numbers = []
+    for _ in range(count):
+        seed = (seed + 0x9E3779B97F4A7C15) & U64
+        z = ((seed ^ (seed >> 30)) * 0xBF58476D1CE4E5B9) & U64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & U64
+        numbers.append(z ^ (z >> 31))
+    return numbers
+
+_zobrist = _zobrist_numbers(2 * 6 * 64 + 4 + 63 + 1)
+
+ZOBRIST_PIECES = [
+    [[0] * 64] + [_zobrist[(color * 6 + piece_type) * 64:(color * 6 + piece_type + 1) * 64] for piece_type in range(6)]
+    for color in range(2)
+]
+
+_zobrist_rights = _zobrist[768:772]
+ZOBRIST_CASTLING = [0] * 16
+for _rights in range(16):
+    for _bit in range(4):
+        if _rights & (1 << _bit):
+            ZOBRIST_CASTLING[_rights] ^= _zobrist_rights[_bit]
+
+ZOBRIST_EN_PASSANT = [0] + _zobrist[772:835]
+
+ZOBRIST_SIDE = _zobrist[835]
+
+del _zobrist, _zobrist_rights, _rights, _bit
+
+
+# Material key (Board.material_key): the number of pieces of each color and type except the kings,
+# packed in 4-bit fields. Adding MATERIAL_KEY_UNIT[color_index][piece_type] counts one more piece,
+# the EMPTY and KING entries are 0.
+MATERIAL_KEY_UNIT = tuple(
+    tuple(1 << (4 * (5 * color_index + piece_type - 1)) if PAWN <= piece_type <= QUEEN else 0 for piece_type in range(7))
+    for color_index in (WHITE_INDEX, BLACK_INDEX)
+)
+
+# K vs K, K+N vs K and K+B vs K, the positions Board.material_insufficiency() reports
+INSUFFICIENT_MATERIAL_KEYS = frozenset((
+    0,
+    MATERIAL_KEY_UNIT[WHITE_INDEX][KNIGHT], MATERIAL_KEY_UNIT[BLACK_INDEX][KNIGHT],
+    MATERIAL_KEY_UNIT[WHITE_INDEX][BISHOP], MATERIAL_KEY_UNIT[BLACK_INDEX][BISHOP],
+))
+
 
 #For engine
 
 MG_INDEX = 0
 EG_INDEX = 1
 
-# The PST tables are placed in the tuple so that the values of the pieces used in Chesscore can serve as indexes.
-
-pst = (
-    # EMPTY
-    (),
-
-    # PAWN
-    (
-        # MG
-        (
-            0,   0,   0,   0,   0,   0,   0,   0,
-            3,   3,  10,  19,  16,  19,   7,  -5,
-            -9, -15,  11,  15,  32,  22,   5, -22,
-            -8, -23,   6,  20,  40,  17,   4, -12,
-            13,   0, -13,   1,  11,  -2, -13,   5,
-            -5, -12,  -7,  22,  -8,  -5, -15, -18,
-            -7,   7,  -3, -13,   5, -16,  10,  -8,
-            0,   0,   0,   0,   0,   0,   0,   0
-        ),
-        # EG
-        (
-            0,   0,   0,   0,   0,   0,   0,   0,
-            -10,  -6,  10,   0,  14,   7,  -5, -19,
-            -10, -10, -10,   4,   4,   3,  -6,  -4,
-            6,  -2,  -8,  -4, -13, -12, -10,  -9,
-            9,   4,   3, -12, -12,  -6,  13,   8,
-            28,  20,  21,  28,  30,   7,   6,  13,
-            0, -11,  12,  21,  25,  19,   4,   7,
-            0,   0,   0,   0,   0,   0,   0,   0
-        ),
-    ),
-
-    # KNIGHT
-    (
-        # MG
-        (
-            -175, -92, -74, -73, -73, -74, -92,-175,
-            -77, -41, -27, -15, -15, -27, -41, -77,
-            -61, -17,   6,  12,  12,   6, -17, -61,
-            -35,   8,  40,  49,  49,  40,   8, -35,
-            -34,  13,  44,  51,  51,  44,  13, -34,
-            -9,  22,  58,  53,  53,  58,  22,  -9,
-            -67, -27,   4,  37,  37,   4, -27, -67,
-            -201, -83, -56, -26, -26, -56, -83,-201
-        ),
-        # EG
-        (
-            -96, -65, -49, -21, -21, -49, -65, -96,
-            -67, -54, -18,   8,   8, -18, -54, -67,
-            -40, -27,  -8,  29,  29,  -8, -27, -40,
-            -35,  -2,  13,  28,  28,  13,  -2, -35,
-            -45, -16,   9,  39,  39,   9, -16, -45,
-            -51, -44, -16,  17,  17, -16, -44, -51,
-            -69, -50, -51,  12,  12, -51, -50, -69,
-            -100, -88, -56, -17, -17, -56, -88,-100
-        )
-    ),
-
-    # BISHOP
-    (
-        # MG
-        (
-            -53,  -5,  -8, -23, -23,  -8,  -5, -53,
-            -15,   8,  19,   4,   4,  19,   8, -15,
-            -7,  21,  -5,  17,  17,  -5,  21,  -7,
-            -5,  11,  25,  39,  39,  25,  11,  -5,
-            -12,  29,  22,  31,  31,  22,  29, -12,
-            -16,   6,   1,  11,  11,   1,   6, -16,
-            -17, -14,   5,   0,   0,   5, -14, -17,
-            -48,   1, -14, -23, -23, -14,   1, -48
-        ),
-        # EG
-        (
-            -57, -30, -37, -12, -12, -37, -30, -57,
-            -37, -13, -17,   1,   1, -17, -13, -37,
-            -16,  -1,  -2,  10,  10,  -2,  -1, -16,
-            -20,  -6,   0,  17,  17,   0,  -6, -20,
-            -17,  -1, -14,  15,  15, -14,  -1, -17,
-            -30,   6,   4,   6,   6,   4,   6, -30,
-            -31, -20,  -1,   1,   1,  -1, -20, -31,
-            -46, -42, -37, -24, -24, -37, -42, -46
-        )
-    ),
-
-    # ROOK
-    (
-        # MG
-        (
-            -31, -20, -14,  -5,  -5, -14, -20, -31,
-            -21, -13,  -8,   6,   6,  -8, -13, -21,
-            -25, -11,  -1,   3,   3,  -1, -11, -25,
-            -13,  -5,  -4,  -6,  -6,  -4,  -5, -13,
-            -27, -15,  -4,   3,   3,  -4, -15, -27,
-            -22,  -2,   6,  12,  12,   6,  -2, -22,
-            -2,  12,  16,  18,  18,  16,  12,  -2,
-            -17, -19,  -1,   9,   9,  -1, -19, -17
-        ),
-        # EG
-        (
-            -9, -13, -10,  -9,  -9, -10, -13,  -9,
-            -12,  -9,  -1,  -2,  -2,  -1,  -9, -12,
-            6,  -8,  -2,  -6,  -6,  -2,  -8,   6,
-            -6,   1,  -9,   7,   7,  -9,   1,  -6,
-            -5,   8,   7,  -6,  -6,   7,   8,  -5,
-            6,   1,  -7,  10,  10,  -7,   1,   6,
-            4,   5,  20,  -5,  -5,  20,   5,   4,
-            18,   0,  19,  13,  13,  19,   0,  18
-        )
-    ),
-
-    # QUEEN
-    (
-        # MG
-        (
-            3,  -5,  -5,   4,   4,  -5,  -5,   3,
-            -3,   5,   8,  12,  12,   8,   5,  -3,
-            -3,   6,  13,   7,   7,  13,   6,  -3,
-            4,   5,   9,   8,   8,   9,   5,   4,
-            0,  14,  12,   5,   5,  12,  14,   0,
-            -4,  10,   6,   8,   8,   6,  10,  -4,
-            -5,   6,  10,   8,   8,  10,   6,  -5,
-            -2,  -2,   1,  -2,  -2,   1,  -2,  -2
-        ),
-        # EG
-        (
-            -69, -57, -47, -26, -26, -47, -57, -69,
-            -55, -31, -22,  -4,  -4, -22, -31, -55,
-            -39, -18,  -9,   3,   3,  -9, -18, -39,
-            -23,  -3,  13,  24,  24,  13,  -3, -23,
-            -29,  -6,   9,  21,  21,   9,  -6, -29,
-            -38, -18, -12,   1,   1, -12, -18, -38,
-            -50, -27, -24,  -8,  -8, -24, -27, -50,
-            -75, -52, -43, -36, -36, -43, -52, -75
-        )
-    ),
-
-    # KING
-    (
-        # MG
-        (
-            271, 327, 271, 198, 198, 271, 327, 271,
-            278, 303, 234, 179, 179, 234, 303, 278,
-            195, 258, 169, 120, 120, 169, 258, 195,
-            164, 190, 138,  98,  98, 138, 190, 164,
-            154, 179, 105,  70,  70, 105, 179, 154,
-            123, 145,  81,  31,  31,  81, 145, 123,
-            88, 120,  65,  33,  33,  65, 120,  88,
-            59,  89,  45,  -1,  -1,  45,  89,  59
-        ),
-        # EG
-        (
-            1,  45,  85,  76,  76,  85,  45,   1,
-            53, 100, 133, 135, 135, 133, 100,  53,
-            88, 130, 169, 175, 175, 169, 130,  88,
-            103, 156, 172, 172, 172, 172, 156, 103,
-            96, 166, 199, 199, 199, 199, 166,  96,
-            92, 172, 184, 191, 191, 184, 172,  92,
-            47, 121, 116, 131, 131, 116, 121,  47,
-            11,  59,  73,  78,  78,  73,  59,  11
-        )
-    ),
-)
+# The evaluation tables (pst, piece values, MVV_LVA, mobility, passed pawns...) live in
+# engine_constants.py and are only built the first time one of them is accessed, so
+# programs that only need Board / MoveGen do not pay for them at import.
 
-PAWN_VALUE = (128, 213)
-KNIGHT_VALUE = (781, 854)
-BISHOP_VALUE = (825, 915)
-ROOK_VALUE = (1276, 1380)
-QUEEN_VALUE = (2538, 2682)
-
-
-MVV_LVA = [[0] * 7 for _ in range(7)]
-
-PIECE_VALUES = [0, PAWN_VALUE[0], KNIGHT_VALUE[0], BISHOP_VALUE[0], ROOK_VALUE[0], QUEEN_VALUE[0], 3000]
-
-for att in range(1, 7):
-    for targ in range(1, 7):
-        MVV_LVA[att][targ] = PIECE_VALUES[targ] - att + 10000
-
-
-pst = (
-    (
-        (),
-
-        # PAWN
-        (
-            # MG
-            tuple(pst_value + PAWN_VALUE[MG_INDEX] for pst_value in pst[PAWN][MG_INDEX]),
-            
-            # EG
-            tuple(pst_value + PAWN_VALUE[EG_INDEX] for pst_value in pst[PAWN][EG_INDEX]),
-        ),
-
-        # KNIGHT
-        (
-            # MG
-            tuple(pst_value + KNIGHT_VALUE[MG_INDEX] for pst_value in pst[KNIGHT][MG_INDEX]),
-            
-            # EG
-            tuple(pst_value + KNIGHT_VALUE[EG_INDEX] for pst_value in pst[KNIGHT][EG_INDEX]),
-        ),
-
-        # BISHOP
-        (
-            # MG
-            tuple(pst_value + BISHOP_VALUE[MG_INDEX] for pst_value in pst[BISHOP][MG_INDEX]),
-
-            # EG
-            tuple(pst_value + BISHOP_VALUE[EG_INDEX] for pst_value in pst[BISHOP][EG_INDEX]),
-        ),
-
-        # ROOK
-        (
-            # MG
-            tuple(pst_value + ROOK_VALUE[MG_INDEX] for pst_value in pst[ROOK][MG_INDEX]),
-            
-            # EG
-            tuple(pst_value + ROOK_VALUE[EG_INDEX] for pst_value in pst[ROOK][EG_INDEX]),
-        ),
-
-        # QUEEN
-        (
-            # MG
-            tuple(pst_value + QUEEN_VALUE[MG_INDEX] for pst_value in pst[QUEEN][MG_INDEX]),
-            
-            # EG
-            tuple(pst_value + QUEEN_VALUE[EG_INDEX] for pst_value in pst[QUEEN][EG_INDEX]),
-        ),
-
-        # KING
-        (
-            # MG
-            tuple(pst_value for pst_value in pst[KING][MG_INDEX]),
-
-            # EG
-            tuple(pst_value for pst_value in pst[KING][EG_INDEX]),
-        )
-     )
-)
+_FLAT_NAMES = frozenset(("ROOK_ATTACKS", "BISHOP_ATTACKS"))
+
+# Pre-serialized leaper moves: KNIGHT_MOVES[square][targets] is the tuple of encoded moves
+# (square | to << 6, increasing `to`) for every subset `targets` of KNIGHT_TABLE[square],
+# same for KING_MOVES. One dict lookup replaces the bit-scan loop of the generators.
+# Built on first access (~15k tuples).
+
+_MOVE_LIST_NAMES = frozenset(("KNIGHT_MOVES", "KING_MOVES"))
+
+_ENGINE_NAMES = frozenset((
+    "pst",
+    "PAWN_VALUE",
+    "KNIGHT_VALUE",
+    "BISHOP_VALUE",
+    "ROOK_VALUE",
+    "QUEEN_VALUE",
+    "PIECE_VALUES",
+    "MVV_LVA",
+    "MATE_SCORE",
+    "KNOWN_WIN_SCORE",
+    "TRANSITION_TABLE_EXACT",
+    "TRANSITION_TABLE_ALPHA",
+    "TRANSITION_TABLE_BETA",
+    "MASK_PAWN_PASSED_MG",
+    "MASK_PAWN_PASSED_EG",
+    "PAWN_ISOLATED_MG",
+    "PAWN_ISOLATED_EG",
+    "PAWN_DOUBLED_MG",
+    "PAWN_DOUBLED_EG",
+    "MASK_EDGE",
+    "KNIGHT_MOBILITY_MG",
+    "KNIGHT_MOBILITY_EG",
+    "BISHOP_MOBILITY_MG",
+    "BISHOP_MOBILITY_EG",
+    "ROOK_MOBILITY_MG",
+    "ROOK_MOBILITY_EG",
+    "QUEEN_MOBILITY_MG",
+    "QUEEN_MOBILITY_EG",
+))
+
+
+_LAZY_NAMES = _FLAT_NAMES | _MOVE_LIST_NAMES | _ENGINE_NAMES
+
+
+def _leaper_moves(table) -> list:
+    """
+    Build the pre-serialized move tuples of a leaper attack table.
+
+    Args:
+        table (list): Attack bitboard of each square (KNIGHT_TABLE or KING_TABLE).
+
+    Returns:
+        list: For each square, a dict mapping every subset of its attacks to the tuple of encoded moves.
+    """
+
+    moves = []
+    for square in range(64):
+        mask = table[square]
+        square_moves = {0: ()}
+
+        # Carry-Rippler walks the subsets in increasing order, so the subset without
+        # the highest bit is always already built
+        subset = mask & -mask
+        while subset:
+            to = subset.bit_length() - 1
+            square_moves[subset] = square_moves[subset ^ (1 << to)] + (square | (to << 6),)
+            subset = (subset - mask) & mask
+
+        moves.append(square_moves)
+
+    return moves
 
 
-MATE_SCORE = 99999
+def __getattr__(name):
+    module_globals = globals()
 
-TRANSITION_TABLE_EXACT = 0
-TRANSITION_TABLE_ALPHA = 1
-TRANSITION_TABLE_BETA = 2
+    if name in _FLAT_NAMES:
+        for piece, table in (("ROOK", ROOK_TABLE), ("BISHOP", BISHOP_TABLE)):
+            flat = array("Q")
+            for square_table in table:
+                flat.extend(square_table)
+            module_globals[piece + "_ATTACKS"] = flat
 
-PAWN_PASSED_MG = (0, 10, 17, 15, 62, 167, 276, 0)
-PAWN_PASSED_EG = (0, 28, 33, 41, 72, 170, 260, 0)
+        return module_globals[name]
 
-MASK_PAWN_PASSED_MG = tuple(PAWN_PASSED_MG[square >> 3] for square in range(64))
-MASK_PAWN_PASSED_EG = tuple(PAWN_PASSED_EG[square >> 3] for square in range(64))
+    if name in _MOVE_LIST_NAMES:
+        module_globals["KNIGHT_MOVES"] = _leaper_moves(KNIGHT_TABLE)
+        module_globals["KING_MOVES"] = _leaper_moves(KING_TABLE)
 
-MASK_EDGE = 0xFF818181818181FF 
+        return module_globals[name]
 
+    if name in _ENGINE_NAMES:
+        try:
+            from . import engine_constants
+        except ImportError:
+            import engine_constants
 
-#These values ​​are taken from Stockfish 14
+        for engine_name in _ENGINE_NAMES:
+            module_globals[engine_name] = getattr(engine_constants, engine_name)
 
-KNIGHT_MOBILITY_MG = (-62, -53, -12, 4, 3, 13, 22, 28, 33)
-KNIGHT_MOBILITY_EG = (-81, -56, -30, -14, 8, 15, 23, 27, 33)
+        return module_globals[name]
 
-BISHOP_MOBILITY_MG = (-48, -20, 16, 26, 38, 51, 55, 63, 63, 68, 81, 81, 91, 98)
-BISHOP_MOBILITY_EG = (-59, -23, -3, 13, 24, 42, 54, 57, 65, 73, 78, 86, 88, 97)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-ROOK_MOBILITY_MG = (-58, -27, -15, -10, -5, -2, 9, 16, 30, 29, 32, 38, 46, 48, 58)
-ROOK_MOBILITY_EG = (-76, -18, 28, 55, 69, 82, 112, 118, 132, 142, 155, 165, 166, 169, 171)
 
-QUEEN_MOBILITY_MG = (-39, -21, 3, 3, 14, 22, 28, 41, 43, 48, 56, 60, 60, 66, 67, 70, 71, 73, 79, 88, 88, 99, 102, 102, 106, 109, 113, 116)
-QUEEN_MOBILITY_EG = (-36, -15, 8, 18, 34, 54, 61, 73, 79, 92, 94, 104, 113, 120, 123, 126, 133, 136, 140, 143, 148, 166, 170, 175, 184, 191, 206, 212)
+def __dir__():
+    return sorted({*globals(), *_LAZY_NAMES})
@@ -0,0 +1,237 @@
+"""
+Endgame recognizers dispatched on the material key.
+
+ENDGAME_EVALUATORS maps a `Board.material_key` to a specialized evaluator and the
+index of the stronger side, so finding out whether a position is a known endgame costs
+one dict lookup. Evaluators return a score from white's point of view, or None when
+the position is not recognized and the normal evaluation should be used.
+
+    board.init_board_for_engine()
+    score = probe_endgame(board)
+    if score is None:
+        score = evaluate(board)
+"""
+
+try:
+    from . import constants as _constants
+    from .constants import *
+except ImportError:
+    import constants as _constants
+    from constants import *
+
+__all__ = [
+    "material_key_of",
+    "evaluate_draw",
+    "evaluate_kxk",
+    "evaluate_kbnk",
+    "evaluate_kpk",
+    "ENDGAME_EVALUATORS",
+    "probe_endgame",
+]
+
+
+_PIECE_LETTERS = {"P": PAWN, "N": KNIGHT, "B": BISHOP, "R": ROOK, "Q": QUEEN}
+
+_DARK_CORNERS = (0, 63)
+_LIGHT_CORNERS = (7, 56)
+
+
+def material_key_of(white, black) -> int:
+    """
+    Build the material key of a piece configuration.
+
+    Args:
+        white (str): White pieces as letters, e.g. "KBN" (the king letter is optional).
+        black (str): Black pieces, e.g. "K".
+
+    Returns:
+        int: Material key, comparable to `Board.material_key`.
+    """
+
+    key = 0
+    for INDEX, pieces in ((WHITE_INDEX, white), (BLACK_INDEX, black)):
+        for letter in pieces.upper().replace("K", ""):
+            key += MATERIAL_KEY_UNIT[INDEX][_PIECE_LETTERS[letter]]
+
+    return key
+
+
+def _distance(square_1, square_2) -> int:
+    return max(abs((square_1 & 7) - (square_2 & 7)), abs((square_1 >> 3) - (square_2 >> 3)))
+
+
+def _edge_distance(square) -> int:
+    file, rank = square & 7, square >> 3
+    return min(file, 7 - file) + min(rank, 7 - rank)
+
+
+def _kings(board, strong_index) -> "tuple[int, int]":
+    return board.king_square[strong_index], board.king_square[1 - strong_index]
+
+
+def _signed(score, strong_index) -> int:
+    return score if strong_index == WHITE_INDEX else -score
+
+
+def evaluate_draw(board, strong_index) -> int:
+    """
+    Evaluator of the endgames that cannot be won (KK, KNK, KBK, KNNK, minor vs minor).
+
+    Args:
+        board (Board): Position to evaluate.
+        strong_index (int): Index of the stronger side (unused).
+
+    Returns:
+        int: 0.
+    """
+
+    return 0
+
+
+def evaluate_kxk(board, strong_index) -> int:
+    """
+    Evaluate a rook or queen against a lone king (KRK, KQK).
+
+    The stronger side gets a known win plus a bonus for pushing the defending king to the
+    edge and for bringing its own king close, which guides the search to the mate.
+
+    Args:
+        board (Board): Position to evaluate.
+        strong_index (int): Index of the side with the rook or queen.
+
+    Returns:
+        int: Score from white's point of view.
+    """
+
+    strong_king, weak_king = _kings(board, strong_index)
+    piece_value = _constants.QUEEN_VALUE if board.queen else _constants.ROOK_VALUE
+
+    score = _constants.KNOWN_WIN_SCORE + piece_value[EG_INDEX]
+    score += 20 * (6 - _edge_distance(weak_king)) + 10 * (7 - _distance(strong_king, weak_king))
+    return _signed(score, strong_index)
+
+
+def evaluate_kbnk(board, strong_index) -> int:
+    """
+    Evaluate king, bishop and knight against a lone king (KBNK).
+
+    The mate is only possible in a corner of the bishop's color, so the defending king is
+    pushed towards the nearest of those two corners.
+
+    Args:
+        board (Board): Position to evaluate.
+        strong_index (int): Index of the side with the bishop and the knight.
+
+    Returns:
+        int: Score from white's point of view.
+    """
+
+    strong_king, weak_king = _kings(board, strong_index)
+    bishop_square = board.bishop.bit_length() - 1
+    corners = _DARK_CORNERS if not ((bishop_square & 7) + (bishop_square >> 3)) & 1 else _LIGHT_CORNERS
+
+    score = _constants.KNOWN_WIN_SCORE + _constants.BISHOP_VALUE[EG_INDEX] + _constants.KNIGHT_VALUE[EG_INDEX]
+    score += 20 * (7 - min(_distance(weak_king, corner) for corner in corners)) + 10 * (7 - _distance(strong_king, weak_king))
+    return _signed(score, strong_index)
+
+
+def evaluate_kpk(board, strong_index) -> "int | None":
+    """
+    Recognize won and drawn king and pawn against king endgames (KPK).
+
+    Rule based, without a bitbase and without using the side to move:
+        - a rook pawn is a draw when the defending king holds the queening square or a square next to it;
+        - the pawn wins when the defending king is outside its square with a tempo to spare,
+          or when the attacking king stands on a key square of the pawn that is not en prise
+          (knight pawns with the defending king in the corner excepted, they can stalemate).
+    Any other position is left to the normal evaluation.
+
+    Args:
+        board (Board): Position to evaluate.
+        strong_index (int): Index of the side with the pawn.
+
+    Returns:
+        int | None: Score from white's point of view, or None if not recognized.
+    """
+
+    strong_king, weak_king = _kings(board, strong_index)
+    pawn_square = board.pawn.bit_length() - 1
+
+    # look at the position from the side of the pawn
+    if strong_index == BLACK_INDEX:
+        strong_king ^= 56
+        weak_king ^= 56
+        pawn_square ^= 56
+
+    pawn_file, pawn_rank = pawn_square & 7, pawn_square >> 3
+    queening_square = 56 + pawn_file
+
+    if pawn_file in (0, 7) and _distance(weak_king, queening_square) <= 1:
+        return 0
+
+    win = _constants.KNOWN_WIN_SCORE + _constants.PAWN_VALUE[EG_INDEX] + 10 * pawn_rank
+    pawn_en_prise = _distance(weak_king, pawn_square) == 1 and _distance(strong_king, pawn_square) > 1
+    if pawn_en_prise:
+        return None
+
+    # rule of the square, counting the double step and one tempo for the defender
+    moves_to_queen = 7 - max(pawn_rank, 2)
+    strong_king_in_path = (strong_king & 7) == pawn_file and (strong_king >> 3) > pawn_rank
+    if _distance(weak_king, queening_square) - 1 > moves_to_queen and not strong_king_in_path:
+        return _signed(win, strong_index)
+
+    # a knight pawn can stalemate a defending king in the corner
+    if pawn_file not in (0, 7) and not (pawn_file in (1, 6) and weak_king in (56, 63)):
+        # key squares: two ranks ahead of the pawn, one and two ranks ahead past the middle of the board
+        king_file, king_rank = strong_king & 7, strong_king >> 3
+        lowest_rank = pawn_rank + (2 if pawn_rank <= 3 else 1)
+        if abs(king_file - pawn_file) <= 1 and lowest_rank <= king_rank <= pawn_rank + 2 and strong_king != queening_square:
+            return _signed(win, strong_index)
+
+    return None
+
+
+def _build_evaluators() -> dict:
+    evaluators = {}
+
+    def add(white, black, evaluator):
+        evaluators[material_key_of(white, black)] = (evaluator, WHITE_INDEX)
+        evaluators[material_key_of(black, white)] = (evaluator, BLACK_INDEX)
+
+    for pieces in ("K", "KN", "KB", "KNN"):
+        add(pieces, "K", evaluate_draw)
+    for white in ("KN", "KB"):
+        for black in ("KN", "KB"):
+            add(white, black, evaluate_draw)
+
+    add("KR", "K", evaluate_kxk)
+    add("KQ", "K", evaluate_kxk)
+    add("KBN", "K", evaluate_kbnk)
+    add("KP", "K", evaluate_kpk)
+
+    return evaluators
+
+
+# material_key -> (evaluator, strong_index)
+ENDGAME_EVALUATORS = _build_evaluators()
+
+
+def probe_endgame(board) -> "int | None":
+    """
+    Evaluate the position with its endgame recognizer, if its material has one.
+
+    `board.material_key` must be set (init_board_for_engine) and kept up to date (make_move_search).
+
+    Args:
+        board (Board): Position to evaluate.
+
+    Returns:
+        int | None: Score from white's point of view, or None if the endgame is not recognized.
+    """
+
+    entry = ENDGAME_EVALUATORS.get(board.material_key)
+    if entry is None:
+        return None
+
+    evaluator, strong_index = entry
+    return evaluator(board, strong_index)
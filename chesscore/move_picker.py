@@ -0,0 +1,240 @@
+"""
+Staged move picker for the search.
+
+MovePicker yields the legal moves of a node in the order a search wants to try them,
+and only generates a stage when it is reached: a cutoff on the transposition table
+move or on a good capture never pays for the quiet move generation.
+
+    board.init_board_for_engine()
+    for move in MovePicker(board, side, tt_move, killers[ply], history[side_index]):
+        undo = board.make_move_search(move, side)
+        ...
+        board.unmake_move_search(undo, side)
+"""
+
+try:
+    from . import constants as _constants
+    from .constants import *
+    from .chess_game import MoveGen, GameState
+except ImportError:
+    import constants as _constants
+    from constants import *
+    from chess_game import MoveGen, GameState
+
+__all__ = [
+    "MovePicker",
+]
+
+
+class MovePicker:
+    """
+    Iterator over the legal moves of a position, by stages:
+
+        1. the transposition table move, if it is legal in the position;
+        2. good captures and promotions, by MVV_LVA;
+        3. the killer moves, if they are legal quiet moves in the position;
+        4. the other quiet moves, by history score;
+        5. bad captures, by MVV_LVA.
+
+    The TT move and the killers come from other positions, so they are validated against
+    the check and pin masks instead of generating the moves of their stage. A capture is
+    good when its static exchange evaluation (GameState.see_ge) does not lose material.
+    Promotions are yielded once, as queen promotions (make_move_search promotes to a queen
+    by default). Each legal move is yielded exactly once.
+
+    The board must be initialized for the engine (init_board_for_engine) and kept in sync
+    with make_move_search / unmake_move_search, the picker reads `board.mailbox`.
+
+    Args:
+        board (Board): Position to pick the moves from.
+        side (int): Side to move (WHITE=1 or BLACK=-1).
+        tt_move (int, optional): Encoded move from the transposition table, 0 if none. Defaults to 0.
+        killers (tuple[int, ...], optional): Encoded killer moves of the ply. Defaults to ().
+        history (list[int], optional): History scores indexed by encoded move (4096 entries),
+            None to keep the generation order of the quiet moves. Defaults to None.
+    """
+
+    TT_MOVE = 0
+    GOOD_CAPTURES = 1
+    KILLERS = 2
+    QUIETS = 3
+    BAD_CAPTURES = 4
+    DONE = 5
+
+    __slots__ = ('board', 'side', 'tt_move', 'killers', 'history', 'stage', '_masks')
+
+    def __init__(self, board, side, tt_move=0, killers=(), history=None):
+        self.board = board
+        self.side = side
+        self.tt_move = tt_move
+        self.killers = killers
+        self.history = history
+        self.stage = MovePicker.TT_MOVE
+        self._masks = None
+
+
+    def __iter__(self):
+        board = self.board
+        side = self.side
+        tt_move = self.tt_move
+
+        if tt_move and self.is_valid(tt_move):
+            yield tt_move
+
+        self.stage = MovePicker.GOOD_CAPTURES
+        captures = MoveGen.list_all_legal_captures(board, side)
+        captures += self._legal_promotions()
+        captures.sort(key=self._capture_score, reverse=True)
+
+        bad_captures = []
+        for move in captures:
+            if move == tt_move:
+                continue
+            if self._is_good_capture(move):
+                yield move
+            else:
+                bad_captures.append(move)
+
+        self.stage = MovePicker.KILLERS
+        killers = []
+        for move in self.killers:
+            if move and move != tt_move and move not in killers and self.is_valid(move, quiet=True):
+                killers.append(move)
+                yield move
+
+        self.stage = MovePicker.QUIETS
+        quiets = MoveGen.list_all_legal_quiets(board, side)
+        if self.history is not None:
+            quiets.sort(key=self.history.__getitem__, reverse=True)
+
+        for move in quiets:
+            if move != tt_move and move not in killers:
+                yield move
+
+        self.stage = MovePicker.BAD_CAPTURES
+        yield from bad_captures
+
+        self.stage = MovePicker.DONE
+
+
+    def is_valid(self, move, quiet=False) -> bool:
+        """
+        Check that a move from another position is legal here, without generating the moves.
+
+        Args:
+            move (int): Encoded move as (from_square | (to_square << 6)).
+            quiet (bool, optional): Also require a quiet move (no capture, en passant or promotion). Defaults to False.
+
+        Returns:
+            bool: True if the move is legal (and quiet if requested).
+        """
+
+        board = self.board
+        side = self.side
+        INDEX = WHITE_INDEX if side == WHITE else BLACK_INDEX
+
+        from_square = move & 0b111111
+        to_square = (move >> 6) & 0b111111
+        from_mask = SQUARE_MASKS[from_square]
+        to_mask = SQUARE_MASKS[to_square]
+
+        own_occupied_squares = board.board_occupied_squares[INDEX]
+        if not own_occupied_squares & from_mask or own_occupied_squares & to_mask:
+            return False
+        if quiet and board.board_occupied_squares[1 - INDEX] & to_mask:
+            return False
+
+        piece = abs(board.mailbox[from_square])
+
+        if piece == KING:
+            # enemy attacks with our king lifted, so it cannot step back along a checking ray
+            attacked = GameState.attack_map(board, -side, board.all_board_occupied_squares ^ from_mask)
+            if KING_TABLE[from_square] & to_mask:
+                return not attacked & to_mask
+            return move in MoveGen.list_all_castling_move(board, side, attacked)
+
+        checkers, check_mask, pinned = self._check_and_pin_masks()
+
+        # in double check only the king can move
+        if checkers & (checkers - 1):
+            return False
+
+        king_square = board.king_square[INDEX]
+
+        if piece == PAWN:
+            if quiet and (to_square == board.en_passant_square or to_mask & (RANK_MASKS[0] | RANK_MASKS[7])):
+                return False
+            return move in MoveGen._legal_pawn_moves(board, side, king_square, pinned, check_mask)
+
+        if not to_mask & check_mask:
+            return False
+        if pinned & from_mask and not to_mask & LINE[king_square][from_square]:
+            return False
+
+        if piece == KNIGHT:
+            return bool(KNIGHT_TABLE[from_square] & to_mask)
+
+        occupied = board.all_board_occupied_squares
+        attacks = 0
+        if piece == ROOK or piece == QUEEN:
+            attacks |= ROOK_TABLE[from_square][(((occupied & ROOK_MASK[from_square]) * ROOK_MAGIC[from_square]) & U64) >> ROOK_SHIFT[from_square]]
+        if piece == BISHOP or piece == QUEEN:
+            attacks |= BISHOP_TABLE[from_square][(((occupied & BISHOP_MASK[from_square]) * BISHOP_MAGIC[from_square]) & U64) >> BISHOP_SHIFT[from_square]]
+
+        return bool(attacks & to_mask)
+
+
+    def _check_and_pin_masks(self) -> "tuple[int, int, int]":
+        # computed once, the first time a validation or the promotions need them
+        if self._masks is None:
+            self._masks = MoveGen.get_check_and_pin_masks(self.board, self.side)
+        return self._masks
+
+
+    def _legal_promotions(self) -> list[int]:
+        # the legal captures and quiets leave the promotions out
+        board = self.board
+        side = self.side
+        INDEX = WHITE_INDEX if side == WHITE else BLACK_INDEX
+
+        if not board.pawn & board.board_occupied_squares[INDEX] & (RANK_MASKS[6] if side == WHITE else RANK_MASKS[1]):
+            return []
+
+        checkers, check_mask, pinned = self._check_and_pin_masks()
+        if checkers & (checkers - 1):
+            return []
+
+        promotion_rank = RANK_MASKS[7] if side == WHITE else RANK_MASKS[0]
+        return [
+            move for move in MoveGen._legal_pawn_moves(board, side, board.king_square[INDEX], pinned, check_mask)
+            if SQUARE_MASKS[(move >> 6) & 0b111111] & promotion_rank
+        ]
+
+
+    def _capture_score(self, move) -> int:
+        mailbox = self.board.mailbox
+        attacker = abs(mailbox[move & 0b111111])
+        victim = abs(mailbox[(move >> 6) & 0b111111])
+
+        if attacker == PAWN:
+            to_mask = SQUARE_MASKS[(move >> 6) & 0b111111]
+            if to_mask & (RANK_MASKS[0] | RANK_MASKS[7]):
+                # a promotion wins a queen, scored as a pawn capturing one, plus the captured piece
+                return _constants.MVV_LVA[PAWN][QUEEN] + _constants.PIECE_VALUES[victim]
+            if not victim:
+                victim = PAWN  # en passant
+
+        return _constants.MVV_LVA[attacker][victim]
+
+
+    def _is_good_capture(self, move) -> bool:
+        mailbox = self.board.mailbox
+        attacker = abs(mailbox[move & 0b111111])
+        victim = abs(mailbox[(move >> 6) & 0b111111])
+
+        # taking a piece worth at least the capturing one never loses material
+        piece_values = _constants.PIECE_VALUES
+        if victim and piece_values[victim] >= piece_values[attacker]:
+            return True
+
+        return GameState.see_ge(self.board, move)
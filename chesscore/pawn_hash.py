@@ -0,0 +1,179 @@
+"""
+Pawn structure evaluation and pawn hash table.
+
+The pawn terms of the evaluation (passed, isolated and doubled pawns) only depend
+on the pawns, which rarely move during a search. PawnHashTable caches them by
+`Board.pawn_key`, the pawn-only Zobrist key kept by make_move_search / unmake_move_search,
+so they are computed once per pawn structure instead of once per node.
+
+    pawn_table = PawnHashTable()
+    board.init_board_for_engine()
+    mg, eg, white_passed, black_passed = pawn_table.probe(board)
+"""
+
+try:
+    from . import constants as _constants
+    from .constants import *
+except ImportError:
+    import constants as _constants
+    from constants import *
+
+__all__ = [
+    "evaluate_pawns",
+    "PawnHashTable",
+]
+
+
+_FILE_A = 0x0101010101010101
+
+
+def _pawn_masks() -> tuple:
+    adjacent_files = [0] * 8
+    for file in range(8):
+        if file > 0:
+            adjacent_files[file] |= _FILE_A << (file - 1)
+        if file < 7:
+            adjacent_files[file] |= _FILE_A << (file + 1)
+
+    front_file = ([0] * 64, [0] * 64)
+    passed_span = ([0] * 64, [0] * 64)
+    for square in range(64):
+        rank, file = divmod(square, 8)
+        file_mask = _FILE_A << file
+        span_mask = file_mask | adjacent_files[file]
+
+        above = ((1 << 64) - 1) << (8 * (rank + 1)) & ((1 << 64) - 1)
+        below = (1 << (8 * rank)) - 1
+
+        front_file[WHITE_INDEX][square] = file_mask & above
+        front_file[BLACK_INDEX][square] = file_mask & below
+        passed_span[WHITE_INDEX][square] = span_mask & above
+        passed_span[BLACK_INDEX][square] = span_mask & below
+
+    return tuple(adjacent_files), front_file, passed_span
+
+
+# ADJACENT_FILES[file], FRONT_FILE[color_index][square] (squares ahead on the same file),
+# PASSED_SPAN[color_index][square] (squares ahead on the same and adjacent files)
+_ADJACENT_FILES, _FRONT_FILE, _PASSED_SPAN = _pawn_masks()
+
+
+def evaluate_pawns(board) -> "tuple[int, int, int, int]":
+    """
+    Evaluate the pawn structure of a position.
+
+    Passed pawns get the MASK_PAWN_PASSED_MG/EG bonus of their relative square, isolated and
+    doubled pawns the PAWN_ISOLATED_MG/EG and PAWN_DOUBLED_MG/EG penalties. A pawn with an own
+    pawn ahead of it on the same file counts as doubled and is never passed.
+
+    Args:
+        board (Board): Position to evaluate.
+
+    Returns:
+        tuple[int, int, int, int]: (mg, eg, white_passed, black_passed) with the scores from white's
+        point of view and the bitboards of the passed pawns of each side.
+    """
+
+    passed_mg = _constants.MASK_PAWN_PASSED_MG
+    passed_eg = _constants.MASK_PAWN_PASSED_EG
+    isolated_mg = _constants.PAWN_ISOLATED_MG
+    isolated_eg = _constants.PAWN_ISOLATED_EG
+    doubled_mg = _constants.PAWN_DOUBLED_MG
+    doubled_eg = _constants.PAWN_DOUBLED_EG
+
+    pawns = (board.pawn & board.board_occupied_squares[WHITE_INDEX], board.pawn & board.board_occupied_squares[BLACK_INDEX])
+    passed = [0, 0]
+    mg = eg = 0
+
+    for INDEX, sign, flip in ((WHITE_INDEX, 1, 0), (BLACK_INDEX, -1, 56)):
+        own_pawns = pawns[INDEX]
+        enemy_pawns = pawns[1 - INDEX]
+        front_file = _FRONT_FILE[INDEX]
+        passed_span = _PASSED_SPAN[INDEX]
+
+        bitboard = own_pawns
+        while bitboard:
+            square = (bitboard & -bitboard).bit_length() - 1
+            bitboard &= bitboard - 1
+
+            if own_pawns & front_file[square]:
+                mg -= sign * doubled_mg
+                eg -= sign * doubled_eg
+            elif not enemy_pawns & passed_span[square]:
+                passed[INDEX] |= 1 << square
+                mg += sign * passed_mg[square ^ flip]
+                eg += sign * passed_eg[square ^ flip]
+
+            if not own_pawns & _ADJACENT_FILES[square & 7]:
+                mg -= sign * isolated_mg
+                eg -= sign * isolated_eg
+
+    return mg, eg, passed[WHITE_INDEX], passed[BLACK_INDEX]
+
+
+class PawnHashTable:
+    """
+    Fixed-size cache of evaluate_pawns results, indexed by `Board.pawn_key`.
+
+    Each slot keeps the last pawn structure stored in it (always-replace).
+
+    Args:
+        size (int): Number of slots, a power of two.
+
+    Raises:
+        ValueError: If size is not a power of two.
+    """
+
+    __slots__ = ('size', 'mask', 'keys', 'entries', 'hits', 'misses')
+
+    def __init__(self, size=1 << 14):
+        if size <= 0 or size & (size - 1):
+            raise ValueError(f"Pawn hash table size must be a power of two, got {size}")
+
+        self.size = size
+        self.mask = size - 1
+        self.clear()
+
+
+    def clear(self) -> None:
+        """Empty the table and reset the hit counters."""
+
+        self.keys = [-1] * self.size
+        self.entries = [None] * self.size
+        self.hits = 0
+        self.misses = 0
+
+
+    def probe(self, board) -> "tuple[int, int, int, int]":
+        """
+        Return the pawn structure evaluation of a position, computing and storing it on a miss.
+
+        `board.pawn_key` must be set (init_board_for_engine) and kept up to date (make_move_search).
+
+        Args:
+            board (Board): Position to evaluate.
+
+        Returns:
+            tuple[int, int, int, int]: (mg, eg, white_passed, black_passed), see evaluate_pawns.
+        """
+
+        key = board.pawn_key
+        index = key & self.mask
+
+        if self.keys[index] == key:
+            self.hits += 1
+            return self.entries[index]
+
+        self.misses += 1
+        entry = evaluate_pawns(board)
+        self.keys[index] = key
+        self.entries[index] = entry
+        return entry
+
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of probes answered from the table (0.0 before the first probe)."""
+
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
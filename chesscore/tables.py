@@ -0,0 +1,462 @@
+"""
+Attack table builder.
+
+Rebuilds every pre-calculated attack table (rook, bishop, knight, king, pawn,
+inverted pawn, square-pair geometry) from the magic numbers stored in data/magic_bitboards.json,
+verifies each entry against slow ray walkers and writes the binary cache
+loaded by constants.py.
+
+    python -m chesscore.tables           # rebuild, verify and write data/magic_bitboards.bin
+    python -m chesscore.tables --json    # also rewrite the tables stored in the JSON file
+"""
+
+import os
+import sys
+import struct
+import zlib
+
+__all__ = [
+    "slow_rook_attacks",
+    "slow_bishop_attacks",
+    "rook_relevant_mask",
+    "bishop_relevant_mask",
+    "load_magics",
+    "build_tables",
+    "verify_tables",
+    "write_cache",
+    "write_json",
+    "rebuild_cache",
+]
+
+
+try:
+    from .constants import _TABLES_JSON_PATH, _TABLES_BIN_PATH, _TABLES_HEADER, _TABLES_MAGIC, _TABLES_VERSION, _TABLES_LAYOUT
+except ImportError:
+    from constants import _TABLES_JSON_PATH, _TABLES_BIN_PATH, _TABLES_HEADER, _TABLES_MAGIC, _TABLES_VERSION, _TABLES_LAYOUT
+
+_U64 = (1 << 64) - 1
+_FILE_A = 0x0101010101010101
+_FILE_B = _FILE_A << 1
+_FILE_G = _FILE_A << 6
+_FILE_H = _FILE_A << 7
+
+_ROOK_DIRECTIONS = ((1, 0), (-1, 0), (0, 1), (0, -1))
+_BISHOP_DIRECTIONS = ((1, 1), (1, -1), (-1, 1), (-1, -1))
+_KNIGHT_OFFSETS = ((2, 1), (2, -1), (-2, 1), (-2, -1), (1, 2), (1, -2), (-1, 2), (-1, -2))
+_KING_OFFSETS = ((1, 1), (-1, 1), (-1, -1), (1, -1), (0, 1), (0, -1), (-1, 0), (1, 0))
+
+# (file, rank) steps in the order of the RAY_N ... RAY_NW constants, opposite directions are 4 apart
+_RAY_DIRECTIONS = ((0, 1), (1, 1), (1, 0), (1, -1), (0, -1), (-1, -1), (-1, 0), (-1, 1))
+
+def _slow_slider_attacks(square, occupied, directions) -> int:
+    rank, file = divmod(square, 8)
+    attacks = 0
+
+    for d_file, d_rank in directions:
+        r, f = rank + d_rank, file + d_file
+        while 0 <= r <= 7 and 0 <= f <= 7:
+            attacks |= 1 << (r * 8 + f)
+            if (occupied >> (r * 8 + f)) & 1:
+                break
+            r += d_rank
+            f += d_file
+
+    return attacks
+
+
+def slow_rook_attacks(square, occupied) -> int:
+    """
+    Compute rook attacks by walking the four rays (reference implementation).
+
+    Args:
+        square (int): Rook square (0-63).
+        occupied (int): Occupancy bitboard.
+
+    Returns:
+        int: Attacked squares, the first blocker of each ray included.
+    """
+
+    return _slow_slider_attacks(square, occupied, _ROOK_DIRECTIONS)
+
+
+def slow_bishop_attacks(square, occupied) -> int:
+    """
+    Compute bishop attacks by walking the four diagonals (reference implementation).
+
+    Args:
+        square (int): Bishop square (0-63).
+        occupied (int): Occupancy bitboard.
+
+    Returns:
+        int: Attacked squares, the first blocker of each ray included.
+    """
+
+    return _slow_slider_attacks(square, occupied, _BISHOP_DIRECTIONS)
+
+
+def _relevant_mask(square, directions) -> int:
+    # squares whose occupancy can change the attacks: the rays without their last square
+    rank, file = divmod(square, 8)
+    mask = 0
+
+    for d_file, d_rank in directions:
+        r, f = rank + d_rank, file + d_file
+        while 0 <= r + d_rank <= 7 and 0 <= f + d_file <= 7:
+            mask |= 1 << (r * 8 + f)
+            r += d_rank
+            f += d_file
+
+    return mask
+
+
+def rook_relevant_mask(square) -> int:
+    """Return the relevant occupancy mask of a rook on `square` (rays without the board edges)."""
+
+    return _relevant_mask(square, _ROOK_DIRECTIONS)
+
+
+def bishop_relevant_mask(square) -> int:
+    """Return the relevant occupancy mask of a bishop on `square` (rays without the board edges)."""
+
+    return _relevant_mask(square, _BISHOP_DIRECTIONS)
+
+
+def _subsets(mask):
+    # Carry-Rippler enumeration of every subset of `mask`, the empty set first
+    subset = 0
+    while True:
+        yield subset
+        subset = (subset - mask) & mask
+        if not subset:
+            return
+
+
+def _leaper_table(offsets) -> list:
+    table = []
+    for square in range(64):
+        rank, file = divmod(square, 8)
+        attacks = 0
+        for d_file, d_rank in offsets:
+            if 0 <= rank + d_rank <= 7 and 0 <= file + d_file <= 7:
+                attacks |= 1 << ((rank + d_rank) * 8 + file + d_file)
+        table.append(attacks)
+    return table
+
+
+def load_magics(path=_TABLES_JSON_PATH) -> dict:
+    """
+    Load the magic numbers from the JSON source file.
+
+    Args:
+        path (str): Path of magic_bitboards.json.
+
+    Returns:
+        dict: ROOK_MASK, ROOK_MAGIC, ROOK_SHIFT, ROOK_NBITS and the BISHOP_ equivalents (64 entries each).
+    """
+
+    import json
+
+    with open(path, "r") as f:
+        magic_data = json.load(f)
+
+    magics = {}
+    for piece, key in (("ROOK", "rook_magics"), ("BISHOP", "bishop_magics")):
+        entries = sorted(magic_data[key], key=lambda entry: entry["square"])
+        magics[piece + "_MASK"] = [int(entry["mask"], 16) for entry in entries]
+        magics[piece + "_MAGIC"] = [int(entry["magic"], 16) for entry in entries]
+        magics[piece + "_SHIFT"] = [entry["shift"] for entry in entries]
+        magics[piece + "_NBITS"] = [entry["n_bits"] for entry in entries]
+
+    return magics
+
+
+def build_tables(magics=None) -> dict:
+    """
+    Build every attack table from the magic numbers.
+
+    Args:
+        magics (dict, optional): Output of `load_magics()`. Loaded from the JSON file if omitted.
+
+    Returns:
+        dict: The magic numbers plus ROOK_TABLE, BISHOP_TABLE, KNIGHT_TABLE, KING_TABLE,
+            PAWN_TABLE, INVERTED_PAWN_TABLE, BETWEEN, LINE and RAYS, in the layout used by constants.py.
+
+    Raises:
+        ValueError: If two occupancies of a square collide on different attacks.
+    """
+
+    if magics is None:
+        magics = load_magics()
+
+    tables = {name: list(magics[name]) for name in magics}
+
+    for piece, slow_attacks in (("ROOK", slow_rook_attacks), ("BISHOP", slow_bishop_attacks)):
+        table = []
+        for square in range(64):
+            mask = magics[piece + "_MASK"][square]
+            magic = magics[piece + "_MAGIC"][square]
+            shift = magics[piece + "_SHIFT"][square]
+            square_table = [0] * (1 << magics[piece + "_NBITS"][square])
+            filled = [False] * len(square_table)
+
+            for occupied in _subsets(mask):
+                idx = ((occupied * magic) & _U64) >> shift
+                attacks = slow_attacks(square, occupied)
+                if filled[idx] and square_table[idx] != attacks:
+                    raise ValueError(f"{piece.lower()} magic of square {square} has a destructive collision.")
+                square_table[idx] = attacks
+                filled[idx] = True
+
+            table.append(square_table)
+        tables[piece + "_TABLE"] = table
+
+    tables["KNIGHT_TABLE"] = _leaper_table(_KNIGHT_OFFSETS)
+    tables["KING_TABLE"] = _leaper_table(_KING_OFFSETS)
+
+    white_pawn = _leaper_table(((1, 1), (-1, 1)))
+    black_pawn = _leaper_table(((1, -1), (-1, -1)))
+    tables["PAWN_TABLE"] = [white_pawn, black_pawn]
+    # squares from which a pawn of that color attacks the square
+    tables["INVERTED_PAWN_TABLE"] = [list(black_pawn), list(white_pawn)]
+
+    rays = [[0] * 64 for _ in _RAY_DIRECTIONS]
+    between = [[0] * 64 for _ in range(64)]
+    line = [[0] * 64 for _ in range(64)]
+
+    for square in range(64):
+        rank, file = divmod(square, 8)
+        for direction, (d_file, d_rank) in enumerate(_RAY_DIRECTIONS):
+            r, f = rank + d_rank, file + d_file
+            while 0 <= r <= 7 and 0 <= f <= 7:
+                rays[direction][square] |= 1 << (r * 8 + f)
+                r += d_rank
+                f += d_file
+
+    for square in range(64):
+        rank, file = divmod(square, 8)
+        for direction, (d_file, d_rank) in enumerate(_RAY_DIRECTIONS):
+            full_line = rays[direction][square] | rays[(direction + 4) % 8][square] | (1 << square)
+            passed = 0
+            r, f = rank + d_rank, file + d_file
+            while 0 <= r <= 7 and 0 <= f <= 7:
+                target = r * 8 + f
+                between[square][target] = passed
+                line[square][target] = full_line
+                passed |= 1 << target
+                r += d_rank
+                f += d_file
+
+    tables["BETWEEN"] = between
+    tables["LINE"] = line
+    tables["RAYS"] = rays
+
+    return tables
+
+
+def verify_tables(tables) -> None:
+    """
+    Check every table entry against an independent computation.
+
+    Slider entries are compared with the slow ray walkers for every blocker subset,
+    the magic masks with the relevant occupancy masks, the leaper tables with
+    shift-based bitboard formulas, and BETWEEN / LINE / RAYS with the ray walkers.
+
+    Args:
+        tables (dict): Tables in the layout of `build_tables()`.
+
+    Raises:
+        ValueError: On the first mismatching entry.
+    """
+
+    for piece, slow_attacks, relevant_mask in (
+        ("ROOK", slow_rook_attacks, rook_relevant_mask),
+        ("BISHOP", slow_bishop_attacks, bishop_relevant_mask),
+    ):
+        for square in range(64):
+            mask = tables[piece + "_MASK"][square]
+            magic = tables[piece + "_MAGIC"][square]
+            shift = tables[piece + "_SHIFT"][square]
+            n_bits = tables[piece + "_NBITS"][square]
+            square_table = tables[piece + "_TABLE"][square]
+
+            if mask != relevant_mask(square) or shift != 64 - n_bits or len(square_table) != 1 << n_bits:
+                raise ValueError(f"{piece.lower()} magic parameters of square {square} are inconsistent.")
+
+            for occupied in _subsets(mask):
+                idx = ((occupied * magic) & _U64) >> shift
+                if square_table[idx] != slow_attacks(square, occupied):
+                    raise ValueError(f"{piece}_TABLE[{square}][{idx}] does not match the ray walker.")
+
+    for square in range(64):
+        bb = 1 << square
+
+        knight = (
+            ((bb << 17) & ~_FILE_A) | ((bb << 15) & ~_FILE_H)
+            | ((bb << 10) & ~(_FILE_A | _FILE_B)) | ((bb << 6) & ~(_FILE_G | _FILE_H))
+            | ((bb >> 17) & ~_FILE_H) | ((bb >> 15) & ~_FILE_A)
+            | ((bb >> 10) & ~(_FILE_G | _FILE_H)) | ((bb >> 6) & ~(_FILE_A | _FILE_B))
+        ) & _U64
+
+        side = (bb | ((bb << 1) & ~_FILE_A) | ((bb >> 1) & ~_FILE_H)) & _U64
+        king = (side | (side << 8) | (side >> 8)) & _U64 & ~bb
+
+        white_pawn = (((bb << 9) & ~_FILE_A) | ((bb << 7) & ~_FILE_H)) & _U64
+        black_pawn = ((bb >> 7) & ~_FILE_A) | ((bb >> 9) & ~_FILE_H)
+
+        expected = (
+            ("KNIGHT_TABLE", tables["KNIGHT_TABLE"][square], knight),
+            ("KING_TABLE", tables["KING_TABLE"][square], king),
+            ("PAWN_TABLE", tables["PAWN_TABLE"][0][square], white_pawn),
+            ("PAWN_TABLE", tables["PAWN_TABLE"][1][square], black_pawn),
+            ("INVERTED_PAWN_TABLE", tables["INVERTED_PAWN_TABLE"][0][square], black_pawn),
+            ("INVERTED_PAWN_TABLE", tables["INVERTED_PAWN_TABLE"][1][square], white_pawn),
+        )
+        for name, value, reference in expected:
+            if value != reference:
+                raise ValueError(f"{name} entry of square {square} is wrong.")
+
+    # geometry: BETWEEN is what both ends see of each other, LINE what both see on an empty board
+    for a in range(64):
+        for direction, step in enumerate(_RAY_DIRECTIONS):
+            if tables["RAYS"][direction][a] != _slow_slider_attacks(a, 0, (step,)):
+                raise ValueError(f"RAYS[{direction}][{a}] is wrong.")
+
+        for b in range(64):
+            between = full_line = 0
+            for slow_attacks in (slow_rook_attacks, slow_bishop_attacks):
+                if b != a and slow_attacks(a, 0) & (1 << b):
+                    between = slow_attacks(a, 1 << b) & slow_attacks(b, 1 << a)
+                    full_line = (slow_attacks(a, 0) & slow_attacks(b, 0)) | (1 << a) | (1 << b)
+
+            if tables["BETWEEN"][a][b] != between or tables["LINE"][a][b] != full_line:
+                raise ValueError(f"BETWEEN / LINE entry of squares {a} and {b} is wrong.")
+
+
+def write_cache(tables, path=_TABLES_BIN_PATH) -> None:
+    """
+    Write the binary cache loaded by constants.py.
+
+    The file is written next to `path` and then renamed, so a reader never sees a partial cache.
+
+    Args:
+        tables (dict): Tables in the layout of `build_tables()`.
+        path (str): Destination path.
+
+    Raises:
+        OSError: If the file cannot be written.
+    """
+
+    payload = bytearray()
+
+    for name, size in _TABLES_LAYOUT:
+        table = tables[name]
+        if size != 64:
+            table = [value for row in table for value in row]
+        payload += struct.pack(f"<{size}Q", *table)
+
+    # a square has at most a few hundred distinct attack sets, so the magic slots
+    # are stored as one-byte indices into the distinct sets of that square
+    for square_table in tables["ROOK_TABLE"] + tables["BISHOP_TABLE"]:
+        unique = list(dict.fromkeys(square_table))
+        positions = {attacks: i for i, attacks in enumerate(unique)}
+        payload += struct.pack(f"<H{len(unique)}Q", len(unique), *unique)
+        payload += bytes(positions[attacks] for attacks in square_table)
+
+    # flat copy for the memory-mapped storage, 8-byte aligned in the file
+    payload += bytes(-(_TABLES_HEADER.size + len(payload)) % 8)
+    flat_offset = _TABLES_HEADER.size + len(payload)
+
+    flat = bytearray()
+    for square_table in tables["ROOK_TABLE"] + tables["BISHOP_TABLE"]:
+        flat += struct.pack(f"<{len(square_table)}Q", *square_table)
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(_TABLES_HEADER.pack(_TABLES_MAGIC, _TABLES_VERSION, zlib.crc32(payload), zlib.crc32(flat), flat_offset))
+            f.write(payload)
+            f.write(flat)
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_json(tables, path=_TABLES_JSON_PATH) -> None:
+    """
+    Rewrite the attack tables stored in the JSON source file, keeping its magic numbers.
+
+    Args:
+        tables (dict): Tables in the layout of `build_tables()`.
+        path (str): Path of magic_bitboards.json.
+    """
+
+    import json
+
+    with open(path, "r") as f:
+        magic_data = json.load(f)
+
+    magic_data["rook_table"] = tables["ROOK_TABLE"]
+    magic_data["bishop_table"] = tables["BISHOP_TABLE"]
+    magic_data["knight_table"] = tables["KNIGHT_TABLE"]
+    magic_data["king_table"] = tables["KING_TABLE"]
+    magic_data["pawn_table"] = tables["PAWN_TABLE"]
+    magic_data["inverted_pawn_table"] = tables["INVERTED_PAWN_TABLE"]
+
+    with open(path, "w") as f:
+        json.dump(magic_data, f)
+
+
+def rebuild_cache(path=_TABLES_BIN_PATH, json_path=_TABLES_JSON_PATH, verify=True) -> dict:
+    """
+    Rebuild the attack tables from the magic numbers and write the binary cache.
+
+    Args:
+        path (str): Destination of the binary cache.
+        json_path (str): Source of the magic numbers.
+        verify (bool): Check every entry with `verify_tables()` before writing.
+
+    Returns:
+        dict: The rebuilt tables (nested lists).
+
+    Raises:
+        OSError: If the JSON file cannot be read or the cache cannot be written.
+        ValueError: If the magic numbers do not produce valid tables.
+    """
+
+    tables = build_tables(load_magics(json_path))
+
+    if verify:
+        verify_tables(tables)
+
+    write_cache(tables, path)
+
+    return tables
+
+
+def main(argv=None) -> int:
+    import time
+
+    argv = sys.argv[1:] if argv is None else argv
+
+    start = time.perf_counter()
+    tables = build_tables(load_magics())
+    print(f"Built attack tables in {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    verify_tables(tables)
+    print(f"Verified every entry in {time.perf_counter() - start:.2f} s")
+
+    write_cache(tables)
+    print(f"Wrote {_TABLES_BIN_PATH}")
+
+    if "--json" in argv:
+        write_json(tables)
+        print(f"Wrote {_TABLES_JSON_PATH}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())